@@ -0,0 +1,64 @@
+
+import hmac
+import os
+from fastapi import APIRouter, Header, HTTPException, status, Depends
+from typing import List, Optional
+from db import profiler
+from services.transit import transit
+
+router = APIRouter()
+
+# 운영용 엔드포인트 보호: X-Admin-Token 헤더가 ADMIN_TOKEN 과 일치해야 합니다.
+# ADMIN_TOKEN 이 설정되지 않았으면 운영용 엔드포인트는 모두 막힙니다. (503)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="관리자 토큰(ADMIN_TOKEN)이 설정되지 않아 사용할 수 없습니다.",
+        )
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 토큰이 올바르지 않습니다.",
+        )
+
+
+@router.get(
+    "/admin/slow_queries",
+    response_model=List[dict],
+    summary="최근 느린 쿼리 조회 (EXPLAIN 포함)",
+    dependencies=[Depends(require_admin)],
+)
+def get_slow_queries(limit: int = 50):
+    return profiler.recent(limit)
+
+
+@router.delete(
+    "/admin/slow_queries",
+    summary="느린 쿼리 기록 초기화",
+    dependencies=[Depends(require_admin)],
+)
+def clear_slow_queries():
+    profiler.clear()
+    return {"message": "느린 쿼리 기록이 초기화되었습니다."}
+
+
+@router.post(
+    "/admin/transit/reload",
+    summary="교통 데이터 변경 확인 및 바뀐 버스만 다시 읽기",
+    dependencies=[Depends(require_admin)],
+)
+def reload_transit():
+    # GTFS 가져오기(db/gtfs_import.py) 직후 주기를 기다리지 않고 반영할 때 씁니다.
+    if not transit.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="교통 데이터 메모리 뷰를 사용하지 않습니다. (TRANSIT_RELOAD_SECONDS)",
+        )
+    if transit.current() is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="교통 데이터를 읽지 못했습니다.")
+    changed_buses, changed_stations = transit.reload_now()
+    return {"changed_buses": sorted(changed_buses), "changed_stations": len(changed_stations)}
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, HTTPException, status
 from typing import List
 from db.session import get_db_connection
+from services.transit import transit
 import mysql.connector
 
 router = APIRouter()
 
 @router.get("/bus/", response_model=List[dict], summary="모든 버스 정보 조회")
 def get_all_buses():
-    conn = get_db_connection()
+    view = transit.current()
+    if view is not None:
+        return [view.slices[n].bus for n in view.bus_numbers]
+
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM bus")
@@ -24,7 +29,16 @@ def get_all_buses():
 
 @router.get("/bus/{bus_number}", response_model=dict, summary="특정 버스 정보 조회")
 def get_bus_by_number(bus_number: int):
-    conn = get_db_connection()
+    view = transit.current()
+    if view is not None:
+        bus_slice = view.slices.get(bus_number)
+        if bus_slice is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="버스를 찾을 수 없습니다."
+            )
+        return bus_slice.bus
+
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM bus WHERE bus_number = %s", (bus_number,))
@@ -2,12 +2,41 @@ from fastapi import APIRouter, HTTPException, status
 from typing import List, Dict
 import mysql.connector
 from db.session import get_db_connection
+from db import timetable
+from core.singleflight import coalesce
+from services.transit import transit
 
 router = APIRouter()
 
 @router.get("/bus_routes/", response_model=Dict[int, List[dict]], summary="모든 버스 노선 정보 조회")
+@coalesce("bus_routes")
 def get_all_bus_routes():
-    conn = get_db_connection()
+    # 시간표 파일(TIMETABLE_PATH)이 있으면 DB 대신 mmap 된 시간표에서 읽습니다.
+    table = timetable.get_timetable()
+    if table is not None:
+        result = {}
+        for bus_number in table.bus_numbers():
+            stops = table.routes(bus_number)
+            if stops:
+                result[bus_number] = [
+                    {
+                        "direction": direction,
+                        "stops": [
+                            {"station_order": s["station_order"], "station_name": s["station_name"]}
+                            for s in stops
+                            if s["direction"] == direction
+                        ],
+                    }
+                    for direction in ("up", "down")
+                ]
+        return result
+
+    # 교통 데이터 메모리 뷰(TRANSIT_RELOAD_SECONDS)를 쓰면 미리 만든 응답을 돌려줍니다.
+    view = transit.current()
+    if view is not None:
+        return view.all_routes()
+
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         # 모든 버스 번호, 노선 방향, 정류장 순서, 정류장 이름을 조회하고 버스 번호와 정류장 순서로 정렬합니다.
@@ -56,8 +85,32 @@ def get_all_bus_routes():
         conn.close()
 
 @router.get("/bus_routes/{bus_number}", response_model=List[dict], summary="특정 버스 노선 정보 조회")
+@coalesce("bus_route")
 def get_bus_routes(bus_number: int):
-    conn = get_db_connection()
+    table = timetable.get_timetable()
+    if table is not None:
+        routes = table.routes(bus_number)
+        if not routes:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="해당 버스 노선 정보를 찾을 수 없습니다.",
+            )
+        return [
+            {"direction": "up", "stops": [r for r in routes if r['direction'] == 'up']},
+            {"direction": "down", "stops": [r for r in routes if r['direction'] == 'down']},
+        ]
+
+    view = transit.current()
+    if view is not None:
+        routes = view.routes(bus_number)
+        if routes is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="해당 버스 노선 정보를 찾을 수 없습니다.",
+            )
+        return routes
+
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         # 노선 정보를 station_order에 따라 정렬하여 반환
@@ -1,13 +1,32 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Dict, Literal, Optional
 import mysql.connector
 from db.session import get_db_connection
+from db import timetable
+from core.singleflight import coalesce
+from services.transit import transit
 
 router = APIRouter()
 
 @router.get("/bus_times/", response_model=Dict[int, List[dict]], summary="모든 버스 시간표 조회")
+@coalesce("bus_times")
 def get_all_bus_times():
-    conn = get_db_connection()
+    # 시간표 파일(TIMETABLE_PATH)이 있으면 DB 대신 mmap 된 시간표에서 읽습니다.
+    table = timetable.get_timetable()
+    if table is not None:
+        result = {}
+        for bus_number in table.bus_numbers():
+            times = table.times(bus_number)
+            if times:
+                result[bus_number] = times
+        return result
+
+    # 교통 데이터 메모리 뷰(TRANSIT_RELOAD_SECONDS)를 쓰면 미리 만든 응답을 돌려줍니다.
+    view = transit.current()
+    if view is not None:
+        return view.all_times()
+
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         # 모든 버스 시간표를 버스 번호, 방향, 출발 시간 순으로 정렬하여 조회
@@ -39,10 +58,56 @@ def get_all_bus_times():
     finally:
         conn.close()
 
+# 배차 간격 분석: /bus_times/{bus_number} 보다 먼저 선언해야 합니다.
+@router.get("/bus_times/analytics", summary="노선/방향별 배차 간격 및 시간대별 운행 횟수")
+@coalesce("bus_times_analytics")
+def get_bus_time_analytics(
+    bus_number: Optional[int] = Query(None, description="특정 버스만 조회"),
+    direction: Optional[Literal["up", "down"]] = Query(None),
+):
+    # NumPy 를 쓰는 분석 모듈은 워커 시작 시간을 줄이도록 처음 호출할 때 불러옵니다.
+    from services import headway
+
+    try:
+        report = headway.report()
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"배차 간격 분석 중 오류 발생: {e}",
+        )
+    lines = report.select(bus_number, direction)
+    if bus_number is not None and not lines:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="해당 버스 시간표를 찾을 수 없습니다.",
+        )
+    return {"trips": report.trips, "hours": report.hours, "build_ms": report.build_ms, "lines": lines}
+
 # 추가: 버스 시간표 조회 엔드포인트
 @router.get("/bus_times/{bus_number}", response_model=List[dict], summary="특정 버스 시간표 조회")
+@coalesce("bus_time")
 def get_bus_times(bus_number: int):
-    conn = get_db_connection()
+    table = timetable.get_timetable()
+    if table is not None:
+        times = table.times(bus_number)
+        if not times:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="해당 버스 시간표를 찾을 수 없습니다.",
+            )
+        return times
+
+    view = transit.current()
+    if view is not None:
+        times = view.times(bus_number)
+        if times is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="해당 버스 시간표를 찾을 수 없습니다.",
+            )
+        return times
+
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM bus_time WHERE bus_number = %s", (bus_number,))
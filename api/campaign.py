@@ -0,0 +1,170 @@
+
+import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+import mysql.connector
+from dateutil.relativedelta import relativedelta
+from api.admin import require_admin
+from db.session import get_db_connection
+from crud import crud_campaign, crud_coupon
+from schemas.campaign import CampaignCreate
+from services import campaign as campaign_jobs
+
+router = APIRouter()
+
+
+def _with_progress(campaign: dict) -> dict:
+    total = campaign["total_users"]
+    return dict(
+        campaign,
+        progress=round(campaign["scanned"] / total, 4) if total else 1.0,
+        worker_active=campaign_jobs.is_running(campaign["campaign_id"]),
+    )
+
+
+@router.post(
+    "/campaign/",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="쿠폰 일괄 지급 캠페인 시작 (등급/포인트 조건)",
+    dependencies=[Depends(require_admin)],
+)
+def create_campaign(campaign: CampaignCreate):
+    if (
+        campaign.min_total_point is not None
+        and campaign.max_total_point is not None
+        and campaign.min_total_point > campaign.max_total_point
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="최소 포인트가 최대 포인트보다 클 수 없습니다.",
+        )
+
+    conn = get_db_connection()
+    try:
+        conn.start_transaction()
+        if not crud_coupon.coupon_exists(conn, campaign.coupon_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"지급하려는 쿠폰 (ID: {campaign.coupon_id})이 존재하지 않습니다.",
+            )
+
+        # 구매 시 지급과 같이 오늘부터 유효하며, 만료일은 valid_months 뒤입니다.
+        today = datetime.date.today()
+        end_date = (today + relativedelta(months=+campaign.valid_months)).isoformat()
+        campaign_id = crud_campaign.create_campaign(
+            conn,
+            campaign.coupon_id,
+            campaign.grade,
+            campaign.min_total_point,
+            campaign.max_total_point,
+            today.isoformat(),
+            end_date,
+            campaign.chunk_size or campaign_jobs.CAMPAIGN_CHUNK_SIZE,
+        )
+        created = crud_campaign.get_campaign(conn, campaign_id)
+        conn.commit()
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"캠페인 생성 중 오류 발생: {e}",
+        )
+    except HTTPException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    campaign_jobs.start(campaign_id)
+    return _with_progress(created)
+
+
+@router.get(
+    "/campaign/",
+    response_model=List[dict],
+    summary="쿠폰 일괄 지급 캠페인 목록",
+    dependencies=[Depends(require_admin)],
+)
+def get_campaigns(limit: int = Query(20, ge=1, le=100)):
+    conn = get_db_connection(read_only=True)
+    try:
+        return [_with_progress(campaign) for campaign in crud_campaign.get_campaigns(conn, limit)]
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"캠페인 조회 중 오류 발생: {e}",
+        )
+    finally:
+        conn.close()
+
+
+@router.get(
+    "/campaign/{campaign_id}",
+    response_model=dict,
+    summary="쿠폰 일괄 지급 캠페인 진행 상황",
+    dependencies=[Depends(require_admin)],
+)
+def get_campaign(campaign_id: int):
+    # 진행 상황은 작업자가 주 DB 에 쓰므로 복제 지연 없이 주 DB 에서 읽습니다.
+    conn = get_db_connection()
+    try:
+        campaign = crud_campaign.get_campaign(conn, campaign_id)
+        if campaign is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="캠페인을 찾을 수 없습니다."
+            )
+        return _with_progress(campaign)
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"캠페인 조회 중 오류 발생: {e}",
+        )
+    finally:
+        conn.close()
+
+
+def _change_status(campaign_id: int, new_status: str, allowed: tuple, message: str) -> dict:
+    conn = get_db_connection()
+    try:
+        changed = crud_campaign.set_campaign_status(conn, campaign_id, new_status, allowed)
+        campaign = crud_campaign.get_campaign(conn, campaign_id)
+        conn.commit()
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"캠페인 상태 변경 중 오류 발생: {e}",
+        )
+    finally:
+        conn.close()
+
+    if campaign is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="캠페인을 찾을 수 없습니다.")
+    if changed == 0 and not (new_status == "running" and campaign["status"] == "running"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"현재 상태({campaign['status']})에서는 {message}할 수 없습니다.",
+        )
+    return campaign
+
+
+@router.post(
+    "/campaign/{campaign_id}/pause",
+    summary="쿠폰 일괄 지급 캠페인 일시 중지",
+    dependencies=[Depends(require_admin)],
+)
+def pause_campaign(campaign_id: int):
+    # 진행 중인 청크는 끝까지 처리되고, 다음 청크부터 멈춥니다.
+    return _with_progress(_change_status(campaign_id, "paused", ("running",), "일시 중지"))
+
+
+@router.post(
+    "/campaign/{campaign_id}/resume",
+    summary="쿠폰 일괄 지급 캠페인 재개 (저장된 진행 위치부터)",
+    dependencies=[Depends(require_admin)],
+)
+def resume_campaign(campaign_id: int):
+    # 서버 재시작 등으로 작업자가 없어진 'running' 캠페인도 다시 시작합니다.
+    campaign = _change_status(campaign_id, "running", ("paused", "failed"), "재개")
+    campaign_jobs.start(campaign_id)
+    return _with_progress(campaign)
@@ -1,20 +1,21 @@
 
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Literal, Optional
 import mysql.connector
 from db.session import get_db_connection
+from crud import crud_coupon
+from services import coupon_catalog
+from core.singleflight import coalesce
 
 router = APIRouter()
 
 
 @router.get("/coupon/", response_model=List[dict], summary="모든 쿠폰 정보 조회")
+@coalesce("coupons")
 def get_coupons():
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM coupon")
-        rows = cursor.fetchall()
-        return rows
+        return crud_coupon.get_coupons(conn)
     except mysql.connector.Error as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -24,13 +25,45 @@ def get_coupons():
         conn.close()
 
 
+# /coupon/{coupon_id} 보다 먼저 선언해야 "search" 가 쿠폰 ID 로 해석되지 않습니다.
+@router.get("/coupon/search", response_model=dict, summary="쿠폰 검색 (제휴사/가격/할인율 필터, 패싯 개수 포함)")
+def search_coupons(
+    affiliate: Optional[List[str]] = Query(None, description="제휴사 (여러 개 지정 가능)"),
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    min_discount: Optional[int] = Query(None, ge=0, description="최소 할인율"),
+    sort: Literal["price_asc", "price_desc", "discount_desc", "latest"] = "price_asc",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="최소 가격이 최대 가격보다 클 수 없습니다.",
+        )
+    try:
+        return coupon_catalog.search(
+            affiliates=affiliate,
+            min_price=min_price,
+            max_price=max_price,
+            min_discount=min_discount,
+            sort=sort,
+            offset=offset,
+            limit=limit,
+        )
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"쿠폰 검색 중 오류 발생: {e}",
+        )
+
+
 @router.get("/coupon/{coupon_id}", response_model=dict, summary="특정 쿠폰 정보 조회")
+@coalesce("coupon")
 def get_coupon(coupon_id: int):
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM coupon WHERE coupon_id = %s", (coupon_id,))
-        coupon = cursor.fetchone()
+        coupon = crud_coupon.get_coupon(conn, coupon_id)
         if coupon is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="쿠폰을 찾을 수 없습니다."
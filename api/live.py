@@ -0,0 +1,62 @@
+
+import os
+from fastapi import APIRouter, Body, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Literal
+from api.admin import require_admin
+from services.live import hub
+
+router = APIRouter()
+
+# 연결이 살아 있는지 확인하고 프록시가 유휴 연결을 끊지 않도록 보내는 하트비트 간격 (초)
+LIVE_HEARTBEAT_SECONDS = float(os.environ.get("LIVE_HEARTBEAT_SECONDS", "15"))
+
+LiveKind = Literal["bus", "station"]
+
+
+@router.get("/live/{kind}/{key}/events", summary="실시간 도착/혼잡도 구독 (SSE)")
+async def live_events(kind: LiveKind, key: int):
+    async def stream():
+        subscription = hub.subscribe(kind, key)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                message = await subscription.next(LIVE_HEARTBEAT_SECONDS)
+                if message is None:
+                    break  # 너무 느려서 서버가 끊은 경우
+                yield message.sse if message is not False else b": ping\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/live/{kind}/{key}/ws")
+async def live_websocket(websocket: WebSocket, kind: LiveKind, key: int):
+    await websocket.accept()
+    subscription = hub.subscribe(kind, key)
+    try:
+        while True:
+            message = await subscription.next(LIVE_HEARTBEAT_SECONDS)
+            if message is None:
+                await websocket.close(code=1013, reason="too slow")
+                break
+            await websocket.send_text(message.ws if message is not False else '{"event": "ping"}')
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # 클라이언트가 연결을 끊음
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.post(
+    "/live/{kind}/{key}",
+    summary="실시간 메시지 발행 (혼잡도 등 외부 데이터)",
+    dependencies=[Depends(require_admin)],
+)
+async def publish_live(kind: LiveKind, key: int, event: str = "congestion", payload: dict = Body(...)):
+    delivered = hub.publish(kind, key, event, payload)
+    return {"subscribers": delivered}
@@ -4,6 +4,7 @@ import mysql.connector
 import datetime
 from dateutil.relativedelta import relativedelta
 from db.session import get_db_connection
+from crud import crud_coupon, crud_purchase, crud_user_coupon
 from schemas.purchase import PurchaseRequest
 
 router = APIRouter()
@@ -15,17 +16,12 @@ router = APIRouter()
     summary="상품 구매 및 포인트 차감/쿠폰 지급",
 )
 def purchase_product(request: PurchaseRequest):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    conn = get_db_connection(user_id=request.user_id)
 
     try:
         conn.start_transaction()
 
-        cursor.execute(
-            "SELECT point, use_point FROM point WHERE id = %s FOR UPDATE",
-            (request.user_id,),
-        )
-        point_record = cursor.fetchone()
+        point_record = crud_purchase.lock_point_balance(conn, request.user_id)
         if point_record is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -46,30 +42,18 @@ def purchase_product(request: PurchaseRequest):
         new_point = current_point - request.product_amount
         new_use_point = current_use_point + request.product_amount
 
-        cursor.execute(
-            "UPDATE point SET point = %s, use_point = %s WHERE id = %s",
-            (new_point, new_use_point, request.user_id),
-        )
+        crud_purchase.update_point_balance(conn, request.user_id, new_point, new_use_point)
 
         if request.granted_coupon_id is not None:
             coupon_id_to_grant = request.granted_coupon_id
 
-            cursor.execute(
-                "SELECT 1 FROM coupon WHERE coupon_id = %s", (coupon_id_to_grant,)
-            )
-            coupon_exists = cursor.fetchone()
-            if not coupon_exists:
+            if not crud_coupon.coupon_exists(conn, coupon_id_to_grant):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"지급하려는 쿠폰 (ID: {coupon_id_to_grant})이 존재하지 않습니다.",
                 )
 
-            cursor.execute(
-                "SELECT 1 FROM user_coupon WHERE id = %s AND coupon_id = %s",
-                (request.user_id, coupon_id_to_grant),
-            )
-            existing_user_coupon = cursor.fetchone()
-            if existing_user_coupon:
+            if crud_user_coupon.user_coupon_exists(conn, request.user_id, coupon_id_to_grant):
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail=f"사용자 (ID: {request.user_id})는 이미 쿠폰 (ID: {coupon_id_to_grant})을(를) 보유하고 있습니다.",
@@ -79,17 +63,8 @@ def purchase_product(request: PurchaseRequest):
             today = datetime.date.today()
             end_date = (today + relativedelta(months=+6)).isoformat()
 
-            cursor.execute(
-                "INSERT INTO user_coupon (id, coupon_id, start_period, end_period, use_can, use_finish, finish_period) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                (
-                    request.user_id,
-                    coupon_id_to_grant,
-                    today.isoformat(),
-                    end_date,
-                    1,
-                    0,
-                    0,
-                ),
+            crud_user_coupon.create_user_coupon(
+                conn, request.user_id, coupon_id_to_grant, today.isoformat(), end_date
             )
 
         conn.commit()
@@ -114,6 +89,4 @@ def purchase_product(request: PurchaseRequest):
             detail=f"예상치 못한 오류 발생: {e}",
         )
     finally:
-        if conn.is_connected():
-            cursor.close()
-            conn.close()
+        conn.close()
@@ -0,0 +1,128 @@
+
+import os
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List
+import mysql.connector
+from db.session import get_db_connection
+from crud import crud_recent_move, crud_user
+from schemas.recent_move import RecentMoveCreate, RecentMoveUpdate
+
+router = APIRouter()
+
+# 사용자별 최근 이동 기록 보관 개수
+RECENT_MOVE_LIMIT = int(os.environ.get("RECENT_MOVE_LIMIT", "10"))
+
+
+@router.get(
+    "/recent_move/{user_id}", response_model=List[dict], summary="사용자의 최근 이동 기록 조회"
+)
+def get_recent_moves(user_id: int, limit: int = Query(RECENT_MOVE_LIMIT, ge=1)):
+    conn = get_db_connection(read_only=True, user_id=user_id)
+    try:
+        return crud_recent_move.get_recent_moves(conn, user_id, min(limit, RECENT_MOVE_LIMIT))
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"최근 이동 기록 조회 중 오류 발생: {e}",
+        )
+    finally:
+        conn.close()
+
+
+@router.post(
+    "/recent_move/", status_code=status.HTTP_201_CREATED, summary="최근 이동 기록 추가"
+)
+def create_recent_move(move: RecentMoveCreate):
+    conn = get_db_connection(user_id=move.member_id)
+    try:
+        conn.start_transaction()
+
+        if not crud_user.user_exists(conn, move.member_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="유효하지 않은 member_id 입니다. 먼저 사용자를 생성하세요.",
+            )
+
+        # 같은 출발지/도착지는 새로 쌓지 않고 최근 사용 시각만 갱신합니다.
+        crud_recent_move.touch_recent_move(
+            conn, move.member_id, move.origin, move.destination, RECENT_MOVE_LIMIT
+        )
+        recent_move = crud_recent_move.get_recent_move_by_pair(
+            conn, move.member_id, move.origin, move.destination
+        )
+
+        conn.commit()
+        return recent_move
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"최근 이동 기록 추가 중 오류 발생: {e}",
+        )
+    finally:
+        conn.close()
+
+
+@router.put(
+    "/recent_move/{user_id}/{root_id}", summary="최근 이동 기록 수정"
+)
+def update_recent_move(user_id: int, root_id: int, move_update: RecentMoveUpdate):
+    conn = get_db_connection(user_id=user_id)
+    try:
+        # 기록의 소유자(member_id)는 바꿀 수 없습니다.
+        fields = move_update.dict(exclude_none=True, exclude={"member_id"})
+        if not fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="업데이트할 내용이 없습니다.",
+            )
+
+        conn.start_transaction()
+        recent_move = crud_recent_move.get_recent_move(conn, root_id)
+        if recent_move is None or recent_move["member_id"] != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="최근 이동 기록을 찾을 수 없습니다.",
+            )
+
+        crud_recent_move.update_recent_move(conn, root_id, fields)
+        conn.commit()
+        return {"message": "최근 이동 기록이 성공적으로 업데이트되었습니다."}
+    except mysql.connector.IntegrityError:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="같은 출발지/도착지의 최근 이동 기록이 이미 있습니다.",
+        )
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"최근 이동 기록 수정 중 오류 발생: {e}",
+        )
+    finally:
+        conn.close()
+
+
+@router.delete(
+    "/recent_move/{user_id}/{root_id}", summary="최근 이동 기록 삭제"
+)
+def delete_recent_move(user_id: int, root_id: int):
+    conn = get_db_connection(user_id=user_id)
+    try:
+        deleted = crud_recent_move.delete_recent_move(conn, user_id, root_id)
+        conn.commit()
+
+        if deleted == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="최근 이동 기록을 찾을 수 없습니다.",
+            )
+        return {"message": "최근 이동 기록이 삭제되었습니다."}
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"최근 이동 기록 삭제 중 오류 발생: {e}",
+        )
+    finally:
+        conn.close()
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from typing import List
 from db.session import get_db_connection
+from services import station_geo, station_search
+from core.singleflight import coalesce
 import mysql.connector
 
 router = APIRouter()
 
 @router.get("/stations/", response_model=List[dict], summary="모든 정류장 정보 조회")
+@coalesce("stations")
 def get_all_stations():
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM station")
@@ -21,9 +24,37 @@ def get_all_stations():
     finally:
         conn.close()
 
+# /stations/{station_number} 보다 먼저 선언해야 "search", "nearby" 가 정류장 번호로 해석되지 않습니다.
+@router.get("/stations/nearby", response_model=List[dict], summary="주변 정류장 조회 (가까운 순)")
+def get_nearby_stations(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(500, gt=0, le=5000, description="검색 반경 (m)"),
+    limit: int = Query(10, ge=1, le=50),
+    include_routes: bool = Query(False, description="정류장을 지나는 버스 번호 포함"),
+):
+    try:
+        return station_geo.nearby(lat, lon, radius, limit, include_routes)
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"주변 정류장 조회 중 오류 발생: {e}",
+        )
+
+
+@router.get("/stations/search", response_model=List[dict], summary="정류장 이름 검색 (접두사/부분 문자열/초성)")
+def search_stations(q: str = Query(..., min_length=1, max_length=50), limit: int = Query(20, ge=1, le=100)):
+    try:
+        return station_search.search(q, limit)
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"정류장 검색 중 오류 발생: {e}",
+        )
+
 @router.get("/stations/{station_number}", response_model=dict, summary="특정 정류장 정보 조회")
 def get_station_by_number(station_number: int):
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     try:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM station WHERE station_number = %s", (station_number,))
@@ -41,3 +72,37 @@ def get_station_by_number(station_number: int):
     finally:
         conn.close()
 
+
+
+@router.get("/stations/{from_station}/to/{to_station}", response_model=dict, summary="정류장 간 최소 탑승 시간 (갈아타지 않는 노선)")
+def get_travel_time(from_station: int, to_station: int):
+    # 미리 계산한 행렬 파일(db/travel_matrix.py)에서 O(1) 로 찾습니다.
+    # 빌더가 NumPy 를 쓰므로 워커 시작 시간을 줄이도록 처음 호출할 때 불러옵니다.
+    from db import travel_matrix
+
+    matrix = travel_matrix.get_travel_matrix()
+    if matrix is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="정류장 간 소요 시간 행렬이 없습니다. (TRAVEL_MATRIX_PATH)",
+        )
+    try:
+        result = matrix.lookup(from_station, to_station)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="정류장을 찾을 수 없습니다.")
+    if from_station == to_station:
+        seconds, bus_number, direction = 0, None, None
+    elif result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="두 정류장을 잇는 직통 버스가 없습니다."
+        )
+    else:
+        seconds, bus_number, direction = result
+    return {
+        "from_station": from_station,
+        "to_station": to_station,
+        "travel_seconds": seconds,
+        "travel_minutes": round(seconds / 60, 1),
+        "bus_number": bus_number,
+        "direction": direction,
+    }
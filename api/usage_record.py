@@ -3,18 +3,16 @@ from fastapi import APIRouter, HTTPException, status
 from typing import List
 import mysql.connector
 from db.session import get_db_connection
+from crud import crud_usage_record
 
 router = APIRouter()
 
 
 @router.get("/usage_record/", response_model=List[dict], summary="모든 통계 정보 조회")
 def get_all_usage_records():
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM usage_record")
-        rows = cursor.fetchall()
-        return rows
+        return crud_usage_record.get_usage_records(conn)
     except mysql.connector.Error as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -30,11 +28,9 @@ def get_all_usage_records():
     summary="특정 사용자의 통계 정보 조회",
 )
 def get_usage_record(user_id: int):
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True, user_id=user_id)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM usage_record WHERE id = %s", (user_id,))
-        stats = cursor.fetchone()
+        stats = crud_usage_record.get_usage_record(conn, user_id)
         if stats is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
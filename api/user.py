@@ -3,18 +3,17 @@ from fastapi import APIRouter, HTTPException, status
 from typing import List
 import mysql.connector
 from db.session import get_db_connection
+from crud import crud_user
+from services.leaderboard import leaderboard
 
 router = APIRouter()
 
 
 @router.get("/user/", response_model=List[dict], summary="모든 사용자 정보 조회")
 def get_users():
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user")
-        rows = cursor.fetchall()
-        return rows
+        return crud_user.get_users(conn)
     except mysql.connector.Error as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -24,13 +23,22 @@ def get_users():
         conn.close()
 
 
+@router.get("/user/grades/summary", response_model=dict, summary="등급별 사용자 수")
+def get_grade_summary():
+    try:
+        return leaderboard.grade_summary()
+    except mysql.connector.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"등급 분포 조회 중 오류 발생: {e}",
+        )
+
+
 @router.get("/user/{user_id}", response_model=dict, summary="특정 사용자 정보 조회")
 def get_user(user_id: int):
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True, user_id=user_id)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
+        user = crud_user.get_user(conn, user_id)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
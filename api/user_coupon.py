@@ -1,23 +1,28 @@
 
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from typing import List, Optional
 import mysql.connector
+import datetime
+from core.idempotency import IdempotencyConflict, IdempotencyStore
+from core.metrics import Counter, register
 from db.session import get_db_connection
+from crud import crud_user_coupon
 from schemas.user_coupon import UserCouponUpdate
 
 router = APIRouter()
 
+COUPON_REDEEMS = register(Counter("bustar_coupon_redeems_total", "쿠폰 사용 요청 결과", ("result",)))
+# (user_id, Idempotency-Key) -> (상태 코드, 응답 본문 또는 오류 메시지)
+redeem_results = IdempotencyStore("coupon_redeem")
+
 
 @router.get(
     "/user_coupon/", response_model=List[dict], summary="모든 사용자 쿠폰 정보 조회"
 )
 def get_all_user_coupons():
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_coupon")
-        rows = cursor.fetchall()
-        return rows
+        return crud_user_coupon.get_user_coupons(conn)
     except mysql.connector.Error as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -33,14 +38,9 @@ def get_all_user_coupons():
     summary="특정 사용자의 특정 쿠폰 정보 조회",
 )
 def get_user_coupon(user_id: int, coupon_id: int):
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True, user_id=user_id)
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT * FROM user_coupon WHERE id = %s AND coupon_id = %s",
-            (user_id, coupon_id),
-        )
-        user_coupon = cursor.fetchone()
+        user_coupon = crud_user_coupon.get_user_coupon(conn, user_id, coupon_id)
         if user_coupon is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -63,39 +63,19 @@ def get_user_coupon(user_id: int, coupon_id: int):
 def update_user_coupon(
     user_id: int, coupon_id: int, user_coupon_update: UserCouponUpdate
 ):
-    conn = get_db_connection()
+    conn = get_db_connection(user_id=user_id)
     try:
-        cursor = conn.cursor()
-        set_clauses = []
-        params = []
-        if user_coupon_update.start_period is not None:
-            set_clauses.append("start_period = %s")
-            params.append(user_coupon_update.start_period)
-        if user_coupon_update.end_period is not None:
-            set_clauses.append("end_period = %s")
-            params.append(user_coupon_update.end_period)
-        if user_coupon_update.use_can is not None:
-            set_clauses.append("use_can = %s")
-            params.append(user_coupon_update.use_can)
-        if user_coupon_update.use_finish is not None:
-            set_clauses.append("use_finish = %s")
-            params.append(user_coupon_update.use_finish)
-        if user_coupon_update.finish_period is not None:
-            set_clauses.append("finish_period = %s")
-            params.append(user_coupon_update.finish_period)
-
-        if not set_clauses:
+        fields = user_coupon_update.dict(exclude_none=True)
+        if not fields:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="업데이트할 내용이 없습니다.",
             )
 
-        params.extend([user_id, coupon_id])
-        query = f"UPDATE user_coupon SET {', '.join(set_clauses)} WHERE id = %s AND coupon_id = %s"
-        cursor.execute(query, params)
+        updated = crud_user_coupon.update_user_coupon(conn, user_id, coupon_id, fields)
         conn.commit()
 
-        if cursor.rowcount == 0:
+        if updated == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="사용자 쿠폰을 찾을 수 없습니다.",
@@ -108,3 +88,77 @@ def update_user_coupon(
         )
     finally:
         conn.close()
+
+
+# --- 쿠폰 사용 ---
+# 조회 후 PUT 으로 use_can/use_finish 를 바꾸는 대신 조건부 UPDATE 한 번으로 사용 처리합니다.
+# 동시에 여러 번 요청해도 한 번만 성공하고, 같은 Idempotency-Key 로 재시도하면 처음 결과를 그대로 돌려줍니다.
+def _redeem(user_id: int, coupon_id: int) -> tuple:
+    today = datetime.date.today().isoformat()
+    conn = get_db_connection(user_id=user_id)
+    try:
+        if crud_user_coupon.redeem_user_coupon(conn, user_id, coupon_id, today) == 1:
+            conn.commit()
+            redeemed_at = datetime.datetime.now().isoformat(timespec="seconds")
+            return status.HTTP_200_OK, {
+                "message": "쿠폰이 사용 처리되었습니다.",
+                "user_id": user_id,
+                "coupon_id": coupon_id,
+                "redeemed_at": redeemed_at,
+            }
+        conn.rollback()
+        # 갱신되지 않은 이유를 같은(주) DB 에서 확인합니다.
+        user_coupon = crud_user_coupon.get_user_coupon(conn, user_id, coupon_id)
+    finally:
+        conn.close()
+    if user_coupon is None:
+        return status.HTTP_404_NOT_FOUND, "사용자 쿠폰을 찾을 수 없습니다."
+    if user_coupon["use_finish"]:
+        return status.HTTP_409_CONFLICT, "이미 사용한 쿠폰입니다."
+    if user_coupon["finish_period"] or (user_coupon["end_period"] or "9999")[:10] < today:
+        return status.HTTP_410_GONE, "사용 기간이 지난 쿠폰입니다."
+    if (user_coupon["start_period"] or "")[:10] > today:
+        return status.HTTP_409_CONFLICT, "아직 사용 기간이 아닌 쿠폰입니다."
+    return status.HTTP_409_CONFLICT, "사용할 수 없는 쿠폰입니다."
+
+
+@router.post(
+    "/user_coupon/{user_id}/{coupon_id}/redeem",
+    response_model=dict,
+    summary="특정 사용자의 쿠폰 사용 처리 (재시도 안전)",
+)
+def redeem_user_coupon(
+    user_id: int,
+    coupon_id: int,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
+    try:
+        if idempotency_key is None:
+            replayed, (status_code, result) = False, _redeem(user_id, coupon_id)
+        else:
+            replayed, (status_code, result) = redeem_results.run(
+                (user_id, idempotency_key),
+                coupon_id,
+                lambda: _redeem(user_id, coupon_id),
+                store=lambda outcome: outcome[0] < 500,
+            )
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key 가 다른 쿠폰 사용 요청에 이미 쓰였습니다.",
+        )
+    except mysql.connector.Error as e:
+        COUPON_REDEEMS.inc(("error",))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"쿠폰 사용 처리 중 오류 발생: {e}",
+        )
+
+    COUPON_REDEEMS.inc(("replayed" if replayed else str(status_code),))
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    if status_code != status.HTTP_200_OK:
+        raise HTTPException(status_code=status_code, detail=result, headers=headers)
+    if replayed:
+        response.headers.update(headers)
+    return result
@@ -0,0 +1,187 @@
+
+import datetime
+import os
+import random
+from dataclasses import dataclass, asdict
+from db import sqlite_compat
+
+# --- 합성 도시 데이터 생성기 ---
+# 같은 seed 와 규모 설정이면 항상 같은 데이터가 만들어지므로
+# 벤치마크 결과를 커밋 간에 비교할 수 있습니다.
+
+AFFILIATES = ["CU", "GS25", "세븐일레븐", "스타벅스", "이디야", "올리브영", "다이소", "메가커피"]
+BUS_TYPES = ["일반", "좌석", "마을", "급행"]
+NAME_SYLLABLES = "가나다라마바사아자차카타파하강남북동서중산천평장성원미래시청역광장"
+STATION_SUFFIXES = ["정류장", "입구", "사거리", "초등학교", "시장", "아파트", "역", "공원"]
+CITY_CENTER = (36.6424, 127.4890)  # 청주시청 부근 (위도, 경도)
+CITY_SPAN = 0.1  # 중심에서 위도/경도 ±0.1도 범위에 정류장을 흩뿌립니다.
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 2000
+    coupons: int = 200
+    user_coupons_per_user: int = 3
+    buses: int = 60
+    stations: int = 1500
+    route_stops: int = 30
+    trips: int = 40
+    seed: int = 42
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    user_ids: list
+    coupon_ids: list
+    user_coupon_pairs: list
+    bus_numbers: list
+    station_numbers: list
+
+
+def _grade(total_point: int) -> str:
+    if total_point >= 10000:
+        return "플래티넘"
+    elif total_point >= 5000:
+        return "골드"
+    elif total_point >= 1000:
+        return "실버"
+    return "브론즈"
+
+
+def _time(seconds: int) -> datetime.timedelta:
+    return datetime.timedelta(seconds=seconds % 86400)
+
+
+def generate(path: str, spec: DatasetSpec) -> Dataset:
+    rng = random.Random(spec.seed)
+    if os.path.exists(path):
+        os.remove(path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    sqlite_compat.init_schema(path)
+
+    conn = sqlite_compat.connect(path)
+    cursor = conn.cursor()
+    try:
+        # 사용자 / 포인트 / 이용 통계
+        users, points, records = [], [], []
+        for user_id in range(1, spec.users + 1):
+            total_point = rng.randint(0, 15000)
+            point = rng.randint(0, total_point) if total_point else 0
+            joined = datetime.date(2023, 1, 1) + datetime.timedelta(days=rng.randint(0, 700))
+            users.append((user_id, f"사용자{user_id}", joined.isoformat(), _grade(total_point)))
+            points.append((user_id, point, total_point - point, rng.randint(0, 500), total_point))
+            total_use = rng.randint(0, 400)
+            records.append((user_id, total_use, rng.randint(0, min(total_use, 60)), rng.randint(0, 20000)))
+        cursor.executemany("INSERT INTO user (id, name, date, grade) VALUES (%s, %s, %s, %s)", users)
+        cursor.executemany(
+            "INSERT INTO point (id, point, use_point, plus_point, total_point) VALUES (%s, %s, %s, %s, %s)",
+            points,
+        )
+        cursor.executemany(
+            "INSERT INTO usage_record (id, total_use, month_use, saved) VALUES (%s, %s, %s, %s)",
+            records,
+        )
+
+        # 쿠폰 / 사용자 쿠폰
+        coupons = []
+        for coupon_id in range(1, spec.coupons + 1):
+            affiliate = rng.choice(AFFILIATES)
+            coupons.append(
+                (
+                    coupon_id,
+                    f"{affiliate} {rng.choice([1000, 2000, 3000, 5000])}원 할인권",
+                    rng.randrange(500, 20001, 100),
+                    rng.choice([5, 10, 15, 20, 30, 50]),
+                    affiliate,
+                    f"{rng.choice([1, 3, 6, 12])}개월",
+                )
+            )
+        cursor.executemany(
+            "INSERT INTO coupon (coupon_id, coupon_name, coupon_price, coupon_discount, coupon_affiliate, coupon_period) VALUES (%s, %s, %s, %s, %s, %s)",
+            coupons,
+        )
+        pairs = []
+        today = datetime.date(2025, 1, 1)
+        for user_id in range(1, spec.users + 1):
+            k = min(spec.user_coupons_per_user, spec.coupons)
+            for coupon_id in rng.sample(range(1, spec.coupons + 1), k):
+                start = today + datetime.timedelta(days=rng.randint(0, 180))
+                pairs.append(
+                    (
+                        user_id,
+                        coupon_id,
+                        start.isoformat(),
+                        (start + datetime.timedelta(days=180)).isoformat(),
+                        1,
+                        0,
+                        0,
+                    )
+                )
+        cursor.executemany(
+            "INSERT INTO user_coupon (id, coupon_id, start_period, end_period, use_can, use_finish, finish_period) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            pairs,
+        )
+
+        # 정류장 / 버스 / 노선 / 시간표
+        # 좌표는 별도 난수열로 만들어 기존 데이터(이름/노선 등)가 바뀌지 않게 합니다.
+        geo_rng = random.Random(spec.seed + 1)
+        station_numbers = list(range(10001, 10001 + spec.stations))
+        stations = []
+        for number in station_numbers:
+            stem = "".join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 4)))
+            latitude = round(CITY_CENTER[0] + geo_rng.uniform(-CITY_SPAN, CITY_SPAN), 6)
+            longitude = round(CITY_CENTER[1] + geo_rng.uniform(-CITY_SPAN, CITY_SPAN), 6)
+            stations.append((number, f"{stem}{rng.choice(STATION_SUFFIXES)}"[:50], latitude, longitude))
+        cursor.executemany(
+            "INSERT INTO station (station_number, station_name, latitude, longitude) VALUES (%s, %s, %s, %s)",
+            stations,
+        )
+
+        bus_numbers = sorted(rng.sample(range(100, 1000), spec.buses))
+        cursor.executemany(
+            "INSERT INTO bus (bus_number, bus_type) VALUES (%s, %s)",
+            [(number, rng.choice(BUS_TYPES)) for number in bus_numbers],
+        )
+
+        routes, times = [], []
+        stops = min(spec.route_stops, spec.stations)
+        for number in bus_numbers:
+            path = rng.sample(station_numbers, stops)
+            for direction, ordered in (("up", path), ("down", list(reversed(path)))):
+                for order, station_number in enumerate(ordered, start=1):
+                    routes.append((number, direction, station_number, order))
+            duration = stops * rng.randint(90, 150)
+            first, last = 5 * 3600 + 30 * 60, 23 * 3600
+            step = max((last - first) // max(spec.trips, 1), 60)
+            for direction in ("up", "down"):
+                for trip in range(spec.trips):
+                    start = first + trip * step + rng.randint(0, 59)
+                    times.append((number, direction, _time(start), _time(start + duration)))
+        cursor.executemany(
+            "INSERT INTO bus_route (bus_number, direction, station_number, station_order) VALUES (%s, %s, %s, %s)",
+            routes,
+        )
+        cursor.executemany(
+            "INSERT INTO bus_time (bus_number, direction, start_time, arrive_time) VALUES (%s, %s, %s, %s)",
+            times,
+        )
+
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    return Dataset(
+        spec=spec,
+        user_ids=list(range(1, spec.users + 1)),
+        coupon_ids=list(range(1, spec.coupons + 1)),
+        user_coupon_pairs=[(p[0], p[1]) for p in pairs],
+        bus_numbers=bus_numbers,
+        station_numbers=station_numbers,
+    )
@@ -0,0 +1,224 @@
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from bench.datagen import DatasetSpec, generate
+from bench.run import percentile
+
+# --- 실시간 구독(SSE/WebSocket) 부하 테스트 ---
+# 합성 데이터로 uvicorn 서버를 별도 프로세스로 띄우고, 여러 주제에 구독자를 수천 명 붙인 뒤
+# 관리자 발행 엔드포인트로 메시지를 보내 전달률과 발행 -> 수신 지연(p50/p95/p99)을 잽니다.
+# --slow 로 읽지 않는 구독자를 섞어 느린 구독자가 다른 구독자를 막지 않는지 확인합니다.
+#
+#   python -m bench.live_load --subscribers 2000 --topics 20 --messages 20
+#   python -m bench.live_load --subscribers 20 --topics 2 --slow 10 --messages 600 --interval 0.001 --payload-bytes 65536
+#
+# 느린 구독자는 커널 소켓 버퍼가 찬 뒤에야 밀리므로 두 번째 예처럼 큰 메시지를 보내야 드러납니다.
+# 구독자 수가 많으면 열린 파일 수 제한(ulimit -n)을 늘려야 합니다.
+
+ADMIN_TOKEN = "bench-live"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.connected = 0
+        self.failed = 0
+
+
+async def ws_subscriber(url, stats, ready, stop):
+    import websockets
+
+    try:
+        async with websockets.connect(url, max_queue=None) as ws:
+            stats.connected += 1
+            ready.release()
+            while not stop.is_set():
+                message = json.loads(await ws.recv())
+                if message.get("event") == "bench":
+                    stats.latencies.append(time.time() - message["data"]["sent_at"])
+    except Exception:
+        if not stop.is_set():
+            stats.failed += 1
+            ready.release()
+
+
+async def slow_subscriber(host, port, path, websocket, stats, ready, stop):
+    # 클라이언트 라이브러리는 소켓을 계속 읽어 버퍼에 쌓으므로, 직접 연결해 응답 헤더만 읽고 멈춥니다.
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        headers = f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+        if websocket:
+            key = base64.b64encode(os.urandom(16)).decode()
+            headers += f"Upgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n"
+        writer.write((headers + "\r\n").encode())
+        await reader.readuntil(b"\r\n\r\n")
+        stats.connected += 1
+        ready.release()
+        await stop.wait()
+        writer.close()
+    except Exception:
+        if not stop.is_set():
+            stats.failed += 1
+            ready.release()
+
+
+async def sse_subscriber(client, url, stats, ready, stop):
+    try:
+        async with client.stream("GET", url) as response:
+            stats.connected += 1
+            ready.release()
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[7:]
+                elif line.startswith("data: ") and event == "bench":
+                    stats.latencies.append(time.time() - json.loads(line[6:])["sent_at"])
+                if stop.is_set():
+                    break
+    except Exception:
+        if not stop.is_set():
+            stats.failed += 1
+            ready.release()
+
+
+async def run(args, port):
+    import httpx
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(30.0, read=None)
+    stats, slow_stats = Stats(), Stats()
+    stop = asyncio.Event()
+    tasks = []
+
+    base_url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        total = args.subscribers + args.slow
+        for start in range(0, total, args.batch):
+            ready = asyncio.Semaphore(0)
+            batch = range(start, min(total, start + args.batch))
+            for i in batch:
+                topic = f"bus/{1000 + i % args.topics}"
+                websocket = i % 100 < args.ws_percent
+                path = f"/api/live/{topic}/ws" if websocket else f"/api/live/{topic}/events"
+                if i >= args.subscribers:
+                    coro = slow_subscriber("127.0.0.1", port, path, websocket, slow_stats, ready, stop)
+                elif websocket:
+                    coro = ws_subscriber(f"ws://127.0.0.1:{port}{path}", stats, ready, stop)
+                else:
+                    coro = sse_subscriber(client, path, stats, ready, stop)
+                tasks.append(asyncio.create_task(coro))
+            for _ in batch:
+                await ready.acquire()
+        print(
+            f"구독 {stats.connected + slow_stats.connected}/{total} 연결 ({time.perf_counter() - started:.2f}s), "
+            f"실패 {stats.failed + slow_stats.failed}"
+        )
+
+        headers = {"X-Admin-Token": ADMIN_TOKEN}
+        padding = "x" * args.payload_bytes
+        publish_latencies = []
+        for n in range(args.messages):
+            for t in range(args.topics):
+                sent = time.perf_counter()
+                response = await client.post(
+                    f"/api/live/bus/{1000 + t}",
+                    params={"event": "bench"},
+                    json={"sent_at": time.time(), "n": n, "padding": padding},
+                    headers=headers,
+                )
+                response.raise_for_status()
+                publish_latencies.append(time.perf_counter() - sent)
+            await asyncio.sleep(args.interval)
+        await asyncio.sleep(args.drain)
+
+        metrics = (await client.get("/metrics")).text
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    expected = stats.connected * args.messages
+    latencies = sorted(stats.latencies)
+    publish_latencies.sort()
+    print(f"발행 요청: {len(publish_latencies)}건 p50={percentile(publish_latencies, 50) * 1000:.2f}ms "
+          f"p99={percentile(publish_latencies, 99) * 1000:.2f}ms")
+    print(f"전달: {len(latencies)}/{expected} ({len(latencies) / max(1, expected):.1%})")
+    if latencies:
+        print(
+            f"발행 -> 수신 지연: p50={percentile(latencies, 50) * 1000:.2f}ms "
+            f"p95={percentile(latencies, 95) * 1000:.2f}ms p99={percentile(latencies, 99) * 1000:.2f}ms "
+            f"max={latencies[-1] * 1000:.2f}ms"
+        )
+    if args.slow:
+        print(f"느린 구독자: {slow_stats.connected}명 연결 (끊김 수는 bustar_live_slow_disconnects_total)")
+    for line in metrics.splitlines():
+        if line.startswith("bustar_live_"):
+            print(f"  {line}")
+    return 0 if stats.failed == 0 else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bustar 실시간 구독 부하 테스트")
+    parser.add_argument("--db", default="bench_bustar.db", help="SQLite 대체 DB 파일 경로")
+    parser.add_argument("--subscribers", type=int, default=2000, help="정상 구독자 수")
+    parser.add_argument("--slow", type=int, default=0, help="읽지 않는 구독자 수")
+    parser.add_argument("--topics", type=int, default=20, help="구독 주제(버스) 수")
+    parser.add_argument("--messages", type=int, default=20, help="주제별 발행 메시지 수")
+    parser.add_argument("--interval", type=float, default=0.05, help="발행 간격 (초)")
+    parser.add_argument("--ws-percent", type=int, default=50, help="WebSocket 구독자 비율 (나머지는 SSE)")
+    parser.add_argument("--batch", type=int, default=200, help="한 번에 연결할 구독자 수")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="메시지에 덧붙일 크기 (소켓 버퍼를 채우는 데 사용)")
+    parser.add_argument("--drain", type=float, default=1.0, help="마지막 발행 후 기다리는 시간 (초)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    generate(args.db, DatasetSpec(buses=max(args.topics, DatasetSpec().buses)))
+
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DB_BACKEND="sqlite",
+        DB_SQLITE_PATH=os.path.abspath(args.db),
+        ADMIN_TOKEN=ADMIN_TOKEN,
+        SLOW_QUERY_MS="0",
+        # 측정 중에는 주기적인 도착 정보 계산이 끼어들지 않도록 합니다.
+        LIVE_TICK_SECONDS="3600",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            print("서버가 시작되지 않았습니다.")
+            return 1
+        return asyncio.run(run(args, port))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from bench.datagen import DatasetSpec, generate
+from bench.run import percentile
+
+# --- 쿠폰 사용(redeem) 동시성 스트레스 테스트 ---
+# 합성 데이터로 uvicorn 서버를 별도 프로세스로 띄우고 세 가지 경우를 동시에 요청해 결과를 확인합니다.
+#   경합:   쿠폰 하나에 서로 다른 Idempotency-Key 로 동시에 사용 요청 -> 정확히 한 번만 200, 나머지 409
+#   재시도: 쿠폰 하나에 같은 Idempotency-Key 로 동시에/여러 번 요청 -> 모두 같은 200 응답, DB 갱신은 한 번
+#   비교:   기존 방식(GET 후 PUT 으로 use_finish 변경)을 동시에 실행 -> 같은 쿠폰을 여러 번 "사용"한 횟수
+# 마지막에 DB 에서 사용 처리된 쿠폰 수가 200 응답 수와 같은지 확인하고, 어긋나면 종료 코드 1 입니다.
+#
+#   python -m bench.redeem_stress --coupons 200 --clients 16
+#   python -m bench.redeem_stress --workers 4     # 여러 워커: 재시도 결과 저장소는 워커별이라 재시도 일치 검사는 참고용
+#
+# 합성 데이터의 쿠폰 사용 기간은 과거이므로, 테스트에 쓸 사용자 쿠폰은 오늘부터 사용 가능하게 바꿔 둡니다.
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare(db_path: str, pairs: list):
+    today = datetime.date.today()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "UPDATE user_coupon SET start_period = ?, end_period = ?, use_can = 1, use_finish = 0, finish_period = 0 "
+            "WHERE id = ? AND coupon_id = ?",
+            [(today.isoformat(), (today + datetime.timedelta(days=30)).isoformat(), u, c) for u, c in pairs],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def used_count(db_path: str, pairs: list) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return sum(
+            conn.execute("SELECT use_finish FROM user_coupon WHERE id = ? AND coupon_id = ?", pair).fetchone()[0]
+            for pair in pairs
+        )
+    finally:
+        conn.close()
+
+
+async def redeem(client, pair, key, latencies):
+    user_id, coupon_id = pair
+    headers = {"Idempotency-Key": key} if key else {}
+    started = time.perf_counter()
+    response = await client.post(f"/api/user_coupon/{user_id}/{coupon_id}/redeem", headers=headers)
+    latencies.append(time.perf_counter() - started)
+    return response.status_code, response.json(), response.headers.get("Idempotent-Replayed") == "true"
+
+
+async def read_modify_write(client, pair):
+    # 기존 방식: 조회해서 사용 전이면 PUT 으로 사용 처리 (조회와 갱신 사이에 다른 요청이 끼어들 수 있음)
+    user_id, coupon_id = pair
+    current = (await client.get(f"/api/user_coupon/{user_id}/{coupon_id}")).json()
+    if current["use_finish"]:
+        return False
+    response = await client.put(
+        f"/api/user_coupon/{user_id}/{coupon_id}", json={"use_can": 0, "use_finish": 1}
+    )
+    return response.status_code == 200
+
+
+async def run(args, port, contended, retried, legacy):
+    import httpx
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    latencies = []
+    failures = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30.0) as client:
+        started = time.perf_counter()
+
+        async def contend(pair):
+            results = await asyncio.gather(
+                *(redeem(client, pair, uuid.uuid4().hex, latencies) for _ in range(args.clients))
+            )
+            codes = sorted(code for code, _, _ in results)
+            if codes.count(200) != 1 or any(code not in (200, 409) for code in codes):
+                failures.append(f"경합 {pair}: {codes}")
+            return codes.count(200)
+
+        async def retry(pair):
+            key = uuid.uuid4().hex
+            results = await asyncio.gather(*(redeem(client, pair, key, latencies) for _ in range(args.clients)))
+            # 처음 요청이 끝난 뒤의 재시도
+            results += [await redeem(client, pair, key, latencies) for _ in range(args.retries)]
+            bodies = {(code, str(body)) for code, body, _ in results}
+            if len(bodies) != 1 or results[0][0] != 200:
+                failures.append(f"재시도 {pair}: 응답 {len(bodies)}종 {sorted(bodies)[:2]}")
+            return sum(1 for _, _, replayed in results if replayed)
+
+        async def legacy_rmw(pair):
+            results = await asyncio.gather(*(read_modify_write(client, pair) for _ in range(args.clients)))
+            return sum(results)
+
+        parallel = asyncio.Semaphore(args.parallel)
+
+        async def limited(coro):
+            async with parallel:
+                return await coro
+
+        contended_ok = await asyncio.gather(*(limited(contend(pair)) for pair in contended))
+        replays = await asyncio.gather(*(limited(retry(pair)) for pair in retried))
+        legacy_ok = await asyncio.gather(*(limited(legacy_rmw(pair)) for pair in legacy))
+        elapsed = time.perf_counter() - started
+        metrics = (await client.get("/metrics")).text
+
+    latencies.sort()
+    requests = len(latencies)
+    print(
+        f"사용 요청 {requests}건 ({elapsed:.2f}s, {requests / elapsed:.1f} req/s) "
+        f"p50={percentile(latencies, 50) * 1000:.2f}ms p99={percentile(latencies, 99) * 1000:.2f}ms"
+    )
+    print(f"경합: 쿠폰 {len(contended)}개 x {args.clients}명 -> 성공 {sum(contended_ok)}건 (기대 {len(contended)})")
+    print(
+        f"재시도: 쿠폰 {len(retried)}개 x ({args.clients} 동시 + {args.retries} 순차) -> "
+        f"저장된 결과로 응답 {sum(replays)}건"
+    )
+    double_spent = sum(1 for ok in legacy_ok if ok > 1)
+    print(
+        f"비교(GET 후 PUT): 쿠폰 {len(legacy)}개 -> 성공 {sum(legacy_ok)}건, "
+        f"두 번 이상 사용된 쿠폰 {double_spent}개"
+    )
+
+    used = used_count(args.db, contended + retried)
+    print(f"DB 사용 처리: {used}/{len(contended) + len(retried)}")
+    if used != len(contended) + len(retried) or sum(contended_ok) != len(contended):
+        failures.append(f"DB 사용 처리 수 {used}, 경합 성공 {sum(contended_ok)}")
+    for line in metrics.splitlines():
+        if line.startswith(("bustar_coupon_redeems_total", "bustar_idempotency_")):
+            print(f"  {line}")
+    for failure in failures[:20]:
+        print(f"실패: {failure}")
+    return 1 if failures else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bustar 쿠폰 사용 동시성 스트레스 테스트")
+    parser.add_argument("--db", default="bench_bustar.db", help="SQLite 대체 DB 파일 경로")
+    parser.add_argument("--coupons", type=int, default=100, help="경우마다 사용할 사용자 쿠폰 수")
+    parser.add_argument("--clients", type=int, default=16, help="쿠폰마다 동시에 보내는 요청 수")
+    parser.add_argument("--parallel", type=int, default=8, help="동시에 요청하는 쿠폰 수")
+    parser.add_argument("--retries", type=int, default=3, help="재시도 경우에서 끝난 뒤 다시 보내는 요청 수")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dataset = generate(args.db, DatasetSpec(seed=args.seed))
+    pairs = random.Random(args.seed).sample(dataset.user_coupon_pairs, 3 * args.coupons)
+    contended, retried, legacy = (pairs[i * args.coupons : (i + 1) * args.coupons] for i in range(3))
+    prepare(args.db, pairs)
+
+    port = _free_port()
+    # 정확성 검사이므로 부하 차단(503)은 끕니다.
+    env = dict(
+        os.environ,
+        DB_BACKEND="sqlite",
+        DB_SQLITE_PATH=os.path.abspath(args.db),
+        SLOW_QUERY_MS="0",
+        ADMISSION_ENABLED="0",
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(port), "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            print("서버가 시작되지 않았습니다.")
+            return 1
+        return asyncio.run(run(args, port, contended, retried, legacy))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from urllib.parse import urlencode
+from bench.datagen import AFFILIATES, CITY_CENTER, CITY_SPAN, NAME_SYLLABLES, DatasetSpec, generate
+
+# --- 엔드포인트 벤치마크 ---
+# 합성 데이터를 SQLite 대체 DB 에 만들고 main.py 의 모든 라우터를
+# 프로세스 안에서(httpx ASGITransport) 동시 클라이언트로 호출해
+# 엔드포인트별 p50/p95/p99 지연, 처리량, 요청당 DB 쿼리/조회 행 수를 보고합니다.
+#
+#   python -m bench.run                          # 결과 출력
+#   python -m bench.run --save-baseline base.json
+#   python -m bench.run --compare base.json      # 회귀 시 종료 코드 1
+
+
+def _body_factories(dataset, rng):
+    # 쓰기 엔드포인트별 요청 본문 생성기
+    return {
+        ("POST", "/api/point/"): lambda params: {
+            "id": rng.choice(dataset.user_ids),
+            "point": 0,
+            "total_point": 0,
+        },
+        ("PUT", "/api/point/{user_id}"): lambda params: {
+            "total_point": rng.randint(0, 15000),
+        },
+        ("PUT", "/api/user_coupon/{user_id}/{coupon_id}"): lambda params: {
+            "use_can": 1,
+        },
+        ("POST", "/api/recent_move/"): lambda params: {
+            "member_id": rng.choice(dataset.user_ids),
+            "origin": f"정류장{rng.randint(1, 50)}",
+            "destination": f"정류장{rng.randint(1, 50)}",
+        },
+        ("POST", "/api/purchase/product/"): lambda params: {
+            "user_id": rng.choice(dataset.user_ids),
+            "product_amount": rng.randint(1, 10),
+        },
+    }
+
+
+def _query_factories(rng):
+    # 필수 쿼리 파라미터가 있거나 조건을 바꿔 가며 호출할 엔드포인트별 쿼리 생성기
+    return {
+        ("GET", "/api/coupon/search"): lambda: {
+            k: v
+            for k, v in {
+                "affiliate": rng.choice([None, rng.choice(AFFILIATES)]),
+                "min_price": rng.choice([None, 1000, 5000]),
+                "max_price": rng.choice([None, 10000, 20000]),
+                "min_discount": rng.choice([None, 10, 30]),
+                "sort": rng.choice(["price_asc", "price_desc", "discount_desc", "latest"]),
+            }.items()
+            if v is not None
+        },
+        ("GET", "/api/stations/nearby"): lambda: {
+            "lat": CITY_CENTER[0] + rng.uniform(-CITY_SPAN, CITY_SPAN),
+            "lon": CITY_CENTER[1] + rng.uniform(-CITY_SPAN, CITY_SPAN),
+            "include_routes": rng.choice(["true", "false"]),
+        },
+        ("GET", "/api/stations/search"): lambda: {
+            "q": rng.choice([rng.choice(NAME_SYLLABLES), "".join(rng.sample(NAME_SYLLABLES, 2)), "ㄱㄴ", "ㅅㅊ"]),
+        },
+    }
+
+
+def _param_pools(dataset):
+    return {
+        "user_id": dataset.user_ids,
+        "coupon_id": dataset.coupon_ids,
+        "bus_number": dataset.bus_numbers,
+        "station_number": dataset.station_numbers,
+    }
+
+
+def build_scenarios(app, dataset, seed):
+    # 라우터 구현에 의존하지 않도록 OpenAPI 스키마에서 엔드포인트 목록을 얻습니다.
+    rng = random.Random(seed)
+    pools = _param_pools(dataset)
+    bodies = _body_factories(dataset, rng)
+    queries = _query_factories(rng)
+    scenarios, skipped = [], []
+
+    for path, operations in app.openapi()["paths"].items():
+        for method, operation in sorted(operations.items()):
+            method = method.upper()
+            name = f"{method} {path}"
+            params = [p["name"] for p in operation.get("parameters", []) if p["in"] == "path"]
+            if method != "GET" and (method, path) not in bodies:
+                skipped.append(f"{name} (요청 본문 생성기 없음)")
+                continue
+            if any(p not in pools for p in params):
+                skipped.append(f"{name} (경로 파라미터 값 없음)")
+                continue
+            required_query = [
+                p["name"] for p in operation.get("parameters", []) if p["in"] == "query" and p.get("required")
+            ]
+            if required_query and (method, path) not in queries:
+                skipped.append(f"{name} (쿼리 파라미터 생성기 없음)")
+                continue
+
+            def make(path=path, method=method, params=params):
+                if set(params) == {"user_id", "coupon_id"}:
+                    user_id, coupon_id = rng.choice(dataset.user_coupon_pairs)
+                    values = {"user_id": user_id, "coupon_id": coupon_id}
+                else:
+                    values = {p: rng.choice(pools[p]) for p in params}
+                body = bodies[(method, path)](values) if method != "GET" else None
+                url = path.format(**values)
+                if (method, path) in queries:
+                    url += "?" + urlencode(queries[(method, path)]())
+                return method, url, body
+
+            scenarios.append((name, make))
+    return scenarios, skipped
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # nearest-rank 방식
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, make, requests, concurrency):
+    from core.metrics import RequestStats, current_stats
+
+    latencies, queries, rows, statuses = [], [], [], {}
+    remaining = [requests]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            method, path, body = make()
+            # MetricsMiddleware 는 이미 설정된 RequestStats 를 그대로 사용하므로 요청별 DB 통계를 읽을 수 있습니다.
+            stats = RequestStats()
+            token = current_stats.set(stats)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+            finally:
+                current_stats.reset(token)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(stats.queries)
+            rows.append(stats.rows)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0.0,
+        "rows_per_request": round(sum(rows) / len(rows), 1) if rows else 0.0,
+        "status": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def run(args):
+    import httpx
+    from main import app
+
+    spec = DatasetSpec(
+        users=args.users,
+        coupons=args.coupons,
+        user_coupons_per_user=args.user_coupons,
+        buses=args.buses,
+        stations=args.stations,
+        route_stops=args.route_stops,
+        trips=args.trips,
+        seed=args.seed,
+    )
+    started = time.perf_counter()
+    dataset = generate(args.db, spec)
+    print(f"합성 데이터 생성 완료 ({time.perf_counter() - started:.2f}s): {spec.as_dict()}")
+
+    scenarios, skipped = build_scenarios(app, dataset, args.seed)
+    if args.only:
+        scenarios = [s for s in scenarios if args.only in s[0]]
+    for name in skipped:
+        print(f"건너뜀: {name}")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    headers = {"X-Admin-Token": os.environ["ADMIN_TOKEN"]}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for name, make in scenarios:
+            await run_scenario(client, make, args.warmup, 1)
+            results[name] = await run_scenario(client, make, args.requests, args.concurrency)
+            r = results[name]
+            print(
+                f"{name:<50} p50={r['p50_ms']:>8.2f}ms p95={r['p95_ms']:>8.2f}ms "
+                f"p99={r['p99_ms']:>8.2f}ms {r['rps']:>8.1f} req/s "
+                f"queries={r['queries_per_request']:<5} status={r['status']}"
+            )
+
+    return {"spec": spec.as_dict(), "concurrency": args.concurrency, "results": results}
+
+
+def compare(report, baseline, threshold):
+    # p95 지연이 threshold 비율 이상 늘었거나 요청당 쿼리 수가 늘어난 엔드포인트를 회귀로 판단합니다.
+    regressions = []
+    if baseline.get("spec") != report["spec"]:
+        print("경고: 기준 결과와 데이터셋 설정이 다릅니다. 비교 결과가 정확하지 않을 수 있습니다.")
+    for name, current in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["queries_per_request"] > base["queries_per_request"]:
+            regressions.append(
+                f"{name}: 쿼리 수 {base['queries_per_request']} -> {current['queries_per_request']}"
+            )
+    return regressions
+
+
+def parse_args(argv=None):
+    spec = DatasetSpec()
+    parser = argparse.ArgumentParser(description="Bustar API 엔드포인트 벤치마크")
+    parser.add_argument("--db", default="bench_bustar.db", help="SQLite 대체 DB 파일 경로")
+    parser.add_argument("--users", type=int, default=spec.users)
+    parser.add_argument("--coupons", type=int, default=spec.coupons)
+    parser.add_argument("--user-coupons", type=int, default=spec.user_coupons_per_user)
+    parser.add_argument("--buses", type=int, default=spec.buses)
+    parser.add_argument("--stations", type=int, default=spec.stations)
+    parser.add_argument("--route-stops", type=int, default=spec.route_stops)
+    parser.add_argument("--trips", type=int, default=spec.trips, help="버스/방향별 운행 횟수")
+    parser.add_argument("--seed", type=int, default=spec.seed)
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트별 요청 수")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", help="이름에 이 문자열이 포함된 엔드포인트만 실행")
+    parser.add_argument("--save-baseline", help="결과를 기준 파일(JSON)로 저장")
+    parser.add_argument("--compare", help="기준 파일(JSON)과 비교")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 p95 증가 비율")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # main.py 를 import 하기 전에 대체 DB 를 사용하도록 설정해야 합니다.
+    os.environ["DB_BACKEND"] = "sqlite"
+    os.environ["DB_SQLITE_PATH"] = os.path.abspath(args.db)
+    # 느린 쿼리 로그 출력이 측정에 섞이지 않도록 기본으로 끕니다.
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+    # 운영용 엔드포인트(/api/admin/...)도 측정하도록 관리자 토큰을 정해 둡니다.
+    os.environ.setdefault("ADMIN_TOKEN", "bench-admin")
+
+    report = asyncio.run(run(args))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"기준 결과 저장: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("성능 회귀 발견:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("기준 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
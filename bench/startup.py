@@ -0,0 +1,133 @@
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from bench.datagen import DatasetSpec, generate
+
+# --- 워커 시작 시간 벤치마크 ---
+# 합성 데이터로 uvicorn 을 여러 번 새로 띄워 프로세스 시작부터
+#   연결 수락 -> /healthz 200 -> /readyz 200(시작 준비 완료)
+# 까지 걸린 시간과, 준비 직후 자주 쓰는 엔드포인트의 첫 요청 지연을 잽니다.
+# /readyz 에 담긴 단계별 시간(services/warmup.py)의 중앙값도 보여 줍니다.
+# 준비 완료 시간 중앙값이 --budget 을 넘으면 종료 코드 1 이므로 배포 전 확인에 씁니다.
+#
+#   python -m bench.startup --runs 5 --budget 3
+#   python -m bench.startup --runs 5 --cold      # 시작 준비를 끈 경우(STARTUP_WARMUP=0)와 첫 요청 지연 비교
+
+PROBES = (
+    "/api/coupon/search?min_price=0",
+    "/api/stations/search?q=%EC%A0%95",
+    "/api/stations/nearby?lat=36.6424&lon=127.489&radius=1000",
+    "/api/bus_times/",
+    "/api/point/leaderboard?limit=10",
+    "/api/bus_times/analytics",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot_once(args, warm: bool) -> dict:
+    import httpx
+
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DB_BACKEND="sqlite",
+        DB_SQLITE_PATH=os.path.abspath(args.db),
+        SLOW_QUERY_MS="0",
+        STARTUP_WARMUP="1" if warm else "0",
+    )
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    result = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=10.0) as client:
+            deadline = started + args.timeout
+            while "ready" not in result:
+                if time.perf_counter() > deadline or server.poll() is not None:
+                    raise RuntimeError("서버가 준비되지 않았습니다.")
+                try:
+                    if "accept" not in result:
+                        socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                        result["accept"] = time.perf_counter() - started
+                    if "healthz" not in result and client.get("/healthz").status_code == 200:
+                        result["healthz"] = time.perf_counter() - started
+                    response = client.get("/readyz")
+                    if response.status_code == 200:
+                        result["ready"] = time.perf_counter() - started
+                        result["phases"] = {
+                            name: phase["ms"] for name, phase in response.json()["phases"].items()
+                        }
+                        break
+                except (OSError, httpx.TransportError):
+                    pass
+                time.sleep(args.poll)
+
+            result["first_request"] = {}
+            for path in PROBES:
+                sent = time.perf_counter()
+                client.get(path)
+                result["first_request"][path] = time.perf_counter() - sent
+    finally:
+        server.terminate()
+        server.wait()
+    return result
+
+
+def report(label: str, runs: list) -> float:
+    print(f"[{label}] {len(runs)}회")
+    for key in ("accept", "healthz", "ready"):
+        values = sorted(run[key] for run in runs)
+        print(f"  {key:<8} p50={statistics.median(values) * 1000:8.1f}ms max={values[-1] * 1000:8.1f}ms")
+    phases = {}
+    for run in runs:
+        for name, ms in run.get("phases", {}).items():
+            phases.setdefault(name, []).append(ms)
+    if phases:
+        print("  단계별 (중앙값): " + ", ".join(f"{name}={statistics.median(v):.1f}ms" for name, v in phases.items()))
+    for path in PROBES:
+        values = sorted(run["first_request"][path] for run in runs)
+        print(f"  첫 요청 {path:<58} p50={statistics.median(values) * 1000:8.2f}ms")
+    return statistics.median(run["ready"] for run in runs)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bustar 워커 시작 시간 벤치마크")
+    parser.add_argument("--db", default="bench_bustar.db", help="SQLite 대체 DB 파일 경로")
+    parser.add_argument("--runs", type=int, default=5, help="서버를 새로 띄우는 횟수")
+    parser.add_argument("--budget", type=float, default=3.0, help="준비 완료 시간 중앙값 목표 (초)")
+    parser.add_argument("--cold", action="store_true", help="시작 준비를 끈 경우도 측정해 비교")
+    parser.add_argument("--timeout", type=float, default=60.0, help="한 번 띄울 때 기다리는 최대 시간 (초)")
+    parser.add_argument("--poll", type=float, default=0.01, help="상태 확인 간격 (초)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    generate(args.db, DatasetSpec())
+
+    ready = report("시작 준비", [boot_once(args, warm=True) for _ in range(args.runs)])
+    if args.cold:
+        report("시작 준비 끔", [boot_once(args, warm=False) for _ in range(args.runs)])
+
+    if ready > args.budget:
+        print(f"준비 완료 시간 중앙값 {ready:.2f}s 가 목표 {args.budget:.2f}s 를 넘었습니다.")
+        return 1
+    print(f"준비 완료 시간 중앙값 {ready:.2f}s (목표 {args.budget:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
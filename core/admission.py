@@ -0,0 +1,231 @@
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+
+from core.metrics import Counter, Gauge, register
+
+# --- 요청 수락 제어(admission control) 및 부하 차단 ---
+# 규칙(경로 접두사 + 메서드)마다 동시 처리 한도와 대기열 길이를 두고,
+# 한도를 넘으면 대기열에서 잠시 기다리게 하며, 대기열이 차거나 기다리는 시간이 길면
+# 쌓아 두지 않고 바로 503 + Retry-After 로 돌려보냅니다.
+#
+# 동시 처리 한도는 관측한 지연 시간으로 조정합니다. (AIMD)
+#   최근 지연(short EWMA)이 평소 지연(long EWMA)보다 ADMISSION_TOLERANCE 배 이상 길어지면 한도를 줄이고,
+#   한도까지 꽉 차서 처리 중인데 지연이 정상이면 조금씩 늘립니다. (설정 값이 최대치)
+# 읽기 규칙(priority)에 대기 중인 요청이 있으면 쓰기 규칙은 한도의 절반만 쓰도록 해서 읽기를 우선합니다.
+#
+#   ADMISSION_ENABLED        0 이면 비활성화 (기본 1)
+#   ADMISSION_LIMITS         규칙별 "동시 처리 한도/대기열 길이" 재정의, 예) "purchase=4/4,read=64/128"
+#   ADMISSION_QUEUE_TIMEOUT  대기열에서 기다리는 최대 시간 (초, 기본 1)
+#   ADMISSION_ADAPTIVE       0 이면 한도를 고정 (기본 1)
+#   ADMISSION_TOLERANCE      한도를 줄이기 시작하는 지연 배율 (기본 2)
+#
+# 실시간 구독(/api/live/)처럼 오래 열려 있는 연결은 동시 처리 한도를 차지하지 않도록 제외합니다.
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_LIMITS = os.environ.get("ADMISSION_LIMITS", "")
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "1"))
+ADMISSION_ADAPTIVE = os.environ.get("ADMISSION_ADAPTIVE", "1") == "1"
+ADMISSION_TOLERANCE = float(os.environ.get("ADMISSION_TOLERANCE", "2"))
+
+EXEMPT_PREFIXES = ("/api/live/",)
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+READ_METHODS = ("GET", "HEAD")
+
+ADMISSION_REQUESTS = register(
+    Counter("bustar_admission_requests_total", "요청 수락/차단 수", ("rule", "outcome"))
+)
+ADMISSION_LIMIT = register(Gauge("bustar_admission_limit", "현재 동시 처리 한도", ("rule",)))
+ADMISSION_IN_FLIGHT = register(Gauge("bustar_admission_in_flight", "처리 중인 요청 수", ("rule",)))
+ADMISSION_QUEUED = register(Gauge("bustar_admission_queued", "대기 중인 요청 수", ("rule",)))
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionRule:
+    # 이벤트 루프 스레드에서만 사용하므로 잠금이 필요 없습니다.
+    def __init__(self, name: str, prefix: str, methods: tuple, limit: int, queue: int, priority: bool = False):
+        self.name = name
+        self.prefix = prefix
+        self.methods = methods
+        self.priority = priority
+        self.configure(limit, queue)
+        self.in_flight = 0
+        self.waiters = deque()
+        self.short_latency = None
+        self.long_latency = None
+        self.last_decrease = 0.0
+        self.yield_to = ()  # 대기 중이면 양보할 우선 규칙들
+
+    def configure(self, limit: int, queue: int):
+        self.max_limit = max(1, limit)
+        self.min_limit = max(1, self.max_limit // 4)
+        self.limit = float(self.max_limit)
+        self.queue = max(0, queue)
+        ADMISSION_LIMIT.set((self.name,), self.max_limit)
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and path.startswith(self.prefix)
+
+    def _capacity(self) -> int:
+        capacity = int(self.limit)
+        if any(rule.waiters for rule in self.yield_to):
+            capacity = max(1, capacity // 2)
+        return capacity
+
+    def _retry_after(self) -> int:
+        latency = self.short_latency or 0.1
+        return max(1, math.ceil(latency * (len(self.waiters) + 1) / max(1, int(self.limit))))
+
+    async def acquire(self):
+        if self.in_flight < self._capacity() and not self.waiters:
+            self._enter()
+            return "admitted"
+        if len(self.waiters) >= self.queue:
+            raise Rejected("queue_full", self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        ADMISSION_QUEUED.set((self.name,), len(self.waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), ADMISSION_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                return "queued"  # 시간 초과와 동시에 자리를 받은 경우
+            self.waiters.remove(waiter)
+            raise Rejected("queue_timeout", self._retry_after())
+        except asyncio.CancelledError:
+            # 기다리는 중에 연결이 끊긴 경우: 이미 받은 자리는 돌려주고, 아니면 대기열에서 뺍니다.
+            if waiter.done():
+                self.in_flight -= 1
+                self.wake()
+            else:
+                self.waiters.remove(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUED.set((self.name,), len(self.waiters))
+        return "queued"
+
+    def _enter(self):
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set((self.name,), self.in_flight)
+
+    def release(self, latency: float):
+        self.in_flight -= 1
+        if ADMISSION_ADAPTIVE:
+            self._adapt(latency)
+        self.wake()
+
+    def wake(self):
+        # 자리를 넘겨줄 때 in_flight 를 미리 올려 두어 새로 온 요청이 끼어들지 못하게 합니다.
+        while self.waiters and self.in_flight < self._capacity():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self._enter()
+                waiter.set_result(None)
+        ADMISSION_IN_FLIGHT.set((self.name,), self.in_flight)
+
+    def _adapt(self, latency: float):
+        if self.short_latency is None:
+            self.short_latency = self.long_latency = latency
+            return
+        self.short_latency += 0.2 * (latency - self.short_latency)
+        self.long_latency += 0.01 * (latency - self.long_latency)
+
+        now = time.monotonic()
+        if self.short_latency > self.long_latency * ADMISSION_TOLERANCE:
+            # 지연이 늘어나는 중: 최근 지연 시간에 한 번 정도만 줄입니다.
+            if now - self.last_decrease >= self.short_latency:
+                self.limit = max(self.min_limit, self.limit * 0.9)
+                self.last_decrease = now
+                ADMISSION_LIMIT.set((self.name,), int(self.limit))
+        elif self.in_flight + 1 >= int(self.limit) and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            ADMISSION_LIMIT.set((self.name,), int(self.limit))
+
+
+def default_rules() -> list:
+    # 먼저 맞는 규칙이 적용됩니다. /api 밖(/, /metrics, 문서)은 제한하지 않습니다.
+    rules = [
+        AdmissionRule("purchase", "/api/purchase/", WRITE_METHODS, limit=4, queue=4),
+        AdmissionRule("write", "/api/", WRITE_METHODS, limit=8, queue=8),
+        AdmissionRule("read", "/api/", READ_METHODS, limit=64, queue=128, priority=True),
+    ]
+    overrides = {}
+    for item in ADMISSION_LIMITS.split(","):
+        if "=" in item:
+            name, _, value = item.partition("=")
+            limit, _, queue = value.partition("/")
+            overrides[name.strip()] = (int(limit), int(queue or limit))
+    for rule in rules:
+        if rule.name in overrides:
+            rule.configure(*overrides[rule.name])
+    priority_rules = tuple(rule for rule in rules if rule.priority)
+    for rule in rules:
+        if not rule.priority:
+            rule.yield_to = priority_rules
+    return rules
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, rules: list = None):
+        self.app = app
+        self.rules = rules if rules is not None else default_rules()
+
+    def _match(self, scope):
+        method, path = scope["method"], scope["path"]
+        if path.startswith(EXEMPT_PREFIXES):
+            return None
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not ADMISSION_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule = self._match(scope)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            outcome = await rule.acquire()
+        except Rejected as e:
+            ADMISSION_REQUESTS.inc((rule.name, e.reason))
+            await _reject(send, e.retry_after)
+            return
+        ADMISSION_REQUESTS.inc((rule.name, outcome))
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rule.release(time.perf_counter() - started)
+
+
+async def _reject(send, retry_after: int):
+    body = json.dumps(
+        {"detail": "요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도하세요."}, ensure_ascii=False
+    ).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
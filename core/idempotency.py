@@ -0,0 +1,82 @@
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from core.metrics import Counter, register
+from core.singleflight import Group
+
+# --- Idempotency-Key 결과 저장소 ---
+# 같은 키로 다시 온 요청(클라이언트 재시도)에는 처음 결과를 그대로 돌려주고 DB 는 건드리지 않습니다.
+# 처음 요청이 아직 실행 중이면 singleflight 로 그 결과를 함께 기다립니다.
+# 같은 키를 다른 요청(fingerprint 가 다름)에 다시 쓰면 IdempotencyConflict 입니다.
+# 프로세스 메모리에만 두므로 다른 워커로 간 재시도는 다시 실행됩니다. (중복 처리는 DB 조건부 갱신이 막습니다)
+#
+#   IDEMPOTENCY_TTL          결과 보관 시간 (초, 기본 86400)
+#   IDEMPOTENCY_MAX_ENTRIES  보관할 최대 키 수 (오래된 것부터 버림, 기본 100000)
+
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "100000"))
+
+IDEMPOTENCY_REPLAYS = register(
+    Counter("bustar_idempotency_replays_total", "저장된 결과를 돌려준 재시도 요청 수", ("name",))
+)
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+class IdempotencyStore:
+    def __init__(self, name: str, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (저장 시각, fingerprint, 결과)
+        self._lock = threading.Lock()
+        self._group = Group(f"idempotency_{name}")
+
+    def _get(self, key, fingerprint):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+        if entry[1] != fingerprint:
+            raise IdempotencyConflict(key)
+        return entry
+
+    def _put(self, key, fingerprint, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), fingerprint, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def run(self, key, fingerprint, fn, store=lambda result: True) -> tuple:
+        # (저장된 결과를 돌려줬는지, 결과). fn 이 예외를 내거나 store(결과)가 False 면 저장하지 않습니다.
+        entry = self._get(key, fingerprint)
+        if entry is not None:
+            IDEMPOTENCY_REPLAYS.inc((self.name,))
+            return True, entry[2]
+
+        def first():
+            # 앞선 요청이 방금 끝나 저장했을 수 있으므로 한 번 더 확인합니다.
+            entry = self._get(key, fingerprint)
+            if entry is not None:
+                return None, fingerprint, entry[2]
+            result = fn()
+            if store(result):
+                self._put(key, fingerprint, result)
+            return threading.get_ident(), fingerprint, result
+
+        # 실행 중인 같은 키의 요청이 있으면 그 결과를 함께 받습니다. (직접 실행한 요청만 replayed 가 아님)
+        runner, leader_fingerprint, result = self._group.do(key, first)
+        if leader_fingerprint != fingerprint:
+            raise IdempotencyConflict(key)
+        replayed = runner != threading.get_ident()
+        if replayed:
+            IDEMPOTENCY_REPLAYS.inc((self.name,))
+        return replayed, result
@@ -0,0 +1,212 @@
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+# --- 요청별 계측 및 Prometheus 지표 ---
+# MetricsMiddleware 가 요청마다 RequestStats 를 contextvar 에 넣고,
+# db/session.py 의 계측 커서가 쿼리 수/DB 시간/연결 획득 시간/조회 행 수를 그 객체에 더합니다.
+# (동기 핸들러는 threadpool 에서 실행되지만 contextvar 는 복사되어 같은 객체를 가리킵니다.)
+# 요청이 끝나면 라우트별 지표에 합산해 /metrics 로 내보내고 Server-Timing 헤더에도 싣습니다.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "acquire_time", "rows", "scope")
+
+    def __init__(self, scope=None):
+        self.queries = 0
+        self.db_time = 0.0
+        self.acquire_time = 0.0
+        self.rows = 0
+        self.scope = scope
+
+    @property
+    def route(self) -> str:
+        # 라우팅이 끝난 뒤(핸들러 실행 중)에만 템플릿이 정해집니다.
+        return route_label(self.scope) if self.scope is not None else "background"
+
+
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    def set(self, labels: tuple = (), value: float = 0):
+        with self._lock:
+            self.values[labels] = value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.values = {}  # labels -> [버킷별 개수..., +Inf 개수, 합계]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames + ('le',), labels + (le,))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = register(
+    Histogram("bustar_http_request_duration_seconds", "HTTP 요청 처리 시간", ("method", "route"))
+)
+REQUESTS = register(
+    Counter("bustar_http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+)
+DB_QUERIES = register(Counter("bustar_db_queries_total", "실행한 DB 쿼리 수", ("route",)))
+DB_TIME = register(Counter("bustar_db_query_seconds_total", "DB 쿼리 실행 시간 합계", ("route",)))
+DB_ACQUIRE_TIME = register(
+    Counter("bustar_db_connection_acquire_seconds_total", "DB 연결 획득 시간 합계", ("route",))
+)
+DB_ROWS = register(Counter("bustar_db_rows_fetched_total", "DB 에서 읽은 행 수", ("route",)))
+DB_CONNECTIONS = register(
+    Counter("bustar_db_connections_total", "DB 연결 획득 수 (primary 또는 복제본)", ("target",))
+)
+
+
+def route_label(scope) -> str:
+    # 경로 파라미터 값을 이름으로 되돌려 /api/bus/{bus_number} 같은 라우트 템플릿을 만듭니다.
+    # 매칭되지 않은 경로는 지표 라벨 수가 늘어나지 않도록 하나로 묶습니다.
+    if scope.get("endpoint") is None:
+        return "unmatched"
+    path = scope["path"]
+    params = scope.get("path_params")
+    if not params:
+        return path
+    segments = path.split("/")
+    start = 0
+    for name, value in params.items():
+        value = str(value)
+        for i in range(start, len(segments)):
+            if segments[i] == value:
+                segments[i] = "{" + name + "}"
+                start = i + 1
+                break
+    return "/".join(segments)
+
+
+class MetricsMiddleware:
+    # BaseHTTPMiddleware 보다 오버헤드가 작은 순수 ASGI 미들웨어입니다.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 벤치마크처럼 바깥에서 이미 RequestStats 를 넣어 둔 경우에는 그대로 사용합니다.
+        stats = current_stats.get()
+        if stats is None:
+            stats = RequestStats()
+        stats.scope = scope
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = [500]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f"app;dur={total_ms:.2f}, "
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows", '
+                    f"conn;dur={stats.acquire_time * 1000:.2f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timing.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_stats.reset(token)
+            route = route_label(scope)
+            method = scope["method"]
+            REQUEST_DURATION.observe((method, route), elapsed)
+            REQUESTS.inc((method, route, str(status_code[0])))
+            if stats.queries:
+                DB_QUERIES.inc((route,), stats.queries)
+                DB_TIME.inc((route,), stats.db_time)
+                DB_ACQUIRE_TIME.inc((route,), stats.acquire_time)
+                DB_ROWS.inc((route,), stats.rows)
@@ -0,0 +1,111 @@
+
+import asyncio
+import functools
+import inspect
+import threading
+from core.metrics import Counter, Gauge, register
+
+# --- 동일한 동시 읽기 요청 합치기 (single flight) ---
+# 같은 키(이름 + 인자)의 호출이 이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 받습니다.
+# 푸시 알림 직후처럼 같은 조회가 한꺼번에 몰릴 때 DB 쿼리/연결을 한 번만 씁니다.
+# 실행이 끝나면 바로 잊으므로 캐시가 아니며, 끝난 뒤에 온 요청은 다시 실행합니다.
+# 결과 객체는 기다린 요청들이 함께 쓰므로 호출하는 쪽에서 고치면 안 됩니다.
+#
+#   @router.get("/coupon/")
+#   @coalesce("coupon_list")
+#   def get_coupons(): ...
+#
+# 동기 함수(스레드 풀에서 실행되는 라우터)와 async 함수 모두 쓸 수 있습니다.
+
+SINGLEFLIGHT_CALLS = register(
+    Counter("bustar_singleflight_calls_total", "합치기 대상 호출 수 (leader: 실행, shared: 결과 공유)", ("name", "role"))
+)
+SINGLEFLIGHT_IN_FLIGHT = register(Gauge("bustar_singleflight_in_flight", "실행 중인 합치기 키 수", ("name",)))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self, done):
+        self.done = done
+        self.result = None
+        self.error = None
+
+
+class Group:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key, make_done) -> tuple:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call(make_done())
+                leader = True
+                SINGLEFLIGHT_IN_FLIGHT.set((self.name,), len(self._calls))
+        SINGLEFLIGHT_CALLS.inc((self.name, "leader" if leader else "shared"))
+        return call, leader
+
+    def _finish(self, key):
+        with self._lock:
+            del self._calls[key]
+            SINGLEFLIGHT_IN_FLIGHT.set((self.name,), len(self._calls))
+
+    def do(self, key, fn, *args, **kwargs):
+        call, leader = self._join(key, threading.Event)
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                self._finish(key)
+                call.done.set()
+            return call.result
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        # 별도 작업으로 실행하므로 먼저 온 요청이 끊겨도 함께 기다리는 요청들의 실행은 취소되지 않습니다.
+        call, leader = self._join(key, lambda: asyncio.ensure_future(fn(*args, **kwargs)))
+        if leader:
+            call.done.add_done_callback(lambda _: self._finish(key))
+        return await asyncio.shield(call.done)
+
+
+def _key(args: tuple, kwargs: dict):
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return repr(key)
+
+
+def coalesce(name: str):
+    # 라우터 함수에 붙이는 데코레이터. 시그니처는 그대로 두므로 FastAPI 인자 해석에 영향이 없습니다.
+    group = Group(name)
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await group.do_async(_key(args, kwargs), fn, *args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return group.do(_key(args, kwargs), fn, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,32 @@
+
+# --- 저장소(repository) 공통 헬퍼 ---
+# conn.statement(sql) 은 연결별로 캐시된 prepared statement 커서와, 캐시에 저장된 sql 객체를 돌려줍니다.
+# (mysql.connector 는 같은 문자열 객체를 다시 실행할 때만 prepare 를 건너뛰므로 돌려받은 sql 로 실행합니다.)
+# prepared 커서는 다음 실행 전에 결과를 모두 읽어야 하므로 조회는 항상 fetchall() 로 끝냅니다.
+
+
+def execute(conn, sql: str, params: tuple = ()):
+    cursor, sql = conn.statement(sql)
+    cursor.execute(sql, params)
+    return cursor
+
+
+def fetch_all(conn, sql: str, params: tuple = ()) -> list:
+    return execute(conn, sql, params).fetchall()
+
+
+def fetch_one(conn, sql: str, params: tuple = ()):
+    rows = fetch_all(conn, sql, params)
+    return rows[0] if rows else None
+
+
+def exists(conn, sql: str, params: tuple = ()) -> bool:
+    return fetch_one(conn, sql, params) is not None
+
+
+def update_fields(conn, table: str, fields: dict, keys: dict) -> int:
+    # 컬럼 이름은 스키마(pydantic 모델) 필드에서만 오므로 그대로 SQL 에 넣습니다.
+    set_clause = ", ".join(f"{column} = %s" for column in fields)
+    where_clause = " AND ".join(f"{column} = %s" for column in keys)
+    sql = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
+    return execute(conn, sql, (*fields.values(), *keys.values())).rowcount
@@ -0,0 +1,15 @@
+
+from crud.base import fetch_all
+
+SELECT_BUS_TIMES = "SELECT direction, start_time, arrive_time FROM bus_time WHERE bus_number = %s ORDER BY start_time"
+
+
+def get_bus_times(conn, bus_number: int) -> list:
+    return fetch_all(conn, SELECT_BUS_TIMES, (bus_number,))
+
+
+SELECT_ALL_DEPARTURES = "SELECT bus_number, direction, start_time FROM bus_time"
+
+
+def get_all_departures(conn) -> list:
+    return fetch_all(conn, SELECT_ALL_DEPARTURES)
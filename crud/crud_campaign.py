@@ -0,0 +1,114 @@
+
+import time
+from crud.base import execute, fetch_all, fetch_one
+
+# 쿠폰 일괄 지급(캠페인)은 사용자 기본 키 순서로 chunk_size 명씩 나눠 처리합니다.
+# 청크마다 INSERT IGNORE ... SELECT 한 번으로 지급하고(이미 가진 (id, coupon_id) 는 기본 키로 건너뜀),
+# 같은 트랜잭션에서 진행 위치(cursor_id)를 옮기므로 중간에 멈춰도 다음 청크부터 이어서 할 수 있습니다.
+# 청크를 처리하는 동안 캠페인 행을 FOR UPDATE 로 잠가 중지/재개나 다른 작업자와 겹치지 않게 합니다.
+# 조건 값이 NULL 이면 해당 조건을 적용하지 않아 SQL 문 하나를 prepared statement 로 재사용합니다.
+
+SELECT_CAMPAIGNS = "SELECT * FROM coupon_campaign ORDER BY campaign_id DESC LIMIT %s"
+SELECT_CAMPAIGN = "SELECT * FROM coupon_campaign WHERE campaign_id = %s"
+SELECT_CAMPAIGN_FOR_UPDATE = "SELECT * FROM coupon_campaign WHERE campaign_id = %s FOR UPDATE"
+SELECT_USER_RANGE = "SELECT COALESCE(MAX(id), 0) AS max_user_id, COUNT(*) AS total_users FROM user"
+INSERT_CAMPAIGN = "INSERT INTO coupon_campaign (coupon_id, grade, min_total_point, max_total_point, start_period, end_period, chunk_size, status, cursor_id, max_user_id, total_users, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, 'running', 0, %s, %s, %s, %s)"
+SELECT_CHUNK_END = "SELECT id FROM user WHERE id > %s AND id <= %s ORDER BY id LIMIT 1 OFFSET %s"
+SELECT_CHUNK_COUNT = "SELECT COUNT(*) AS users FROM user WHERE id > %s AND id <= %s"
+GRANT_CHUNK = """
+INSERT IGNORE INTO user_coupon (id, coupon_id, start_period, end_period, use_can, use_finish, finish_period)
+SELECT u.id, %s, %s, %s, 1, 0, 0
+FROM user u LEFT JOIN point p ON p.id = u.id
+WHERE u.id > %s AND u.id <= %s
+  AND (%s IS NULL OR u.grade = %s)
+  AND (%s IS NULL OR p.total_point >= %s)
+  AND (%s IS NULL OR p.total_point <= %s)
+"""
+ADVANCE_CAMPAIGN = "UPDATE coupon_campaign SET cursor_id = %s, scanned = scanned + %s, granted = granted + %s, updated_at = %s WHERE campaign_id = %s"
+SET_CAMPAIGN_STATUS = "UPDATE coupon_campaign SET status = %s, error = %s, updated_at = %s WHERE campaign_id = %s AND status IN ({allowed})"
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+def get_campaigns(conn, limit: int) -> list:
+    return fetch_all(conn, SELECT_CAMPAIGNS, (limit,))
+
+
+def get_campaign(conn, campaign_id: int):
+    return fetch_one(conn, SELECT_CAMPAIGN, (campaign_id,))
+
+
+def lock_campaign(conn, campaign_id: int):
+    # 트랜잭션 안에서 호출합니다. 커밋/롤백할 때까지 행이 잠깁니다.
+    return fetch_one(conn, SELECT_CAMPAIGN_FOR_UPDATE, (campaign_id,))
+
+
+def create_campaign(
+    conn,
+    coupon_id: int,
+    grade,
+    min_total_point,
+    max_total_point,
+    start_period: str,
+    end_period: str,
+    chunk_size: int,
+) -> int:
+    # 생성 시점의 최대 사용자 ID 까지만 처리합니다. (이후 가입자는 대상이 아님)
+    user_range = fetch_one(conn, SELECT_USER_RANGE)
+    now = _now()
+    cursor = execute(
+        conn,
+        INSERT_CAMPAIGN,
+        (
+            coupon_id,
+            grade,
+            min_total_point,
+            max_total_point,
+            start_period,
+            end_period,
+            chunk_size,
+            user_range["max_user_id"],
+            user_range["total_users"],
+            now,
+            now,
+        ),
+    )
+    return cursor.lastrowid
+
+
+def next_chunk(conn, cursor_id: int, max_user_id: int, chunk_size: int) -> tuple:
+    # (청크의 마지막 사용자 ID, 청크의 사용자 수). 기본 키 범위만 읽습니다.
+    row = fetch_one(conn, SELECT_CHUNK_END, (cursor_id, max_user_id, chunk_size - 1))
+    if row is not None:
+        return row["id"], chunk_size
+    return max_user_id, fetch_one(conn, SELECT_CHUNK_COUNT, (cursor_id, max_user_id))["users"]
+
+
+def grant_chunk(conn, campaign: dict, low: int, high: int) -> int:
+    grade, min_point, max_point = campaign["grade"], campaign["min_total_point"], campaign["max_total_point"]
+    params = (
+        campaign["coupon_id"],
+        campaign["start_period"],
+        campaign["end_period"],
+        low,
+        high,
+        grade,
+        grade,
+        min_point,
+        min_point,
+        max_point,
+        max_point,
+    )
+    return execute(conn, GRANT_CHUNK, params).rowcount
+
+
+def advance_campaign(conn, campaign_id: int, new_cursor_id: int, scanned: int, granted: int) -> int:
+    # lock_campaign() 으로 잠근 캠페인의 진행 위치를 옮깁니다.
+    return execute(conn, ADVANCE_CAMPAIGN, (new_cursor_id, scanned, granted, _now(), campaign_id)).rowcount
+
+
+def set_campaign_status(conn, campaign_id: int, status: str, allowed: tuple, error: str = None) -> int:
+    sql = SET_CAMPAIGN_STATUS.format(allowed=", ".join(f"'{value}'" for value in allowed))
+    return execute(conn, sql, (status, error, _now(), campaign_id)).rowcount
@@ -1 +1,18 @@
-# Placeholder for coupon-related CRUD functions
\ No newline at end of file
+
+from crud.base import exists, fetch_all, fetch_one
+
+SELECT_COUPONS = "SELECT * FROM coupon"
+SELECT_COUPON = "SELECT * FROM coupon WHERE coupon_id = %s"
+SELECT_COUPON_EXISTS = "SELECT 1 FROM coupon WHERE coupon_id = %s"
+
+
+def get_coupons(conn) -> list:
+    return fetch_all(conn, SELECT_COUPONS)
+
+
+def get_coupon(conn, coupon_id: int):
+    return fetch_one(conn, SELECT_COUPON, (coupon_id,))
+
+
+def coupon_exists(conn, coupon_id: int) -> bool:
+    return exists(conn, SELECT_COUPON_EXISTS, (coupon_id,))
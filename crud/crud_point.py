@@ -1 +1,50 @@
-# Placeholder for point-related CRUD functions
\ No newline at end of file
+
+from crud.base import exists, execute, fetch_all, fetch_one, update_fields
+from schemas.point import PointCreate
+
+SELECT_POINTS = "SELECT * FROM point"
+SELECT_POINT = "SELECT * FROM point WHERE id = %s"
+SELECT_POINT_EXISTS = "SELECT 1 FROM point WHERE id = %s"
+SELECT_TOTAL_POINT = "SELECT total_point FROM point WHERE id = %s"
+SELECT_STANDINGS = "SELECT u.id, u.name, u.grade, p.total_point FROM user u LEFT JOIN point p ON p.id = u.id"
+INSERT_POINT = "INSERT INTO point (id, point, use_point, plus_point, total_point) VALUES (%s, %s, %s, %s, %s)"
+
+
+def get_points(conn) -> list:
+    return fetch_all(conn, SELECT_POINTS)
+
+
+def get_point(conn, user_id: int):
+    return fetch_one(conn, SELECT_POINT, (user_id,))
+
+
+def point_exists(conn, user_id: int) -> bool:
+    return exists(conn, SELECT_POINT_EXISTS, (user_id,))
+
+
+def get_total_point(conn, user_id: int):
+    row = fetch_one(conn, SELECT_TOTAL_POINT, (user_id,))
+    return row["total_point"] if row else None
+
+
+def get_standings(conn) -> list:
+    # 모든 사용자의 등급과 누적 포인트 (포인트 정보가 없으면 total_point 는 NULL)
+    return fetch_all(conn, SELECT_STANDINGS)
+
+
+def create_point(conn, point_data: PointCreate):
+    execute(
+        conn,
+        INSERT_POINT,
+        (
+            point_data.id,
+            point_data.point,
+            point_data.use_point,
+            point_data.plus_point,
+            point_data.total_point,
+        ),
+    )
+
+
+def update_point(conn, user_id: int, fields: dict) -> int:
+    return update_fields(conn, "point", fields, {"id": user_id})
@@ -1 +1,14 @@
-# Placeholder for purchase-related CRUD functions
\ No newline at end of file
+
+from crud.base import execute, fetch_one
+
+SELECT_POINT_BALANCE_FOR_UPDATE = "SELECT point, use_point FROM point WHERE id = %s FOR UPDATE"
+UPDATE_POINT_BALANCE = "UPDATE point SET point = %s, use_point = %s WHERE id = %s"
+
+
+def lock_point_balance(conn, user_id: int):
+    # 구매 트랜잭션 동안 포인트 행을 잠급니다.
+    return fetch_one(conn, SELECT_POINT_BALANCE_FOR_UPDATE, (user_id,))
+
+
+def update_point_balance(conn, user_id: int, point: int, use_point: int) -> int:
+    return execute(conn, UPDATE_POINT_BALANCE, (point, use_point, user_id)).rowcount
@@ -0,0 +1,56 @@
+
+import time
+from crud.base import execute, fetch_all, fetch_one, update_fields
+
+# 사용자별로 최근 사용한 출발지/도착지 쌍을 최대 N개까지만 보관합니다.
+# 같은 쌍을 다시 쓰면 used_at 만 갱신하고, 추가할 때 N개를 넘는 오래된 항목을 지웁니다.
+# 조회/정리 모두 (member_id, used_at) 인덱스 범위만 읽습니다.
+
+SELECT_RECENT_MOVES = "SELECT root_id, member_id, origin, destination, used_at FROM recent_move WHERE member_id = %s ORDER BY used_at DESC LIMIT %s"
+SELECT_RECENT_MOVE = "SELECT root_id, member_id, origin, destination, used_at FROM recent_move WHERE root_id = %s"
+SELECT_RECENT_MOVE_BY_PAIR = "SELECT root_id, member_id, origin, destination, used_at FROM recent_move WHERE member_id = %s AND origin = %s AND destination = %s"
+TOUCH_RECENT_MOVE = "UPDATE recent_move SET used_at = %s WHERE member_id = %s AND origin = %s AND destination = %s"
+INSERT_RECENT_MOVE = "INSERT IGNORE INTO recent_move (member_id, origin, destination, used_at) VALUES (%s, %s, %s, %s)"
+SELECT_TRIM_CUTOFF = "SELECT used_at FROM recent_move WHERE member_id = %s ORDER BY used_at DESC LIMIT 1 OFFSET %s"
+DELETE_OLDER_THAN = "DELETE FROM recent_move WHERE member_id = %s AND used_at < %s"
+DELETE_RECENT_MOVE = "DELETE FROM recent_move WHERE root_id = %s AND member_id = %s"
+
+
+def _now() -> int:
+    return time.time_ns() // 1000
+
+
+def get_recent_moves(conn, member_id: int, limit: int) -> list:
+    return fetch_all(conn, SELECT_RECENT_MOVES, (member_id, limit))
+
+
+def get_recent_move(conn, root_id: int):
+    return fetch_one(conn, SELECT_RECENT_MOVE, (root_id,))
+
+
+def get_recent_move_by_pair(conn, member_id: int, origin: str, destination: str):
+    return fetch_one(conn, SELECT_RECENT_MOVE_BY_PAIR, (member_id, origin, destination))
+
+
+def touch_recent_move(conn, member_id: int, origin: str, destination: str, keep: int):
+    # 이미 있는 쌍이면 사용 시각만 갱신하고, 없으면 추가한 뒤 keep 개를 넘는 항목을 지웁니다.
+    used_at = _now()
+    params = (used_at, member_id, origin, destination)
+    if execute(conn, TOUCH_RECENT_MOVE, params).rowcount == 0:
+        execute(conn, INSERT_RECENT_MOVE, (member_id, origin, destination, used_at))
+        trim_recent_moves(conn, member_id, keep)
+
+
+def trim_recent_moves(conn, member_id: int, keep: int) -> int:
+    cutoff = fetch_one(conn, SELECT_TRIM_CUTOFF, (member_id, keep - 1))
+    if cutoff is None:
+        return 0
+    return execute(conn, DELETE_OLDER_THAN, (member_id, cutoff["used_at"])).rowcount
+
+
+def update_recent_move(conn, root_id: int, fields: dict) -> int:
+    return update_fields(conn, "recent_move", dict(fields, used_at=_now()), {"root_id": root_id})
+
+
+def delete_recent_move(conn, member_id: int, root_id: int) -> int:
+    return execute(conn, DELETE_RECENT_MOVE, (root_id, member_id)).rowcount
@@ -0,0 +1,26 @@
+
+from crud.base import fetch_all
+
+SELECT_STATIONS = "SELECT station_number, station_name FROM station"
+SELECT_STATION_BUSES = "SELECT DISTINCT bus_number, direction FROM bus_route WHERE station_number = %s ORDER BY bus_number, direction"
+# 정류장마다 지나는 버스 번호를 함께 읽습니다. (노선이 없는 정류장은 bus_number 가 NULL)
+SELECT_STATION_LOCATIONS = """
+    SELECT s.station_number, s.station_name, s.latitude, s.longitude, br.bus_number
+    FROM station AS s
+    LEFT JOIN (SELECT DISTINCT station_number, bus_number FROM bus_route) AS br
+        ON br.station_number = s.station_number
+    WHERE s.latitude IS NOT NULL AND s.longitude IS NOT NULL
+    ORDER BY s.station_number, br.bus_number
+"""
+
+
+def get_stations(conn) -> list:
+    return fetch_all(conn, SELECT_STATIONS)
+
+
+def get_station_locations(conn) -> list:
+    return fetch_all(conn, SELECT_STATION_LOCATIONS)
+
+
+def get_station_buses(conn, station_number: int) -> list:
+    return fetch_all(conn, SELECT_STATION_BUSES, (station_number,))
@@ -0,0 +1,68 @@
+
+from crud.base import fetch_all
+
+# 교통 데이터 변경 감지: 버스별/정류장별 체크섬만 DB 에서 집계해 가져오고
+# (행 체크섬의 XOR 와 행 수이므로 순서와 무관), 바뀐 버스의 행만 다시 읽습니다.
+# 가져오는 행 수는 버스/정류장 수에 비례하고 노선/시간표 행 수와는 무관합니다.
+
+SELECT_BUS_CHECKSUMS = "SELECT bus_number, CRC32(CONCAT_WS(',', bus_number, bus_type)) AS checksum FROM bus"
+SELECT_ROUTE_CHECKSUMS = "SELECT bus_number, COUNT(*) AS row_count, BIT_XOR(CRC32(CONCAT_WS(',', direction, station_order, station_number))) AS checksum FROM bus_route GROUP BY bus_number"
+SELECT_TIME_CHECKSUMS = "SELECT bus_number, COUNT(*) AS row_count, BIT_XOR(CRC32(CONCAT_WS(',', direction, start_time, arrive_time))) AS checksum FROM bus_time GROUP BY bus_number"
+SELECT_STATION_CHECKSUMS = "SELECT station_number, CRC32(CONCAT_WS(',', station_name, latitude, longitude)) AS checksum FROM station"
+
+SELECT_BUSES = "SELECT * FROM bus"
+SELECT_ROUTES = "SELECT br.bus_number, br.direction, br.station_order, br.station_number, s.station_name FROM bus_route AS br JOIN station AS s ON br.station_number = s.station_number"
+SELECT_TIMES = "SELECT * FROM bus_time"
+
+# 버스 번호 목록은 고정 길이로 채워 같은 SQL(캐시된 prepared statement)을 다시 씁니다.
+IN_CHUNK = 64
+
+
+def get_bus_checksums(conn) -> dict:
+    # bus_number -> (bus 행, 노선 행 수, 노선 체크섬, 시간표 행 수, 시간표 체크섬)
+    checksums = {row["bus_number"]: [row["checksum"], 0, 0, 0, 0] for row in fetch_all(conn, SELECT_BUS_CHECKSUMS)}
+    for offset, sql in ((1, SELECT_ROUTE_CHECKSUMS), (3, SELECT_TIME_CHECKSUMS)):
+        for row in fetch_all(conn, sql):
+            entry = checksums.setdefault(row["bus_number"], [None, 0, 0, 0, 0])
+            entry[offset] = int(row["row_count"])
+            entry[offset + 1] = int(row["checksum"] or 0)
+    return {bus_number: tuple(entry) for bus_number, entry in checksums.items()}
+
+
+def get_station_checksums(conn) -> dict:
+    return {row["station_number"]: row["checksum"] for row in fetch_all(conn, SELECT_STATION_CHECKSUMS)}
+
+
+def _fetch_for_buses(conn, sql: str, column: str, bus_numbers) -> list:
+    if bus_numbers is None:
+        return fetch_all(conn, sql)
+    bus_numbers = sorted(bus_numbers)
+    chunk_sql = f"{sql} WHERE {column} IN ({', '.join(['%s'] * IN_CHUNK)})"
+    rows = []
+    for start in range(0, len(bus_numbers), IN_CHUNK):
+        chunk = bus_numbers[start : start + IN_CHUNK]
+        chunk += [chunk[0]] * (IN_CHUNK - len(chunk))
+        rows.extend(fetch_all(conn, chunk_sql, tuple(chunk)))
+    return rows
+
+
+def get_bus_slices(conn, bus_numbers=None) -> tuple:
+    # (버스 행, 노선 행, 시간표 행). bus_numbers 가 None 이면 전체.
+    return (
+        _fetch_for_buses(conn, SELECT_BUSES, "bus_number", bus_numbers),
+        _fetch_for_buses(conn, SELECT_ROUTES, "br.bus_number", bus_numbers),
+        _fetch_for_buses(conn, SELECT_TIMES, "bus_number", bus_numbers),
+    )
+
+
+# 정류장 간 소요 시간 행렬(db/travel_matrix.py)용: 노선 정류장 좌표와 운행별 출발/도착 시각
+SELECT_ROUTE_STOPS = "SELECT br.bus_number, br.direction, br.station_order, br.station_number, s.latitude, s.longitude FROM bus_route AS br JOIN station AS s ON br.station_number = s.station_number"
+SELECT_TRIP_TIMES = "SELECT bus_number, direction, start_time, arrive_time FROM bus_time"
+
+
+def get_line_inputs(conn, bus_numbers=None) -> tuple:
+    # (노선 정류장 행, 운행 행). bus_numbers 가 None 이면 전체.
+    return (
+        _fetch_for_buses(conn, SELECT_ROUTE_STOPS, "br.bus_number", bus_numbers),
+        _fetch_for_buses(conn, SELECT_TRIP_TIMES, "bus_number", bus_numbers),
+    )
@@ -1 +1,13 @@
-# Placeholder for usage_record-related CRUD functions
\ No newline at end of file
+
+from crud.base import fetch_all, fetch_one
+
+SELECT_USAGE_RECORDS = "SELECT * FROM usage_record"
+SELECT_USAGE_RECORD = "SELECT * FROM usage_record WHERE id = %s"
+
+
+def get_usage_records(conn) -> list:
+    return fetch_all(conn, SELECT_USAGE_RECORDS)
+
+
+def get_usage_record(conn, user_id: int):
+    return fetch_one(conn, SELECT_USAGE_RECORD, (user_id,))
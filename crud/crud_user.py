@@ -1 +1,23 @@
-# Placeholder for user-related CRUD functions
\ No newline at end of file
+
+from crud.base import exists, execute, fetch_all, fetch_one
+
+SELECT_USERS = "SELECT * FROM user"
+SELECT_USER = "SELECT * FROM user WHERE id = %s"
+SELECT_USER_EXISTS = "SELECT 1 FROM user WHERE id = %s"
+UPDATE_USER_GRADE = "UPDATE user SET grade = %s WHERE id = %s"
+
+
+def get_users(conn) -> list:
+    return fetch_all(conn, SELECT_USERS)
+
+
+def get_user(conn, user_id: int):
+    return fetch_one(conn, SELECT_USER, (user_id,))
+
+
+def user_exists(conn, user_id: int) -> bool:
+    return exists(conn, SELECT_USER_EXISTS, (user_id,))
+
+
+def update_grade(conn, user_id: int, grade: str) -> int:
+    return execute(conn, UPDATE_USER_GRADE, (grade, user_id)).rowcount
@@ -1 +1,54 @@
-# Placeholder for user_coupon-related CRUD functions
\ No newline at end of file
+
+from crud.base import exists, execute, fetch_all, fetch_one, update_fields
+
+SELECT_USER_COUPONS = "SELECT * FROM user_coupon"
+SELECT_USER_COUPON = "SELECT * FROM user_coupon WHERE id = %s AND coupon_id = %s"
+SELECT_USER_COUPON_EXISTS = "SELECT 1 FROM user_coupon WHERE id = %s AND coupon_id = %s"
+INSERT_USER_COUPON = "INSERT INTO user_coupon (id, coupon_id, start_period, end_period, use_can, use_finish, finish_period) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+
+
+def get_user_coupons(conn) -> list:
+    return fetch_all(conn, SELECT_USER_COUPONS)
+
+
+def get_user_coupon(conn, user_id: int, coupon_id: int):
+    return fetch_one(conn, SELECT_USER_COUPON, (user_id, coupon_id))
+
+
+def user_coupon_exists(conn, user_id: int, coupon_id: int) -> bool:
+    return exists(conn, SELECT_USER_COUPON_EXISTS, (user_id, coupon_id))
+
+
+def create_user_coupon(
+    conn,
+    user_id: int,
+    coupon_id: int,
+    start_period: str,
+    end_period: str,
+    use_can: int = 1,
+    use_finish: int = 0,
+    finish_period: int = 0,
+):
+    execute(
+        conn,
+        INSERT_USER_COUPON,
+        (user_id, coupon_id, start_period, end_period, use_can, use_finish, finish_period),
+    )
+
+
+def update_user_coupon(conn, user_id: int, coupon_id: int, fields: dict) -> int:
+    return update_fields(conn, "user_coupon", fields, {"id": user_id, "coupon_id": coupon_id})
+
+
+# 사용 가능(use_can = 1), 미사용(use_finish = 0), 미만료(finish_period = 0)이고 오늘이 사용 기간 안일 때만 바꿉니다.
+# 조건과 갱신이 한 문장이므로 동시에 여러 요청이 와도 한 요청만 rowcount 1 을 받습니다.
+REDEEM_USER_COUPON = """
+UPDATE user_coupon SET use_can = 0, use_finish = 1
+WHERE id = %s AND coupon_id = %s AND use_can = 1 AND use_finish = 0 AND finish_period = 0
+  AND (start_period IS NULL OR SUBSTR(start_period, 1, 10) <= %s)
+  AND (end_period IS NULL OR SUBSTR(end_period, 1, 10) >= %s)
+"""
+
+
+def redeem_user_coupon(conn, user_id: int, coupon_id: int, today: str) -> int:
+    return execute(conn, REDEEM_USER_COUPON, (user_id, coupon_id, today, today)).rowcount
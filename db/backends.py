@@ -0,0 +1,53 @@
+
+import mysql.connector
+from db import sqlite_compat
+
+# --- DB 백엔드 ---
+# 연결을 만드는 방법과 prepared statement 커서를 만드는 방법만 백엔드마다 다릅니다.
+# 저장소(crud/) 코드는 어느 백엔드에서든 같은 SQL(%s 자리표시자)로 동작합니다.
+
+
+class MySQLBackend:
+    name = "mysql"
+
+    def __init__(self, config: dict):
+        self.config = config
+
+    def connect(self):
+        return mysql.connector.connect(**self.config)
+
+    def prepare(self, raw):
+        # 서버 측 prepared statement. 같은 커서에서 같은 문자열 객체를 다시 실행하면
+        # 재파싱(COM_STMT_PREPARE) 없이 실행만 합니다.
+        return raw.cursor(prepared=True, dictionary=True)
+
+    def describe(self) -> str:
+        return f"mysql://{self.config.get('host')}/{self.config.get('database')}"
+
+
+class SQLiteBackend:
+    name = "sqlite"
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+
+    def connect(self):
+        return sqlite_compat.connect(self.path, read_only=self.read_only)
+
+    def prepare(self, raw):
+        # sqlite3 는 연결마다 구문 캐시를 가지고 있어 일반 커서로 충분합니다.
+        return raw.cursor(dictionary=True)
+
+    def describe(self) -> str:
+        return f"sqlite://{self.path}"
+
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def register_backend(name: str, backend_class):
+    BACKENDS[name] = backend_class
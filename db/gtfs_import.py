@@ -0,0 +1,350 @@
+
+import argparse
+import csv
+import datetime
+import io
+import os
+import sys
+import time
+import zipfile
+from contextlib import contextmanager
+import mysql.connector
+from db import session, sqlite_compat
+
+# --- GTFS 시간표 일괄 적재 ---
+# GTFS 피드(stops.txt, routes.txt, trips.txt, stop_times.txt)를 스트리밍으로 읽어
+# bus / station / bus_route / bus_time 스테이징 테이블(*_new)에 다중 행 INSERT 로 적재한 뒤
+# 한 번의 RENAME 으로 교체합니다. 교체 전까지 기존 테이블은 그대로 조회되므로
+# 적재 중에도 반쯤 채워진 노선 데이터가 노출되지 않습니다.
+#
+#   python -m db.gtfs_import ./feed           # 압축을 푼 피드 디렉터리
+#   python -m db.gtfs_import ./feed.zip --batch-size 10000
+#
+# 메모리 사용량은 정류장/노선/운행(trip) 수에만 비례하고 stop_times 행 수와는 무관합니다.
+# 이를 위해 stop_times.txt 는 GTFS 관례대로 trip_id 별로 연속되어 있어야 합니다.
+
+STAGING_SUFFIX = "_new"
+OLD_SUFFIX = "_old"
+
+# GTFS route_type -> bus_type
+ROUTE_TYPES = {
+    "0": "트램",
+    "1": "지하철",
+    "2": "철도",
+    "3": "일반",
+    "700": "일반",
+    "701": "광역",
+    "702": "급행",
+    "704": "마을",
+    "715": "수요응답",
+}
+
+
+class GTFSImportError(Exception):
+    pass
+
+
+@contextmanager
+def open_feed_file(feed: str, name: str):
+    # 디렉터리와 zip 파일을 모두 지원하며, 파일 전체를 메모리에 올리지 않습니다.
+    if zipfile.is_zipfile(feed):
+        with zipfile.ZipFile(feed) as archive:
+            try:
+                raw = archive.open(name)
+            except KeyError:
+                raise GTFSImportError(f"피드에 {name} 파일이 없습니다.")
+            with io.TextIOWrapper(raw, encoding="utf-8-sig", newline="") as f:
+                yield csv.DictReader(f)
+    else:
+        path = os.path.join(feed, name)
+        if not os.path.exists(path):
+            raise GTFSImportError(f"피드에 {name} 파일이 없습니다.")
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            yield csv.DictReader(f)
+
+
+def parse_gtfs_time(value: str) -> datetime.timedelta:
+    # GTFS 시각은 24:00:00 을 넘을 수 있습니다(다음날 새벽 운행). MySQL TIME 도 이를 허용합니다.
+    hours, minutes, seconds = value.strip().split(":")
+    return datetime.timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds))
+
+
+def _coordinate(value):
+    # stop_lat/stop_lon 은 선택 항목이므로 비어 있으면 NULL 로 둡니다.
+    try:
+        return float(value) if value and value.strip() else None
+    except ValueError:
+        return None
+
+
+def _staging(table: str) -> str:
+    return f"{table}{STAGING_SUFFIX}"
+
+
+def _names(suffix: str) -> dict:
+    return {table: f"{table}{suffix}" for table in session.TRANSIT_TABLES}
+
+
+class BatchWriter:
+    # executemany 는 mysql.connector 에서 다중 행 INSERT 한 문장으로 합쳐집니다.
+    def __init__(self, conn, statement: str, batch_size: int):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.statement = statement
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+
+    def add(self, row: tuple):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        self.cursor.executemany(self.statement, self.rows)
+        self.conn.commit()
+        self.written += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.cursor.close()
+
+
+class GTFSImporter:
+    def __init__(self, conn, feed: str, batch_size: int = 5000):
+        self.conn = conn
+        self.feed = feed
+        self.batch_size = batch_size
+        self.is_sqlite = session.DB_BACKEND == "sqlite"
+        self.stop_numbers = {}  # GTFS stop_id -> station_number
+        self.route_buses = {}  # GTFS route_id -> bus_number
+        self.trips = {}  # GTFS trip_id -> (bus_number, direction)
+        self.patterns = {}  # (bus_number, direction) -> 정류장 순서 목록 (가장 긴 운행 기준)
+        self.stats = {}
+
+    # --- 스테이징 테이블 준비 ---
+    def create_staging_tables(self):
+        cursor = self.conn.cursor()
+        staging = _names(STAGING_SUFFIX)
+        ddl_list = sqlite_compat.TRANSIT_TABLE_DDL if self.is_sqlite else session.TRANSIT_TABLE_DDL
+        for table in reversed(session.TRANSIT_TABLES):
+            cursor.execute(f"DROP TABLE IF EXISTS {staging[table]}")
+        for ddl in ddl_list:
+            cursor.execute(ddl.format(**staging))
+        if not self.is_sqlite:
+            # 스테이징 적재 동안에는 외래 키 검사를 생략합니다. (세션 단위 설정)
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        self.conn.commit()
+        cursor.close()
+
+    # --- stops.txt -> station ---
+    def load_stations(self):
+        writer = BatchWriter(
+            self.conn,
+            f"INSERT INTO {_staging('station')} (station_number, station_name, latitude, longitude) VALUES (%s, %s, %s, %s)",
+            self.batch_size,
+        )
+        used_numbers = set()
+        next_number = 1
+        with open_feed_file(self.feed, "stops.txt") as rows:
+            for row in rows:
+                if row.get("location_type", "0") not in ("", "0"):
+                    continue  # 역사/출입구 등 승하차 지점이 아닌 항목
+                number = None
+                for candidate in (row.get("stop_code"), row.get("stop_id")):
+                    if candidate and candidate.strip().isdigit() and int(candidate) not in used_numbers:
+                        number = int(candidate)
+                        break
+                if number is None:
+                    while next_number in used_numbers:
+                        next_number += 1
+                    number = next_number
+                used_numbers.add(number)
+                self.stop_numbers[row["stop_id"]] = number
+                writer.add(
+                    (number, row["stop_name"].strip()[:50], _coordinate(row.get("stop_lat")), _coordinate(row.get("stop_lon")))
+                )
+        writer.close()
+        self.stats["station"] = writer.written
+
+    # --- routes.txt -> bus ---
+    def load_buses(self):
+        writer = BatchWriter(
+            self.conn,
+            f"INSERT INTO {_staging('bus')} (bus_number, bus_type) VALUES (%s, %s)",
+            self.batch_size,
+        )
+        seen = set()
+        skipped = 0
+        with open_feed_file(self.feed, "routes.txt") as rows:
+            for row in rows:
+                short_name = (row.get("route_short_name") or "").strip()
+                if not short_name.isdigit():
+                    skipped += 1  # bus_number 가 정수이므로 숫자 노선명만 적재합니다.
+                    continue
+                bus_number = int(short_name)
+                self.route_buses[row["route_id"]] = bus_number
+                if bus_number in seen:
+                    continue
+                seen.add(bus_number)
+                route_type = (row.get("route_type") or "3").strip()
+                writer.add((bus_number, ROUTE_TYPES.get(route_type, route_type)[:50]))
+        writer.close()
+        self.stats["bus"] = writer.written
+        self.stats["skipped_routes"] = skipped
+
+    # --- trips.txt -> trip_id 별 (버스, 방향) ---
+    def load_trips(self):
+        with open_feed_file(self.feed, "trips.txt") as rows:
+            for row in rows:
+                bus_number = self.route_buses.get(row["route_id"])
+                if bus_number is None:
+                    continue
+                direction = "down" if (row.get("direction_id") or "0").strip() == "1" else "up"
+                self.trips[row["trip_id"]] = (bus_number, direction)
+        self.stats["trips"] = len(self.trips)
+
+    # --- stop_times.txt -> bus_time (+ 노선 패턴) ---
+    def load_stop_times(self):
+        writer = BatchWriter(
+            self.conn,
+            f"INSERT IGNORE INTO {_staging('bus_time')} (bus_number, direction, start_time, arrive_time) VALUES (%s, %s, %s, %s)",
+            self.batch_size,
+        )
+        finished = set()
+        current_trip_id = None
+        current_trip = None  # 적재 대상 운행일 때만 trip_id
+        stops = []  # (stop_sequence, station_number, arrival, departure)
+
+        def finish_trip():
+            if current_trip is None or not stops:
+                return
+            stops.sort(key=lambda s: s[0])
+            key = self.trips[current_trip]
+            writer.add((key[0], key[1], stops[0][3], stops[-1][2]))
+            if len(stops) > len(self.patterns.get(key, ())):
+                self.patterns[key] = [s[1] for s in stops]
+
+        stop_time_rows = 0
+        with open_feed_file(self.feed, "stop_times.txt") as rows:
+            for row in rows:
+                trip_id = row["trip_id"]
+                if trip_id != current_trip_id:
+                    finish_trip()
+                    if current_trip is not None:
+                        finished.add(current_trip)
+                    if trip_id in finished:
+                        raise GTFSImportError(
+                            f"stop_times.txt 가 trip_id 별로 정렬되어 있지 않습니다. (trip_id={trip_id})"
+                        )
+                    current_trip_id = trip_id
+                    current_trip = trip_id if trip_id in self.trips else None
+                    stops = []
+                if current_trip is None:
+                    continue
+                station_number = self.stop_numbers.get(row["stop_id"])
+                arrival = row.get("arrival_time") or row.get("departure_time")
+                departure = row.get("departure_time") or arrival
+                if station_number is None or not arrival:
+                    continue
+                stops.append(
+                    (
+                        int(row["stop_sequence"]),
+                        station_number,
+                        parse_gtfs_time(arrival),
+                        parse_gtfs_time(departure),
+                    )
+                )
+                stop_time_rows += 1
+            finish_trip()
+        writer.close()
+        self.stats["stop_times"] = stop_time_rows
+        self.stats["bus_time"] = writer.written
+
+    # --- 노선 패턴 -> bus_route ---
+    def load_routes(self):
+        writer = BatchWriter(
+            self.conn,
+            f"INSERT INTO {_staging('bus_route')} (bus_number, direction, station_number, station_order) VALUES (%s, %s, %s, %s)",
+            self.batch_size,
+        )
+        for (bus_number, direction), station_numbers in sorted(self.patterns.items()):
+            for order, station_number in enumerate(station_numbers, start=1):
+                writer.add((bus_number, direction, station_number, order))
+        writer.close()
+        self.stats["bus_route"] = writer.written
+
+    # --- 원자적 교체 ---
+    def swap(self):
+        cursor = self.conn.cursor()
+        live, staging, old = _names(""), _names(STAGING_SUFFIX), _names(OLD_SUFFIX)
+        for table in reversed(session.TRANSIT_TABLES):
+            cursor.execute(f"DROP TABLE IF EXISTS {old[table]}")
+        if self.is_sqlite:
+            # SQLite 는 DDL 도 트랜잭션 안에서 처리되므로 한 트랜잭션으로 이름을 바꿉니다.
+            self.conn.start_transaction()
+            for table in session.TRANSIT_TABLES:
+                cursor.execute(f"ALTER TABLE {live[table]} RENAME TO {old[table]}")
+                cursor.execute(f"ALTER TABLE {staging[table]} RENAME TO {live[table]}")
+            self.conn.commit()
+        else:
+            # 여러 테이블을 한 문장으로 바꾸는 RENAME TABLE 은 원자적으로 실행됩니다.
+            renames = []
+            for table in session.TRANSIT_TABLES:
+                renames.append(f"{live[table]} TO {old[table]}")
+                renames.append(f"{staging[table]} TO {live[table]}")
+            cursor.execute("RENAME TABLE " + ", ".join(renames))
+        for table in reversed(session.TRANSIT_TABLES):
+            cursor.execute(f"DROP TABLE IF EXISTS {old[table]}")
+        if not self.is_sqlite:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        self.conn.commit()
+        cursor.close()
+
+    def run(self, swap: bool = True) -> dict:
+        phases = [
+            ("staging", self.create_staging_tables),
+            ("stations", self.load_stations),
+            ("buses", self.load_buses),
+            ("trips", self.load_trips),
+            ("stop_times", self.load_stop_times),
+            ("routes", self.load_routes),
+        ]
+        if swap:
+            phases.append(("swap", self.swap))
+        for name, phase in phases:
+            started = time.perf_counter()
+            phase()
+            print(f"[{name}] {time.perf_counter() - started:.2f}s")
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GTFS 피드를 버스/정류장/노선/시간표 테이블로 적재")
+    parser.add_argument("feed", help="GTFS 피드 디렉터리 또는 zip 파일")
+    parser.add_argument("--batch-size", type=int, default=5000, help="다중 행 INSERT 묶음 크기")
+    parser.add_argument(
+        "--no-swap",
+        action="store_true",
+        help="스테이징 테이블(*_new)까지만 적재하고 교체하지 않음",
+    )
+    args = parser.parse_args(argv)
+
+    conn = session.get_db_connection()
+    try:
+        stats = GTFSImporter(conn, args.feed, args.batch_size).run(swap=not args.no_swap)
+    except (GTFSImportError, mysql.connector.Error) as e:
+        print(f"GTFS 적재 중 오류 발생: {e}")
+        conn.rollback()
+        return 1
+    finally:
+        conn.close()
+    print(f"GTFS 적재 완료: {stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+# --- 연결 풀 ---
+# 요청마다 새로 연결하지 않고 연결을 재사용합니다. 연결마다 prepared statement 커서를
+# 캐시해 두므로, 자주 쓰는 쿼리는 연결을 다시 받아도 재파싱 없이 실행됩니다.
+# mysql.connector 의 기본 풀은 빈 연결이 없으면 바로 예외를 내므로 기다릴 수 있는 풀을 직접 둡니다.
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _close_cursor(cursor):
+    # prepared 커서는 닫아야 서버 측 statement 가 해제됩니다.
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+class _PoolEntry:
+    __slots__ = ("raw", "statements", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.statements = OrderedDict()  # sql -> (prepared 커서, 캐시에 저장된 sql 객체)
+        self.last_used = time.monotonic()
+
+
+class PooledConnection:
+    # close() 하면 실제로 끊지 않고 풀에 돌려줍니다.
+    __slots__ = ("_pool", "_entry")
+
+    def __init__(self, pool, entry: _PoolEntry):
+        self._pool = pool
+        self._entry = entry
+
+    def statement(self, sql: str):
+        # 연결별 prepared statement 캐시 (LRU)
+        statements = self._entry.statements
+        cached = statements.get(sql)
+        if cached is not None:
+            statements.move_to_end(sql)
+            return cached
+        cached = (self._pool.backend.prepare(self._entry.raw), sql)
+        statements[sql] = cached
+        if len(statements) > self._pool.statement_cache_size:
+            _, (evicted, _) = statements.popitem(last=False)
+            _close_cursor(evicted)
+        return cached
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def is_connected(self) -> bool:
+        return self._entry is not None
+
+    def __getattr__(self, name):
+        return getattr(self._entry.raw, name)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        backend,
+        size: int = 16,
+        timeout: float = 5.0,
+        recycle: float = 300.0,
+        statement_cache_size: int = 64,
+    ):
+        self.backend = backend
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.recycle = recycle  # 이 시간(초) 이상 쉬던 연결은 내주기 전에 ping 합니다.
+        self.statement_cache_size = statement_cache_size
+        self._idle = deque()
+        self._created = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def acquire(self) -> PooledConnection:
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()  # 최근에 쓴 연결부터 (LIFO)
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"연결 풀이 가득 찼습니다. (size={self.size})")
+                self._cond.wait(remaining)
+            self._in_use += 1
+
+        try:
+            if entry is None:
+                entry = _PoolEntry(self.backend.connect())
+            elif time.monotonic() - entry.last_used > self.recycle:
+                # 오래 쉬던 연결은 끊겼을 수 있으니 확인 후 필요하면 다시 연결합니다.
+                # 다시 연결된 경우에만 prepared statement 가 사라지므로 캐시를 비웁니다.
+                connection_id = getattr(entry.raw, "connection_id", None)
+                entry.raw.ping(reconnect=True)
+                if getattr(entry.raw, "connection_id", None) != connection_id:
+                    self._drop_statements(entry)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, entry)
+
+    @staticmethod
+    def _drop_statements(entry: _PoolEntry):
+        statements, entry.statements = entry.statements, OrderedDict()
+        for cursor, _ in statements.values():
+            _close_cursor(cursor)
+
+    def release(self, entry: _PoolEntry):
+        broken = False
+        try:
+            entry.raw.consume_results()
+            if entry.raw.in_transaction:
+                entry.raw.rollback()
+        except Exception:
+            broken = True
+
+        with self._cond:
+            self._in_use -= 1
+            if broken:
+                self._created -= 1
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            self._cond.notify()
+        if broken:
+            try:
+                entry.raw.close()
+            except Exception:
+                pass
+
+    def warm(self, count: int) -> int:
+        # 미리 연결을 열어 둡니다. 실제로 연 연결 수를 돌려줍니다.
+        connections = []
+        try:
+            for _ in range(min(count, self.size)):
+                connections.append(self.acquire())
+        finally:
+            for conn in connections:
+                conn.close()
+        return len(connections)
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._created -= len(idle)
+        for entry in idle:
+            try:
+                entry.raw.close()
+            except Exception:
+                pass
@@ -0,0 +1,132 @@
+
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 느린 쿼리 로그 ---
+# db/session.py 의 계측 커서가 문장 하나(실행 + 결과 조회)가 끝날 때마다 observe() 를 호출합니다.
+# 임계값을 넘은 문장은 파라미터 값 대신 형태(타입)만 남겨 최근 목록(링 버퍼)에 기록하고,
+# 정규화한 문장마다 한 번씩 별도 연결에서 EXPLAIN 결과를 받아 둡니다.
+#
+#   SLOW_QUERY_MS      임계값 (ms, 0 이하이면 비활성화, 기본 200)
+#   SLOW_QUERY_SAMPLE  임계값을 넘은 쿼리 중 기록할 비율 (0~1, 기본 1)
+#   SLOW_QUERY_RING    보관할 최근 느린 쿼리 수 (기본 200)
+#   SLOW_QUERY_EXPLAIN EXPLAIN 수집 여부 (기본 1)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_SAMPLE = float(os.environ.get("SLOW_QUERY_SAMPLE", "1"))
+SLOW_QUERY_RING = int(os.environ.get("SLOW_QUERY_RING", "200"))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "1") == "1"
+
+MAX_PLANS = 1000
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+enabled = SLOW_QUERY_MS > 0
+_threshold = SLOW_QUERY_MS / 1000
+_recent = deque(maxlen=SLOW_QUERY_RING)
+_plans = {}  # 정규화된 문장 -> EXPLAIN 결과 (수집 중이면 None)
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_COMMENT = re.compile(r"--[^\n]*")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(sql: str) -> str:
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?+)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def param_shape(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def observe(sql: str, params, elapsed: float, rows_fetched: int, rows_affected: int, route: str, many: bool = False):
+    if elapsed < _threshold:
+        return
+    if SLOW_QUERY_SAMPLE < 1 and random.random() >= SLOW_QUERY_SAMPLE:
+        return
+
+    normalized = normalize(sql)
+    entry = {
+        "at": time.time(),
+        "duration_ms": round(elapsed * 1000, 2),
+        "route": route,
+        "statement": normalized,
+        "params_shape": f"{len(params)} rows" if many else param_shape(params),
+        "rows_fetched": rows_fetched,
+        "rows_affected": rows_affected,
+    }
+    print(f"느린 쿼리 {entry['duration_ms']}ms [{route}] {normalized}")
+
+    explain = False
+    with _lock:
+        _recent.append(entry)
+        if (
+            SLOW_QUERY_EXPLAIN
+            and not many
+            and normalized not in _plans
+            and len(_plans) < MAX_PLANS
+            and normalized.upper().startswith(EXPLAINABLE)
+        ):
+            _plans[normalized] = None
+            explain = True
+    if explain:
+        _executor.submit(_capture_plan, normalized, sql, params)
+
+
+def _capture_plan(normalized: str, sql: str, params):
+    # 요청 연결은 결과를 아직 읽는 중일 수 있으므로 계측하지 않는 별도 연결을 씁니다.
+    from db import session
+
+    conn = None
+    try:
+        conn = session._connect()
+        cursor = conn.cursor(dictionary=True)
+        prefix = "EXPLAIN QUERY PLAN " if session.DB_BACKEND == "sqlite" else "EXPLAIN "
+        cursor.execute(prefix + sql, params)
+        plan = [{key: _plain(value) for key, value in row.items()} for row in cursor.fetchall()]
+        conn.rollback()
+    except Exception as e:
+        plan = [{"error": str(e)}]
+    finally:
+        if conn is not None:
+            conn.close()
+    with _lock:
+        _plans[normalized] = plan
+
+
+def _plain(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode(errors="replace")
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def recent(limit: int = 50) -> list:
+    with _lock:
+        entries = list(_recent)[-limit:]
+        plans = dict(_plans)
+    return [dict(entry, plan=plans.get(entry["statement"])) for entry in reversed(entries)]
+
+
+def clear():
+    with _lock:
+        _recent.clear()
+        _plans.clear()
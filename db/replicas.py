@@ -0,0 +1,137 @@
+
+import mysql.connector
+import threading
+import time
+from itertools import count
+
+# --- 읽기 복제본 라우팅 ---
+# 읽기 전용 요청은 복제본 중 사용 중인 연결이 가장 적은 곳으로 보내고(같으면 돌아가며),
+# 연결에 실패한 복제본은 일정 시간(cooldown) 후보에서 빼 두었다가 다시 시도합니다.
+# 쓰기를 한 사용자는 잠시 동안(StickyWrites) 주 DB 에서 읽어 복제 지연 중에도 자신이 쓴 값을 봅니다.
+# 이미 받은 복제본 연결에서 쿼리가 실패해도(ReplicaConnection) 그 복제본을 후보에서 뺍니다.
+
+# SQL/데이터 문제라 복제본 상태와 관계없는 오류
+CALLER_ERRORS = (
+    mysql.connector.errors.ProgrammingError,
+    mysql.connector.errors.IntegrityError,
+    mysql.connector.errors.DataError,
+    mysql.connector.errors.NotSupportedError,
+)
+
+
+class Replica:
+    __slots__ = ("name", "pool", "down_until")
+
+    def __init__(self, name: str, pool):
+        self.name = name
+        self.pool = pool
+        self.down_until = 0.0
+
+
+class ReplicaSet:
+    def __init__(self, replicas: list, cooldown: float = 30.0):
+        self.replicas = replicas
+        self.cooldown = cooldown
+        self._rotation = count()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def candidates(self) -> list:
+        # 정상 복제본을 사용 중인 연결 수 순으로 돌려줍니다. 정렬이 안정적이므로
+        # 시작 위치를 돌려 두면 연결 수가 같을 때 라운드 로빈이 됩니다.
+        now = time.monotonic()
+        start = next(self._rotation) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        healthy = [replica for replica in ordered if replica.down_until <= now]
+        healthy.sort(key=lambda replica: replica.pool.in_use)
+        return healthy
+
+    def mark_down(self, replica: Replica, error: Exception):
+        replica.down_until = time.monotonic() + self.cooldown
+        print(f"읽기 복제본 {replica.name} 연결 실패, {self.cooldown:.0f}초 동안 제외합니다: {error}")
+
+    def close_all(self):
+        for replica in self.replicas:
+            replica.pool.close_all()
+
+
+class ReplicaCursor:
+    __slots__ = ("_cursor", "_owner")
+
+    def __init__(self, cursor, owner: "ReplicaConnection"):
+        self._cursor = cursor
+        self._owner = owner
+
+    def _call(self, method, *args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except mysql.connector.Error as e:
+            self._owner.failed(e)
+            raise
+
+    def execute(self, *args, **kwargs):
+        return self._call(self._cursor.execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._call(self._cursor.executemany, *args, **kwargs)
+
+    def fetchone(self):
+        return self._call(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._call(self._cursor.fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._call(self._cursor.fetchall)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ReplicaConnection:
+    # 복제본 풀 연결. 쿼리가 복제본 문제(연결 끊김 등)로 실패하면 복제본을 cooldown 동안 제외합니다.
+    # 실패한 요청은 그대로 오류를 받고, 다음 읽기부터 다른 복제본이나 주 DB 로 갑니다.
+    __slots__ = ("_conn", "_replicas", "_replica")
+
+    def __init__(self, conn, replicas: ReplicaSet, replica: Replica):
+        self._conn = conn
+        self._replicas = replicas
+        self._replica = replica
+
+    def failed(self, error: Exception):
+        if not isinstance(error, CALLER_ERRORS) and self._replica.down_until <= time.monotonic():
+            self._replicas.mark_down(self._replica, error)
+
+    def cursor(self, *args, **kwargs):
+        return ReplicaCursor(self._conn.cursor(*args, **kwargs), self)
+
+    def statement(self, sql: str):
+        cursor, sql = self._conn.statement(sql)
+        return ReplicaCursor(cursor, self), sql
+
+    def close(self):
+        return self._conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class StickyWrites:
+    # 키(사용자 ID) -> 주 DB 에서 읽어야 하는 기한. 오래된 항목은 커지면 정리합니다.
+    def __init__(self, ttl: float = 5.0, max_keys: int = 100000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + self.ttl
+            if len(self._until) > self.max_keys:
+                self._until = {k: until for k, until in self._until.items() if until > now}
+
+    def is_sticky(self, key) -> bool:
+        until = self._until.get(key)
+        return until is not None and until > time.monotonic()
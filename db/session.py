@@ -1,8 +1,14 @@
 
 import mysql.connector
 import os
+import time
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
+from db import sqlite_compat, profiler
+from db.backends import BACKENDS
+from db.pool import ConnectionPool, PoolTimeout
+from db.replicas import Replica, ReplicaConnection, ReplicaSet, StickyWrites
+from core.metrics import RequestStats, current_stats, DB_CONNECTIONS
 
 load_dotenv()
 
@@ -14,11 +20,203 @@ DB_CONFIG = {
     "database": os.environ.get("DB_NAME"),
 }
 
+# --- DB 백엔드 선택 ---
+# mysql(기본) 또는 sqlite (벤치마크/로컬용 대체 DB, db/sqlite_compat.py)
+DB_BACKEND = os.environ.get("DB_BACKEND", "mysql")
+SQLITE_PATH = os.environ.get("DB_SQLITE_PATH", "bustar.db")
+
+# --- 연결 풀 설정 ---
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "16"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "5"))
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "64"))
+
+# --- 읽기 복제본 설정 ---
+# DB_REPLICAS: 쉼표로 구분한 복제본 목록. mysql 은 host 또는 host:port (계정/DB 이름은 주 DB 와 같음),
+# sqlite 는 파일 경로입니다. 비어 있으면 모든 쿼리가 주 DB 로 갑니다.
+DB_REPLICAS = [target.strip() for target in os.environ.get("DB_REPLICAS", "").split(",") if target.strip()]
+DB_REPLICA_COOLDOWN = float(os.environ.get("DB_REPLICA_COOLDOWN", "30"))
+# 복제본 연결은 이 시간(초) 이상 쉬었으면 내주기 전에 ping 합니다. (주 DB 는 300초)
+DB_REPLICA_PING_SECONDS = float(os.environ.get("DB_REPLICA_PING_SECONDS", "1"))
+DB_STICKY_SECONDS = float(os.environ.get("DB_STICKY_SECONDS", "5"))
+
+
+def create_backend(name: str = DB_BACKEND, target: str = None):
+    if name == "sqlite":
+        if target:
+            return BACKENDS[name](target, read_only=True)
+        return BACKENDS[name](SQLITE_PATH)
+    config = DB_CONFIG
+    if target:
+        host, _, port = target.partition(":")
+        config = dict(DB_CONFIG, host=host)
+        if port:
+            config["port"] = int(port)
+    return BACKENDS[name](config)
+
+
+def create_pool(backend, recycle: float = 300.0) -> ConnectionPool:
+    return ConnectionPool(
+        backend,
+        size=DB_POOL_SIZE,
+        timeout=DB_POOL_TIMEOUT,
+        recycle=recycle,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+    )
+
+
+backend = create_backend()
+pool = create_pool(backend)
+# 잠시라도 쉬던 복제본 연결은 ping 해서, 복제본이 죽으면 쿼리 전에 알아채고 주 DB 로 넘깁니다.
+# 계속 쓰이는 연결에서 난 오류는 ReplicaConnection 이 복제본을 후보에서 뺍니다.
+replicas = ReplicaSet(
+    [
+        Replica(replica_backend.describe(), create_pool(replica_backend, recycle=DB_REPLICA_PING_SECONDS))
+        for replica_backend in (create_backend(target=target) for target in DB_REPLICAS)
+    ],
+    cooldown=DB_REPLICA_COOLDOWN,
+)
+sticky_writes = StickyWrites(DB_STICKY_SECONDS)
+
+# --- 계측 커서/연결 ---
+# 요청 처리 중(core/metrics.py 의 RequestStats 가 설정된 경우)이거나 느린 쿼리 로그가 켜져 있으면 감쌉니다.
+# 쿼리 수, 실행/조회 시간, 조회 행 수를 요청 통계에 더하고,
+# 문장 하나(실행 + 결과 조회)가 끝나면 db/profiler.py 에 넘겨 느린 쿼리를 기록합니다.
+class InstrumentedCursor:
+    __slots__ = ("_cursor", "_stats", "_pending")
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._pending = None  # [sql, params, 소요 시간, 조회 행 수, 영향 행 수, executemany 여부]
+
+    def _finish(self):
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        if profiler.enabled:
+            profiler.observe(
+                pending[0], pending[1], pending[2], pending[3], pending[4], self._stats.route, pending[5]
+            )
+
+    def _run(self, method, operation, params, args, kwargs, many):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return method(operation, params, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stats.queries += 1
+            self._stats.db_time += elapsed
+            self._pending = [operation, params, elapsed, 0, max(self._cursor.rowcount, 0), many]
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._run(self._cursor.execute, operation, params, args, kwargs, False)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._run(self._cursor.executemany, operation, seq_params, args, kwargs, True)
+
+    def _fetched(self, started, count):
+        elapsed = time.perf_counter() - started
+        self._stats.db_time += elapsed
+        self._stats.rows += count
+        if self._pending is not None:
+            self._pending[2] += elapsed
+            self._pending[3] += count
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(started, len(rows))
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    __slots__ = ("_conn", "_stats", "_cursors")
+
+    def __init__(self, conn, stats):
+        self._conn = conn
+        self._stats = stats
+        self._cursors = []
+
+    def cursor(self, *args, **kwargs):
+        cursor = InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._stats)
+        self._cursors.append(cursor)
+        return cursor
+
+    def statement(self, sql: str):
+        cursor, sql = self._conn.statement(sql)
+        cursor = InstrumentedCursor(cursor, self._stats)
+        self._cursors.append(cursor)
+        return cursor, sql
+
+    def _finish_cursors(self):
+        for cursor in self._cursors:
+            cursor._finish()
+
+    def commit(self):
+        self._finish_cursors()
+        return self._conn.commit()
+
+    def close(self):
+        self._finish_cursors()
+        self._cursors = []
+        return self._conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 # --- DB 연결 헬퍼 함수 ---
-def get_db_connection():
+def _acquire(read_only: bool, user_id):
+    if not read_only:
+        if user_id is not None:
+            sticky_writes.mark(user_id)
+    elif replicas and (user_id is None or not sticky_writes.is_sticky(user_id)):
+        for replica in replicas.candidates():
+            try:
+                conn = replica.pool.acquire()
+            except PoolTimeout:
+                continue  # 바쁜 복제본은 건너뛰고 다음 복제본 또는 주 DB 로
+            except mysql.connector.Error as e:
+                replicas.mark_down(replica, e)
+                continue
+            DB_CONNECTIONS.inc((replica.name,))
+            return ReplicaConnection(conn, replicas, replica)
+    conn = pool.acquire()
+    DB_CONNECTIONS.inc(("primary",))
+    return conn
+
+
+def _connect(read_only: bool = False, user_id=None):
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        return _acquire(read_only, user_id)
+    except PoolTimeout as e:
+        print(f"데이터베이스 연결 대기 시간 초과: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="데이터베이스 연결이 부족합니다. 잠시 후 다시 시도하세요.",
+        )
     except mysql.connector.Error as e:
         print(f"데이터베이스 연결 오류: {e}")
         raise HTTPException(
@@ -26,8 +224,75 @@ def get_db_connection():
             detail="데이터베이스 연결에 실패했습니다.",
         )
 
+
+def get_db_connection(read_only: bool = False, user_id=None):
+    # read_only=True 이면 읽기 복제본을 쓸 수 있습니다. (복제본이 없거나 모두 실패하면 주 DB)
+    # user_id 를 넘기면 쓰기 연결은 그 사용자를 잠시 주 DB 에 고정하고,
+    # 읽기 연결은 고정된 사용자라면 주 DB 에서 읽어 방금 쓴 값을 볼 수 있게 합니다.
+    stats = current_stats.get()
+    if stats is None:
+        if not profiler.enabled:
+            return _connect(read_only, user_id)
+        stats = RequestStats()
+    started = time.perf_counter()
+    try:
+        conn = _connect(read_only, user_id)
+    finally:
+        stats.acquire_time += time.perf_counter() - started
+    return InstrumentedConnection(conn, stats)
+
+# --- 교통(버스/정류장/노선/시간표) 테이블 DDL ---
+# 테이블 이름 자리({bus}, {station} ...)를 남겨 두어 GTFS 적재(db/gtfs_import.py)가
+# 같은 정의로 스테이징 테이블을 만들 수 있게 합니다.
+TRANSIT_TABLES = ["bus", "station", "bus_route", "bus_time"]
+
+TRANSIT_TABLE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS {bus} (
+        bus_number INT NOT NULL,
+        bus_type VARCHAR(50) NOT NULL,
+        PRIMARY KEY (bus_number)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {station} (
+        station_number INT NOT NULL,
+        station_name VARCHAR(50) NOT NULL,
+        latitude DOUBLE NULL, -- WGS84 위도
+        longitude DOUBLE NULL, -- WGS84 경도
+        PRIMARY KEY (station_number)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {bus_route} (
+        bus_number INT NOT NULL,
+        direction ENUM('up', 'down') NOT NULL, -- 'up': 상행, 'down': 하행
+        station_number INT NOT NULL,
+        station_order INT NOT NULL,
+        PRIMARY KEY (bus_number, direction, station_order),
+        FOREIGN KEY (bus_number) REFERENCES {bus}(bus_number) ON DELETE CASCADE,
+        FOREIGN KEY (station_number) REFERENCES {station}(station_number) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {bus_time} (
+        bus_number INT NOT NULL,
+        direction ENUM('up', 'down') NOT NULL, -- 'up': 상행, 'down': 하행
+        start_time TIME NOT NULL,
+        arrive_time TIME NOT NULL,
+        PRIMARY KEY (bus_number, start_time, direction),
+        FOREIGN KEY (bus_number) REFERENCES {bus}(bus_number) ON DELETE CASCADE
+    )
+    """,
+]
+
 # --- DB 초기화 (테이블 생성) 함수 ---
 def init_db():
+    if DB_BACKEND == "sqlite":
+        sqlite_compat.init_schema(SQLITE_PATH)
+        print(f"SQLite 데이터베이스 '{SQLITE_PATH}'가 준비되었습니다.")
+        return
+
     conn = None
     try:
         # DB_CONFIG에서 database를 제외하고 연결하여 DB가 없어도 접속 가능하게 함
@@ -70,6 +335,9 @@ def init_db():
             member_id INT NOT NULL,
             origin VARCHAR(255) NOT NULL,
             destination VARCHAR(255) NOT NULL,
+            used_at BIGINT NOT NULL DEFAULT 0, -- 마지막 사용 시각 (마이크로초)
+            UNIQUE KEY uq_recent_move_pair (member_id, origin, destination),
+            KEY idx_recent_move_recency (member_id, used_at),
             FOREIGN KEY(member_id) REFERENCES user(id) ON DELETE CASCADE
         )
         """)
@@ -109,44 +377,32 @@ def init_db():
         )
         """)
 
+        # 쿠폰 일괄 지급(캠페인) 작업과 진행 상황. cursor_id 까지의 사용자는 처리가 끝났습니다.
         cursor.execute("""
-        CREATE TABLE bus (
-            bus_number INT NOT NULL,    
-            bus_type VARCHAR(50) NOT NULL,
-            PRIMARY KEY (bus_number)
-        );
-        """)
-
-        cursor.execute("""
-        CREATE TABLE station (
-            station_number INT NOT NULL,             
-            station_name VARCHAR(50) NOT NULL,   
-            PRIMARY KEY (station_number)
-        );
-        """)
-
-        cursor.execute("""
-        CREATE TABLE bus_route (
-            bus_number INT NOT NULL,
-            direction ENUM('up', 'down') NOT NULL, -- 'up': 상행, 'down': 하행
-            station_number INT NOT NULL,
-            station_order INT NOT NULL,
-            PRIMARY KEY (bus_number, direction, station_order),
-            FOREIGN KEY (bus_number) REFERENCES bus(bus_number) ON DELETE CASCADE,
-            FOREIGN KEY (station_number) REFERENCES station(station_number) ON DELETE CASCADE
-        );
+        CREATE TABLE IF NOT EXISTS coupon_campaign (
+            campaign_id INT PRIMARY KEY AUTO_INCREMENT,
+            coupon_id INT NOT NULL,
+            grade VARCHAR(50) NULL,
+            min_total_point INT NULL,
+            max_total_point INT NULL,
+            start_period VARCHAR(255) NOT NULL,
+            end_period VARCHAR(255) NOT NULL,
+            chunk_size INT NOT NULL,
+            status VARCHAR(20) NOT NULL, -- 'running', 'paused', 'done', 'failed'
+            cursor_id INT NOT NULL DEFAULT 0,
+            max_user_id INT NOT NULL,
+            total_users INT NOT NULL,
+            scanned INT NOT NULL DEFAULT 0,
+            granted INT NOT NULL DEFAULT 0,
+            error VARCHAR(255) NULL,
+            created_at BIGINT NOT NULL,
+            updated_at BIGINT NOT NULL,
+            FOREIGN KEY(coupon_id) REFERENCES coupon(coupon_id) ON DELETE CASCADE
+        )
         """)
 
-        cursor.execute("""
-        CREATE TABLE bus_time (
-            bus_number INT NOT NULL,
-            direction ENUM('up', 'down') NOT NULL, -- 'up': 상행, 'down': 하행
-            start_time TIME NOT NULL,
-            arrive_time TIME NOT NULL,
-            PRIMARY KEY (bus_number, start_time, direction),
-            FOREIGN KEY (bus_number) REFERENCES bus(bus_number) ON DELETE CASCADE
-        );
-        """)
+        for ddl in TRANSIT_TABLE_DDL:
+            cursor.execute(ddl.format(**{table: table for table in TRANSIT_TABLES}))
 
         cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
         conn.commit()
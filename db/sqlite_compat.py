@@ -0,0 +1,333 @@
+
+import re
+import sqlite3
+import datetime
+import zlib
+from functools import lru_cache
+import mysql.connector
+
+# --- SQLite 대체 DB ---
+# 벤치마크/로컬 실행용으로 mysql.connector 연결과 같은 인터페이스를 흉내 내는 SQLite 연결입니다.
+# 라우터 코드는 그대로 두고 DB_BACKEND=sqlite 로만 전환할 수 있도록
+# %s 자리표시자, dictionary 커서, start_transaction(), mysql.connector.Error 예외를 맞춰 줍니다.
+
+
+def _adapt_timedelta(value: datetime.timedelta) -> str:
+    total = int(value.total_seconds())
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+def _convert_time(value: bytes) -> datetime.timedelta:
+    # MySQL TIME 컬럼과 동일하게 timedelta 로 돌려줍니다.
+    hours, minutes, seconds = (int(part) for part in value.decode().split(":"))
+    return datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
+
+
+sqlite3.register_adapter(datetime.timedelta, _adapt_timedelta)
+sqlite3.register_converter("TIME", _convert_time)
+
+
+# 변경 감지용 체크섬 쿼리(crud/crud_transit.py)에서 쓰는 MySQL 함수들
+def _crc32(value):
+    return None if value is None else zlib.crc32(str(value).encode())
+
+
+def _concat_ws(separator, *values):
+    return separator.join(str(value) for value in values if value is not None)
+
+
+class _BitXor:
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= value
+
+    def finalize(self):
+        return self.value
+
+
+@lru_cache(maxsize=1024)
+def translate(operation: str) -> str:
+    # MySQL 전용 구문을 SQLite 구문으로 변환합니다.
+    sql = operation.replace("%s", "?")
+    sql = re.sub(r"\s+FOR\s+UPDATE\b", "", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"^\s*INSERT\s+IGNORE\b", "INSERT OR IGNORE", sql, flags=re.IGNORECASE)
+    return sql
+
+
+def _to_mysql_error(e: sqlite3.Error) -> mysql.connector.Error:
+    if isinstance(e, sqlite3.IntegrityError):
+        return mysql.connector.errors.IntegrityError(msg=str(e))
+    if isinstance(e, sqlite3.OperationalError):
+        return mysql.connector.errors.OperationalError(msg=str(e))
+    return mysql.connector.errors.DatabaseError(msg=str(e))
+
+
+# MySQL 은 autocommit 이 꺼져 있으면 SELECT 를 포함한 첫 문장에서 트랜잭션을 시작합니다.
+# (SQLite 는 쓰기 문장에서만 시작하므로 이 문장들을 실행하면 트랜잭션이 열린 것으로 표시합니다)
+_TRANSACTIONAL = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+class SQLiteCursor:
+    def __init__(self, conn: "SQLiteConnection", dictionary: bool = False):
+        self._conn = conn
+        self._cursor = conn._raw.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(col[0] for col in self._cursor.description or ())
+
+    def execute(self, operation: str, params=None):
+        if _TRANSACTIONAL.match(operation):
+            self._conn._implicit = True
+        try:
+            self._cursor.execute(translate(operation), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _to_mysql_error(e) from e
+
+    def executemany(self, operation: str, seq_params):
+        if _TRANSACTIONAL.match(operation):
+            self._conn._implicit = True
+        try:
+            self._cursor.executemany(translate(operation), seq_params)
+        except sqlite3.Error as e:
+            raise _to_mysql_error(e) from e
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size: int = 1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if not self._dictionary:
+            return rows
+        names = self.column_names
+        return [dict(zip(names, row)) for row in rows]
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path: str, read_only: bool = False):
+        # read_only 는 읽기 복제본 흉내용입니다. 파일이 없으면 새로 만들지 않고 연결 오류를 냅니다.
+        try:
+            self._raw = sqlite3.connect(
+                f"file:{path}?mode=ro" if read_only else path,
+                timeout=30,
+                check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                uri=read_only,
+            )
+            self._raw.create_function("CRC32", 1, _crc32, deterministic=True)
+            self._raw.create_function("CONCAT_WS", -1, _concat_ws, deterministic=True)
+            self._raw.create_aggregate("BIT_XOR", 1, _BitXor)
+            self._raw.execute("PRAGMA foreign_keys = ON")
+            self._raw.execute("PRAGMA busy_timeout = 30000")
+        except sqlite3.Error as e:
+            raise _to_mysql_error(e) from e
+        self._open = True
+        self._implicit = False  # 앞선 문장으로 트랜잭션이 암묵적으로 열렸는지
+
+    def cursor(self, dictionary: bool = False, prepared: bool = False, buffered: bool = False):
+        # SQLite 는 연결마다 자체 구문 캐시를 가지므로 prepared 옵션은 무시합니다.
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    def start_transaction(self):
+        # mysql.connector 처럼 이미 트랜잭션이 열려 있으면 오류입니다. (먼저 commit/rollback 해야 함)
+        if self.in_transaction:
+            raise mysql.connector.errors.ProgrammingError(msg="Transaction already in progress")
+        # SELECT ... FOR UPDATE 와 비슷하게 쓰기 잠금을 미리 잡습니다.
+        try:
+            self._raw.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            raise _to_mysql_error(e) from e
+        self._implicit = True
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._implicit or self._raw.in_transaction
+
+    def commit(self):
+        self._raw.commit()
+        self._implicit = False
+
+    def rollback(self):
+        self._raw.rollback()
+        self._implicit = False
+
+    def is_connected(self) -> bool:
+        return self._open
+
+    def ping(self, reconnect: bool = False):
+        pass
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        if self._open:
+            self._raw.close()
+            self._open = False
+
+
+def connect(path: str, read_only: bool = False) -> SQLiteConnection:
+    return SQLiteConnection(path, read_only=read_only)
+
+
+# --- SQLite 스키마 (db/session.py 의 init_db 와 동일한 테이블 구성) ---
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS user (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR(255) NOT NULL,
+        date VARCHAR(255) NOT NULL,
+        grade VARCHAR(50) NOT NULL DEFAULT '브론즈'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS coupon (
+        coupon_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        coupon_name VARCHAR(255) NOT NULL,
+        coupon_price INT NOT NULL,
+        coupon_discount INT,
+        coupon_affiliate VARCHAR(255),
+        coupon_period VARCHAR(255)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recent_move (
+        root_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        member_id INT NOT NULL REFERENCES user(id) ON DELETE CASCADE,
+        origin VARCHAR(255) NOT NULL,
+        destination VARCHAR(255) NOT NULL,
+        used_at BIGINT NOT NULL DEFAULT 0,
+        UNIQUE (member_id, origin, destination)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_recent_move_recency ON recent_move (member_id, used_at)",
+    """
+    CREATE TABLE IF NOT EXISTS usage_record (
+        id INT PRIMARY KEY REFERENCES user(id) ON DELETE CASCADE,
+        total_use INT NOT NULL,
+        month_use INT NOT NULL,
+        saved INT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS point (
+        id INT PRIMARY KEY REFERENCES user(id) ON DELETE CASCADE,
+        point INT NOT NULL,
+        use_point INT,
+        plus_point INT,
+        total_point INT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_coupon (
+        id INT NOT NULL REFERENCES user(id) ON DELETE CASCADE,
+        coupon_id INT NOT NULL REFERENCES coupon(coupon_id) ON DELETE CASCADE,
+        start_period VARCHAR(255),
+        end_period VARCHAR(255),
+        use_can INT NOT NULL,
+        use_finish INT NOT NULL,
+        finish_period INT NOT NULL,
+        PRIMARY KEY(id, coupon_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS coupon_campaign (
+        campaign_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        coupon_id INT NOT NULL REFERENCES coupon(coupon_id) ON DELETE CASCADE,
+        grade VARCHAR(50) NULL,
+        min_total_point INT NULL,
+        max_total_point INT NULL,
+        start_period VARCHAR(255) NOT NULL,
+        end_period VARCHAR(255) NOT NULL,
+        chunk_size INT NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        cursor_id INT NOT NULL DEFAULT 0,
+        max_user_id INT NOT NULL,
+        total_users INT NOT NULL,
+        scanned INT NOT NULL DEFAULT 0,
+        granted INT NOT NULL DEFAULT 0,
+        error VARCHAR(255) NULL,
+        created_at BIGINT NOT NULL,
+        updated_at BIGINT NOT NULL
+    )
+    """,
+]
+
+# 교통 테이블은 db/session.py 와 마찬가지로 이름 자리를 남겨 둡니다.
+TRANSIT_TABLE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS {bus} (
+        bus_number INT NOT NULL PRIMARY KEY,
+        bus_type VARCHAR(50) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {station} (
+        station_number INT NOT NULL PRIMARY KEY,
+        station_name VARCHAR(50) NOT NULL,
+        latitude DOUBLE,
+        longitude DOUBLE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {bus_route} (
+        bus_number INT NOT NULL REFERENCES {bus}(bus_number) ON DELETE CASCADE,
+        direction TEXT NOT NULL CHECK (direction IN ('up', 'down')),
+        station_number INT NOT NULL REFERENCES {station}(station_number) ON DELETE CASCADE,
+        station_order INT NOT NULL,
+        PRIMARY KEY (bus_number, direction, station_order)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {bus_time} (
+        bus_number INT NOT NULL REFERENCES {bus}(bus_number) ON DELETE CASCADE,
+        direction TEXT NOT NULL CHECK (direction IN ('up', 'down')),
+        start_time TIME NOT NULL,
+        arrive_time TIME NOT NULL,
+        PRIMARY KEY (bus_number, start_time, direction)
+    )
+    """,
+]
+
+SCHEMA = SCHEMA + [
+    ddl.format(bus="bus", station="station", bus_route="bus_route", bus_time="bus_time")
+    for ddl in TRANSIT_TABLE_DDL
+]
+
+
+def init_schema(path: str):
+    raw = sqlite3.connect(path)
+    try:
+        raw.execute("PRAGMA journal_mode = WAL")
+        for statement in SCHEMA:
+            raw.execute(statement)
+        raw.commit()
+    finally:
+        raw.close()
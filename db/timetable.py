@@ -0,0 +1,298 @@
+
+import argparse
+import datetime
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+# --- 공유 메모리(mmap) 시간표 파일 ---
+# bus / station / bus_route / bus_time 을 고정 폭 int32 배열과 문자열 테이블로 직렬화한 파일입니다.
+# 빌더가 한 번 만들고, uvicorn 워커들은 같은 파일을 읽기 전용으로 mmap 하므로
+# 운영체제 페이지 캐시를 공유해 호스트당 한 번만 메모리를 쓰고, 워커 시작 시 다시 만들 필요가 없습니다.
+# 파일 교체는 임시 파일에 쓴 뒤 os.replace 로 하므로 읽는 쪽은 항상 완전한 파일만 봅니다.
+#
+#   python -m db.timetable build              # DB -> TIMETABLE_PATH
+#   python -m db.timetable info
+#
+# 레이아웃 (리틀 엔디언, 모든 구역은 4바이트 정렬):
+#   header: magic, version, 버스/정류장/노선 정류장/운행/문자열 수, 구역별 시작 위치
+#   buses:    bus_number[nb] (오름차순), bus_type(문자열 번호)[nb], route_offsets[nb+1], trip_offsets[nb+1]
+#   stations: station_number[ns] (오름차순), station_name(문자열 번호)[ns]
+#   routes:   direction[nr], station_number[nr], station_order[nr]   (버스, 방향, 순서 정렬)
+#   trips:    direction[nt], start_seconds[nt], arrive_seconds[nt]    (버스, 방향, 출발 시각 정렬)
+#   strings:  offsets[nstr+1], UTF-8 blob
+
+TIMETABLE_PATH = os.environ.get("TIMETABLE_PATH", "")
+TIMETABLE_CHECK_SECONDS = float(os.environ.get("TIMETABLE_CHECK_SECONDS", "1"))
+
+MAGIC = b"BSTT"
+VERSION = 1
+DIRECTIONS = ("up", "down")
+SECTIONS = (
+    "bus_number",
+    "bus_type",
+    "route_offsets",
+    "trip_offsets",
+    "station_number",
+    "station_name",
+    "route_direction",
+    "route_station",
+    "route_order",
+    "trip_direction",
+    "trip_start",
+    "trip_arrive",
+    "string_offsets",
+    "string_blob",
+)
+HEADER = struct.Struct("<4sI5I" + "I" * len(SECTIONS))
+
+
+def _seconds(value) -> int:
+    if isinstance(value, datetime.timedelta):
+        return int(value.total_seconds())
+    if isinstance(value, datetime.time):
+        return value.hour * 3600 + value.minute * 60 + value.second
+    hours, minutes, seconds = str(value).split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+# --- 빌더 ---
+def build(buses, stations, routes, trips) -> bytes:
+    # buses: [(bus_number, bus_type)], stations: [(station_number, station_name)]
+    # routes: [(bus_number, direction, station_number, station_order)]
+    # trips: [(bus_number, direction, start_time, arrive_time)]
+    strings, string_index = [], {}
+
+    def intern(value: str) -> int:
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    buses = sorted(buses)
+    stations = sorted(stations)
+    bus_position = {number: i for i, (number, _) in enumerate(buses)}
+    direction_index = {name: i for i, name in enumerate(DIRECTIONS)}
+
+    routes = sorted(
+        (r for r in routes if r[0] in bus_position),
+        key=lambda r: (r[0], direction_index[r[1]], r[3]),
+    )
+    trips = sorted(
+        ((t[0], t[1], _seconds(t[2]), _seconds(t[3])) for t in trips if t[0] in bus_position),
+        key=lambda t: (t[0], direction_index[t[1]], t[2]),
+    )
+
+    def offsets(rows):
+        result = array("i", [0] * (len(buses) + 1))
+        for row in rows:
+            result[bus_position[row[0]] + 1] += 1
+        for i in range(len(buses)):
+            result[i + 1] += result[i]
+        return result
+
+    sections = {
+        "bus_number": array("i", (b[0] for b in buses)),
+        "bus_type": array("i", (intern(b[1]) for b in buses)),
+        "route_offsets": offsets(routes),
+        "trip_offsets": offsets(trips),
+        "station_number": array("i", (s[0] for s in stations)),
+        "station_name": array("i", (intern(s[1]) for s in stations)),
+        "route_direction": array("i", (direction_index[r[1]] for r in routes)),
+        "route_station": array("i", (r[2] for r in routes)),
+        "route_order": array("i", (r[3] for r in routes)),
+        "trip_direction": array("i", (direction_index[t[1]] for t in trips)),
+        "trip_start": array("i", (t[2] for t in trips)),
+        "trip_arrive": array("i", (t[3] for t in trips)),
+    }
+    encoded = [s.encode() for s in strings]
+    string_offsets = array("i", [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+    sections["string_offsets"] = string_offsets
+
+    body, positions = bytearray(), []
+    for name in SECTIONS[:-1]:
+        positions.append(HEADER.size + len(body))
+        data = sections[name]
+        if sys.byteorder != "little":
+            data = array("i", data)
+            data.byteswap()
+        body += data.tobytes()
+    positions.append(HEADER.size + len(body))
+    body += b"".join(encoded)
+
+    header = HEADER.pack(
+        MAGIC, VERSION, len(buses), len(stations), len(routes), len(trips), len(strings), *positions
+    )
+    return header + bytes(body)
+
+
+def write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def build_from_db(path: str) -> dict:
+    from db.session import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT bus_number, bus_type FROM bus")
+        buses = cursor.fetchall()
+        cursor.execute("SELECT station_number, station_name FROM station")
+        stations = cursor.fetchall()
+        cursor.execute("SELECT bus_number, direction, station_number, station_order FROM bus_route")
+        routes = cursor.fetchall()
+        cursor.execute("SELECT bus_number, direction, start_time, arrive_time FROM bus_time")
+        trips = cursor.fetchall()
+    finally:
+        conn.close()
+    write_atomic(path, build(buses, stations, routes, trips))
+    return {"bus": len(buses), "station": len(stations), "bus_route": len(routes), "bus_time": len(trips)}
+
+
+# --- 읽기 전용 뷰 ---
+class Timetable:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, nb, ns, nr, nt, nstr, *positions = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"시간표 파일 형식이 올바르지 않습니다: {path}")
+        self.counts = {"bus": nb, "station": ns, "bus_route": nr, "bus_time": nt}
+        lengths = {
+            "bus_number": nb,
+            "bus_type": nb,
+            "route_offsets": nb + 1,
+            "trip_offsets": nb + 1,
+            "station_number": ns,
+            "station_name": ns,
+            "route_direction": nr,
+            "route_station": nr,
+            "route_order": nr,
+            "trip_direction": nt,
+            "trip_start": nt,
+            "trip_arrive": nt,
+            "string_offsets": nstr + 1,
+        }
+        for name, position in zip(SECTIONS[:-1], positions):
+            setattr(self, name, view[position : position + 4 * lengths[name]].cast("i"))
+        self.string_blob = view[positions[-1] :]
+
+    def string(self, index: int) -> str:
+        return bytes(self.string_blob[self.string_offsets[index] : self.string_offsets[index + 1]]).decode()
+
+    def _bus_index(self, bus_number: int):
+        i = bisect_left(self.bus_number, bus_number)
+        if i < len(self.bus_number) and self.bus_number[i] == bus_number:
+            return i
+        return None
+
+    def station_name_of(self, station_number: int):
+        i = bisect_left(self.station_number, station_number)
+        if i < len(self.station_number) and self.station_number[i] == station_number:
+            return self.string(self.station_name[i])
+        return None
+
+    def bus_numbers(self) -> list:
+        return self.bus_number.tolist()
+
+    # bus_route JOIN station: [{"direction", "station_order", "station_name"}] (방향, 순서 정렬)
+    def routes(self, bus_number: int) -> list:
+        i = self._bus_index(bus_number)
+        if i is None:
+            return []
+        result = []
+        for j in range(self.route_offsets[i], self.route_offsets[i + 1]):
+            station_name = self.station_name_of(self.route_station[j])
+            if station_name is None:
+                continue  # JOIN 과 같이 없는 정류장은 제외합니다.
+            result.append(
+                {
+                    "direction": DIRECTIONS[self.route_direction[j]],
+                    "station_order": self.route_order[j],
+                    "station_name": station_name,
+                }
+            )
+        return result
+
+    # bus_time: SELECT * FROM bus_time 과 같은 행 형태 (방향, 출발 시각 정렬)
+    def times(self, bus_number: int) -> list:
+        i = self._bus_index(bus_number)
+        if i is None:
+            return []
+        return [
+            {
+                "bus_number": bus_number,
+                "direction": DIRECTIONS[self.trip_direction[j]],
+                "start_time": datetime.timedelta(seconds=self.trip_start[j]),
+                "arrive_time": datetime.timedelta(seconds=self.trip_arrive[j]),
+            }
+            for j in range(self.trip_offsets[i], self.trip_offsets[i + 1])
+        ]
+
+
+# --- 워커에서 사용하는 현재 시간표 ---
+# 파일이 교체되면(inode/mtime 변경) 다음 조회 때 새 파일을 다시 mmap 합니다.
+# 이전 매핑은 참조가 모두 사라지면 닫힙니다.
+_current = None
+_current_stat = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_timetable():
+    global _current, _current_stat, _checked_at
+    if not TIMETABLE_PATH:
+        return None
+    now = time.monotonic()
+    if _current is not None and now - _checked_at < TIMETABLE_CHECK_SECONDS:
+        return _current
+    with _lock:
+        _checked_at = now
+        try:
+            stat = os.stat(TIMETABLE_PATH)
+        except FileNotFoundError:
+            _current, _current_stat = None, None
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key != _current_stat:
+            try:
+                _current = Timetable(TIMETABLE_PATH)
+                _current_stat = key
+            except (OSError, ValueError) as e:
+                print(f"시간표 파일을 열 수 없습니다: {e}")
+        return _current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="mmap 시간표 파일 생성/확인")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--path", default=TIMETABLE_PATH or "timetable.bin")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        counts = build_from_db(args.path)
+        print(f"시간표 파일 생성 완료 ({time.perf_counter() - started:.2f}s): {args.path} {counts}")
+    else:
+        table = Timetable(args.path)
+        print(f"{args.path}: {os.path.getsize(args.path)} bytes {table.counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import argparse
+import datetime
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import numpy as np
+from db.timetable import write_atomic
+
+# --- 정류장 간 최소 탑승 시간 행렬 파일 ---
+# 모든 정류장 쌍 (from, to)에 대해 갈아타지 않고 한 노선(버스 + 방향)으로 가는 최소 탑승 시간(초)과
+# 그 노선을 미리 계산해 uint16 정방 행렬 두 개로 저장합니다. 조회는 정류장 번호 -> 행렬 위치
+# 사전과 배열 인덱싱뿐이라 O(1) 입니다. 시간표 파일(db/timetable.py)처럼 워커들이 mmap 해서 공유합니다.
+#
+# bus_time 에는 운행별 출발/도착 시각만 있으므로 정류장 사이 시간은
+# 노선 운행 시간(중앙값)을 정류장 좌표로 구한 구간 거리 비율로 나눠 추정합니다.
+# 좌표가 없는 구간은 알려진 구간 평균 거리로, 시간표가 없는 노선은 TRAVEL_MATRIX_DEFAULT_SPEED_KMH 로 계산합니다.
+#
+#   python -m db.travel_matrix build                 # DB -> TRAVEL_MATRIX_PATH
+#   python -m db.travel_matrix watch --interval 60   # 바뀐 노선만 다시 계산해 파일 교체
+#   python -m db.travel_matrix info
+#
+# watch 는 노선별 체크섬(crud/crud_transit.py)을 비교해 바뀐 버스와 좌표가 바뀐 정류장을 지나는 버스의
+# 노선만 다시 읽고, 그 노선이 지나던/지나는 정류장 쌍만 다시 계산합니다. 정류장이 추가/삭제되면 전체를 다시 만듭니다.
+#
+# 레이아웃 (리틀 엔디언, 모든 구역은 4바이트 정렬):
+#   header: magic, version, 정류장 수(n), 노선 수, 구역별 시작 위치
+#   station_number: int32[n] (오름차순)
+#   line_bus, line_direction: int32[노선 수]
+#   seconds: uint16[n * n]  (from 위치 * n + to 위치, UNREACHABLE 이면 직통 노선 없음)
+#   line:    uint16[n * n]  (최소 시간 노선 번호)
+
+TRAVEL_MATRIX_PATH = os.environ.get("TRAVEL_MATRIX_PATH", "")
+TRAVEL_MATRIX_CHECK_SECONDS = float(os.environ.get("TRAVEL_MATRIX_CHECK_SECONDS", "1"))
+TRAVEL_MATRIX_DEFAULT_SPEED_KMH = float(os.environ.get("TRAVEL_MATRIX_DEFAULT_SPEED_KMH", "20"))
+
+MAGIC = b"BSTM"
+VERSION = 1
+DIRECTIONS = ("up", "down")
+UNREACHABLE = 0xFFFF
+MAX_SECONDS = UNREACHABLE - 1
+SECTIONS = ("station_number", "line_bus", "line_direction", "seconds", "line")
+HEADER = struct.Struct("<4sIII" + "I" * len(SECTIONS))
+EARTH_RADIUS_M = 6371008.8
+
+
+def _seconds(value) -> int:
+    if isinstance(value, datetime.timedelta):
+        return int(value.total_seconds())
+    hours, minutes, seconds = str(value).split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def _segment_meters(latitudes, longitudes):
+    # 이웃한 정류장 사이 대원 거리. 좌표가 없으면 nan
+    lat, lon = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def line_profile(stops: list, trip_seconds: list):
+    # stops: 정류장 순서대로의 (station_number, latitude, longitude)
+    # -> (정류장 번호 배열, 출발 정류장부터의 누적 초 배열). 추정할 수 없으면 None
+    if len(stops) < 2:
+        return None
+    coords = np.array([(np.nan if lat is None else lat, np.nan if lon is None else lon) for _, lat, lon in stops])
+    segments = _segment_meters(coords[:, 0], coords[:, 1])
+    known = segments[~np.isnan(segments)]
+    segments[np.isnan(segments)] = known.mean() if len(known) else 1.0
+    distance = np.concatenate(([0.0], np.cumsum(segments)))
+    if trip_seconds:
+        duration = float(np.median(trip_seconds))
+    elif len(known):
+        duration = distance[-1] / (TRAVEL_MATRIX_DEFAULT_SPEED_KMH * 1000 / 3600)
+    else:
+        return None
+    if distance[-1] > 0:
+        cumulative = duration * distance / distance[-1]
+    else:
+        cumulative = np.linspace(0.0, duration, len(stops))
+    return np.array([station for station, _, _ in stops], dtype=np.int64), cumulative
+
+
+# --- 빌더 ---
+class MatrixBuilder:
+    def __init__(self):
+        self.stations = np.zeros(0, dtype=np.int64)
+        self.line_keys = []  # 노선 번호 -> (bus_number, direction). 빌더가 살아 있는 동안 번호는 바뀌지 않습니다.
+        self._line_ids = {}
+        self._pairs = {}  # 노선 번호 -> (행렬 위치 배열, 초 배열)
+        self._bus_stations = {}  # bus_number -> 지나는 정류장 번호들
+        self._checksums = None
+        self._station_checksums = None
+        self.seconds = np.zeros(0, dtype=np.uint16)
+        self.line = np.zeros(0, dtype=np.uint16)
+
+    def _line_id(self, key: tuple) -> int:
+        line_id = self._line_ids.get(key)
+        if line_id is None:
+            if len(self.line_keys) >= UNREACHABLE:
+                raise ValueError("노선 수가 너무 많습니다.")
+            line_id = self._line_ids[key] = len(self.line_keys)
+            self.line_keys.append(key)
+        return line_id
+
+    def _load_lines(self, stop_rows: list, trip_rows: list, bus_numbers) -> set:
+        # bus_numbers 의 노선 조각을 새로 만들고 바뀐 행렬 위치를 돌려줍니다.
+        n = len(self.stations)
+        affected = set()
+        for bus_number in bus_numbers:
+            for direction in DIRECTIONS:
+                pairs = self._pairs.pop(self._line_ids.get((bus_number, direction)), None)
+                if pairs is not None:
+                    affected.update(pairs[0].tolist())
+            self._bus_stations.pop(bus_number, None)
+
+        stops, trips = {}, {}
+        for row in sorted(stop_rows, key=lambda r: (r["bus_number"], r["direction"], r["station_order"])):
+            stops.setdefault((row["bus_number"], row["direction"]), []).append(
+                (row["station_number"], row["latitude"], row["longitude"])
+            )
+            self._bus_stations.setdefault(row["bus_number"], set()).add(row["station_number"])
+        for row in trip_rows:
+            seconds = _seconds(row["arrive_time"]) - _seconds(row["start_time"])
+            trips.setdefault((row["bus_number"], row["direction"]), []).append(seconds % 86400)
+
+        for key, line_stops in stops.items():
+            profile = line_profile(line_stops, trips.get(key, []))
+            if profile is None:
+                continue
+            station_numbers, cumulative = profile
+            position = np.searchsorted(self.stations, station_numbers)
+            i, j = np.triu_indices(len(position), 1)
+            keep = position[i] != position[j]  # 순환 노선의 같은 정류장
+            cells = position[i][keep] * n + position[j][keep]
+            seconds = np.minimum(np.rint(cumulative[j][keep] - cumulative[i][keep]), MAX_SECONDS).astype(np.int64)
+            self._pairs[self._line_id(key)] = (cells, seconds)
+            affected.update(cells.tolist())
+        return affected
+
+    def _apply(self, cells=None):
+        # cells 가 None 이면 전체, 아니면 해당 위치만 모든 노선에서 최소값을 다시 고릅니다.
+        if cells is not None:
+            cells = np.fromiter(cells, dtype=np.int64, count=len(cells))
+            self.seconds[cells] = UNREACHABLE
+            self.line[cells] = UNREACHABLE
+            mask = np.zeros(len(self.seconds), dtype=bool)
+            mask[cells] = True
+        else:
+            self.seconds[:] = UNREACHABLE
+            self.line[:] = UNREACHABLE
+        if not self._pairs:
+            return
+        all_cells = np.concatenate([line_cells for line_cells, _ in self._pairs.values()])
+        all_seconds = np.concatenate([seconds for _, seconds in self._pairs.values()])
+        all_lines = np.concatenate([np.full(len(line_cells), line_id) for line_id, (line_cells, _) in self._pairs.items()])
+        if cells is not None:
+            keep = mask[all_cells]
+            all_cells, all_seconds, all_lines = all_cells[keep], all_seconds[keep], all_lines[keep]
+        # 시간이 같으면 (bus_number, direction) 이 작은 노선을 고릅니다. (다시 만들어도 결과가 같도록)
+        rank = np.empty(len(self.line_keys), dtype=np.int64)
+        rank[sorted(range(len(self.line_keys)), key=self.line_keys.__getitem__)] = np.arange(len(self.line_keys))
+        order = np.lexsort((rank[all_lines], all_seconds, all_cells))
+        all_cells, all_seconds, all_lines = all_cells[order], all_seconds[order], all_lines[order]
+        first = np.ones(len(all_cells), dtype=bool)
+        first[1:] = all_cells[1:] != all_cells[:-1]
+        self.seconds[all_cells[first]] = all_seconds[first]
+        self.line[all_cells[first]] = all_lines[first]
+
+    def update(self, conn) -> set:
+        # DB 와 비교해 바뀐 버스 번호들을 돌려줍니다. (처음이거나 정류장 목록이 바뀌면 전체)
+        from crud import crud_transit
+
+        checksums = crud_transit.get_bus_checksums(conn)
+        station_checksums = crud_transit.get_station_checksums(conn)
+        if self._station_checksums is None or station_checksums.keys() != self._station_checksums.keys():
+            self.stations = np.array(sorted(station_checksums), dtype=np.int64)
+            n = len(self.stations)
+            self._pairs.clear()
+            self._bus_stations.clear()
+            stop_rows, trip_rows = crud_transit.get_line_inputs(conn)
+            self._load_lines(stop_rows, trip_rows, ())
+            self.seconds = np.full(n * n, UNREACHABLE, dtype=np.uint16)
+            self.line = np.full(n * n, UNREACHABLE, dtype=np.uint16)
+            self._apply()
+            changed = set(checksums)
+        else:
+            # 노선/시간표가 바뀐 버스 + 좌표(이름)가 바뀐 정류장을 지나는 버스
+            changed = {
+                n
+                for n in checksums.keys() | self._checksums.keys()
+                if checksums.get(n, (None,))[1:] != self._checksums.get(n, (None,))[1:]
+            }
+            moved = {
+                s for s in station_checksums if station_checksums[s] != self._station_checksums[s]
+            }
+            if moved:
+                changed |= {bus for bus, stations in self._bus_stations.items() if stations & moved}
+            if changed:
+                stop_rows, trip_rows = crud_transit.get_line_inputs(conn, changed)
+                self._apply(self._load_lines(stop_rows, trip_rows, changed))
+        self._checksums, self._station_checksums = checksums, station_checksums
+        return changed
+
+    def to_bytes(self) -> bytes:
+        n = len(self.stations)
+        sections = {
+            "station_number": self.stations.astype("<i4"),
+            "line_bus": np.array([bus for bus, _ in self.line_keys], dtype="<i4"),
+            "line_direction": np.array([DIRECTIONS.index(d) for _, d in self.line_keys], dtype="<i4"),
+            "seconds": self.seconds.astype("<u2"),
+            "line": self.line.astype("<u2"),
+        }
+        body, positions = bytearray(), []
+        for name in SECTIONS:
+            positions.append(HEADER.size + len(body))
+            body += sections[name].tobytes()
+            body += b"\0" * (-len(body) % 4)
+        return HEADER.pack(MAGIC, VERSION, n, len(self.line_keys), *positions) + bytes(body)
+
+
+def build_from_db(path: str, builder: MatrixBuilder = None) -> tuple:
+    # (빌더, 바뀐 버스 번호들). 바뀐 것이 없으면 파일을 다시 쓰지 않습니다.
+    from db.session import get_db_connection
+
+    builder = builder or MatrixBuilder()
+    conn = get_db_connection()
+    try:
+        changed = builder.update(conn)
+    finally:
+        conn.close()
+    if changed or not os.path.exists(path):
+        write_atomic(path, builder.to_bytes())
+    return builder, changed
+
+
+# --- 읽기 전용 뷰 ---
+class TravelMatrix:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, n, lines, *positions = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"소요 시간 행렬 파일 형식이 올바르지 않습니다: {path}")
+        if sys.byteorder != "little":
+            raise ValueError("소요 시간 행렬 파일은 리틀 엔디언 서버에서만 읽을 수 있습니다.")
+        self.counts = {"station": n, "line": lines}
+        self.size = n
+        self.station_number = view[positions[0] : positions[0] + 4 * n].cast("i")
+        self.line_bus = view[positions[1] : positions[1] + 4 * lines].cast("i")
+        self.line_direction = view[positions[2] : positions[2] + 4 * lines].cast("i")
+        self.seconds = view[positions[3] : positions[3] + 2 * n * n].cast("H")
+        self.line = view[positions[4] : positions[4] + 2 * n * n].cast("H")
+        self.index = {number: i for i, number in enumerate(self.station_number.tolist())}
+
+    def lookup(self, from_station: int, to_station: int):
+        # (초, bus_number, direction). 직통 노선이 없으면 None, 없는 정류장이면 KeyError
+        cell = self.index[from_station] * self.size + self.index[to_station]
+        seconds = self.seconds[cell]
+        if seconds == UNREACHABLE:
+            return None
+        line = self.line[cell]
+        return seconds, self.line_bus[line], DIRECTIONS[self.line_direction[line]]
+
+
+# --- 워커에서 사용하는 현재 행렬 (db/timetable.py 와 같은 방식으로 파일 교체를 감지) ---
+_current = None
+_current_stat = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_travel_matrix():
+    global _current, _current_stat, _checked_at
+    if not TRAVEL_MATRIX_PATH:
+        return None
+    now = time.monotonic()
+    if _current is not None and now - _checked_at < TRAVEL_MATRIX_CHECK_SECONDS:
+        return _current
+    with _lock:
+        _checked_at = now
+        try:
+            stat = os.stat(TRAVEL_MATRIX_PATH)
+        except FileNotFoundError:
+            _current, _current_stat = None, None
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key != _current_stat:
+            try:
+                _current = TravelMatrix(TRAVEL_MATRIX_PATH)
+                _current_stat = key
+            except (OSError, ValueError) as e:
+                print(f"소요 시간 행렬 파일을 열 수 없습니다: {e}")
+        return _current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="정류장 간 소요 시간 행렬 파일 생성/확인")
+    parser.add_argument("command", choices=["build", "watch", "info"])
+    parser.add_argument("--path", default=TRAVEL_MATRIX_PATH or "travel_matrix.bin")
+    parser.add_argument("--interval", type=float, default=60.0, help="watch: 변경 확인 주기 (초)")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        matrix = TravelMatrix(args.path)
+        reachable = int((np.frombuffer(matrix.seconds, dtype=np.uint16) != UNREACHABLE).sum())
+        print(f"{args.path}: {os.path.getsize(args.path)} bytes {matrix.counts}, 직통 쌍 {reachable}개")
+        return 0
+
+    builder = None
+    while True:
+        started = time.perf_counter()
+        builder, changed = build_from_db(args.path, builder)
+        if changed:
+            print(
+                f"소요 시간 행렬 갱신 ({time.perf_counter() - started:.2f}s): {args.path} "
+                f"정류장 {len(builder.stations)}개, 바뀐 버스 {len(changed)}개"
+            )
+        if args.command == "build":
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,32 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from core.metrics import MetricsMiddleware, render_prometheus
+from core.admission import AdmissionMiddleware
 # from db.session import init_db
-from api import user, coupon, usage_record, point, user_coupon, purchase, bus_routes, bus_times, bus, stations
+from services.warmup import STARTUP_BLOCKING, warmup
+from db import session
+from api import user, coupon, usage_record, point, user_coupon, purchase, bus_routes, bus_times, bus, stations, admin, recent_move, live, campaign
+
+
+# 시작 시 DB 연결/자주 읽는 데이터를 미리 준비하고(services/warmup.py), 종료 시 풀의 연결을 닫습니다.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup.start()
+    if STARTUP_BLOCKING:
+        await asyncio.to_thread(warmup.wait)
+    yield
+    session.pool.close_all()
+    session.replicas.close_all()
+
 
 # FastAPI 애플리케이션 인스턴스 생성
 app = FastAPI(
     title="버스 혼잡도 분산 앱 백엔드 API (최종)",
     description="지역 버스 혼잡도 분산을 위한 FastAPI 기반 백엔드 API입니다. MySQL 데이터베이스를 사용하며 사용자 등급제 및 상품 구매 기능을 포함합니다.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # 데이터베이스 및 테이블 초기화 (애플리케이션 시작 시 1회 실행)
@@ -14,6 +34,13 @@ app = FastAPI(
 # def on_startup():
 #     init_db()
 
+# 라우트별 동시 처리 한도/대기열 초과 요청 차단 (503 + Retry-After)
+app.add_middleware(AdmissionMiddleware)
+
+# 요청별 처리 시간/DB 계측 (Server-Timing 헤더, /metrics)
+# 나중에 추가한 미들웨어가 바깥쪽이므로 차단된 요청도 계측됩니다.
+app.add_middleware(MetricsMiddleware)
+
 # API 라우터 포함
 app.include_router(user.router, tags=["User"], prefix="/api")
 app.include_router(coupon.router, tags=["Coupon"], prefix="/api")
@@ -21,11 +48,32 @@ app.include_router(usage_record.router, tags=["Usage Record"], prefix="/api")
 app.include_router(point.router, tags=["Point"], prefix="/api")
 app.include_router(user_coupon.router, tags=["User Coupon"], prefix="/api")
 app.include_router(purchase.router, tags=["Purchase"], prefix="/api")
+app.include_router(campaign.router, tags=["Campaign"], prefix="/api")
+app.include_router(recent_move.router, tags=["Recent Move"], prefix="/api")
 app.include_router(bus_routes.router, tags=["bus_routes"], prefix="/api")
 app.include_router(bus_times.router, tags=["bus_time"], prefix="/api")
 app.include_router(bus.router, tags=["bus"], prefix="/api")
 app.include_router(stations.router, tags=["stations"], prefix="/api")
+app.include_router(live.router, tags=["Live"], prefix="/api")
+app.include_router(admin.router, tags=["Admin"], prefix="/api")
 
 @app.get("/", tags=["Root"])
 async def read_root():
-    return {"message": "Welcome to the Bustar API!"}
\ No newline at end of file
+    return {"message": "Welcome to the Bustar API!"}
+
+
+@app.get("/metrics", tags=["Root"], response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+# 살아 있는지(liveness): 이벤트 루프가 응답하면 항상 200
+@app.get("/healthz", tags=["Root"], include_in_schema=False)
+async def healthz():
+    return {"status": "ok"}
+
+
+# 준비되었는지(readiness): 시작 준비가 끝나기 전에는 503
+@app.get("/readyz", tags=["Root"], include_in_schema=False)
+async def readyz():
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
@@ -18,6 +18,8 @@ class Bus(BusBase):
 class StationBase(BaseModel):
     station_number: int
     station_name: str = Field(..., max_length=50)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class StationCreate(StationBase):
     pass
@@ -0,0 +1,11 @@
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class CampaignCreate(BaseModel):
+    coupon_id: int
+    grade: Optional[str] = None
+    min_total_point: Optional[int] = Field(None, ge=0)
+    max_total_point: Optional[int] = Field(None, ge=0)
+    valid_months: int = Field(6, ge=1, le=36)
+    chunk_size: Optional[int] = Field(None, ge=1, le=10000)
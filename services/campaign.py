@@ -0,0 +1,85 @@
+
+import os
+import threading
+import time
+from core.metrics import Counter, register
+from crud import crud_campaign
+from db.session import get_db_connection
+
+# --- 쿠폰 일괄 지급 작업 실행 ---
+# 캠페인마다 백그라운드 스레드 하나가 청크 단위로 지급합니다. (crud/crud_campaign.py 참고)
+# 청크마다 짧은 트랜잭션으로 끝내고 CAMPAIGN_CHUNK_PAUSE 만큼 쉬어서
+# 사용자 테이블을 오래 잠그거나 다른 요청의 DB 연결/복제 지연을 밀어내지 않게 합니다.
+# 진행 위치는 DB 에 있으므로 서버가 재시작되어도 resume() 으로 이어서 할 수 있습니다.
+
+CAMPAIGN_CHUNK_SIZE = int(os.environ.get("CAMPAIGN_CHUNK_SIZE", "1000"))
+CAMPAIGN_CHUNK_PAUSE = float(os.environ.get("CAMPAIGN_CHUNK_PAUSE", "0.05"))
+
+CAMPAIGN_GRANTED = register(Counter("bustar_campaign_coupons_granted_total", "캠페인으로 지급한 쿠폰 수"))
+CAMPAIGN_CHUNKS = register(Counter("bustar_campaign_chunks_total", "처리한 캠페인 청크 수"))
+
+_workers = {}  # campaign_id -> Thread
+_workers_lock = threading.Lock()
+
+
+def is_running(campaign_id: int) -> bool:
+    worker = _workers.get(campaign_id)
+    return worker is not None and worker.is_alive()
+
+
+def start(campaign_id: int) -> bool:
+    with _workers_lock:
+        if is_running(campaign_id):
+            return False
+        worker = threading.Thread(target=_run, args=(campaign_id,), name=f"campaign-{campaign_id}", daemon=True)
+        _workers[campaign_id] = worker
+        worker.start()
+        return True
+
+
+def _run(campaign_id: int):
+    try:
+        while _step(campaign_id):
+            time.sleep(CAMPAIGN_CHUNK_PAUSE)
+    except Exception as e:
+        print(f"쿠폰 캠페인 {campaign_id} 실패: {e}")
+        conn = get_db_connection()
+        try:
+            crud_campaign.set_campaign_status(conn, campaign_id, "failed", ("running",), str(e)[:255])
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        with _workers_lock:
+            _workers.pop(campaign_id, None)
+
+
+def _step(campaign_id: int) -> bool:
+    # 청크 하나를 처리합니다. 더 할 일이 없거나 중지되었으면 False.
+    conn = get_db_connection()
+    try:
+        # 읽기 전에 트랜잭션을 시작하고 캠페인 행을 잠급니다. (중지/재개는 청크가 끝날 때까지 기다림)
+        conn.start_transaction()
+        campaign = crud_campaign.lock_campaign(conn, campaign_id)
+        if campaign is None or campaign["status"] != "running":
+            conn.rollback()
+            return False
+        cursor_id, max_user_id = campaign["cursor_id"], campaign["max_user_id"]
+        if cursor_id >= max_user_id:
+            crud_campaign.set_campaign_status(conn, campaign_id, "done", ("running",))
+            conn.commit()
+            print(f"쿠폰 캠페인 {campaign_id} 완료 ({campaign['granted']}건 지급)")
+            return False
+
+        high, scanned = crud_campaign.next_chunk(conn, cursor_id, max_user_id, campaign["chunk_size"])
+        granted = crud_campaign.grant_chunk(conn, campaign, cursor_id, high)
+        crud_campaign.advance_campaign(conn, campaign_id, high, scanned, granted)
+        conn.commit()
+        CAMPAIGN_CHUNKS.inc()
+        CAMPAIGN_GRANTED.inc((), granted)
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
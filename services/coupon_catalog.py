@@ -0,0 +1,128 @@
+
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from crud import crud_coupon
+from db.session import get_db_connection
+from services.snapshot import RefreshingSnapshot
+
+# --- 쿠폰 카탈로그 검색 (패싯 색인) ---
+# 쿠폰을 가격 순으로 정렬한 배열과 제휴사별 위치 목록(버킷, 역시 가격 순)을 메모리에 두고
+# 가격 범위는 이분 탐색, 제휴사는 버킷으로 좁힌 뒤 할인율만 훑어서 확인합니다.
+# 패싯 개수는 해당 패싯 자신의 조건만 뺀 나머지 조건으로 셉니다.
+# (제휴사를 하나 골라도 다른 제휴사 개수가 그대로 보여야 선택지를 바꿀 수 있습니다.)
+# 카탈로그가 바뀌면 스냅샷이 행 변경을 감지해 COUPON_INDEX_TTL 안에 다시 만듭니다.
+
+COUPON_INDEX_TTL = float(os.environ.get("COUPON_INDEX_TTL", "30"))
+PRICE_BUCKETS = (0, 1000, 3000, 5000, 10000, 20000)
+EMPTY = array("i")
+
+
+class CouponIndex:
+    def __init__(self, rows: list):
+        self.coupons = sorted(rows, key=lambda row: (row["coupon_price"], row["coupon_id"]))
+        self._prices = [row["coupon_price"] for row in self.coupons]
+        self._discounts = [row["coupon_discount"] for row in self.coupons]
+        self._affiliates = [row["coupon_affiliate"] for row in self.coupons]
+        buckets = {}
+        for position, affiliate in enumerate(self._affiliates):
+            buckets.setdefault(affiliate, array("i")).append(position)
+        self._buckets = buckets
+
+    def __len__(self) -> int:
+        return len(self.coupons)
+
+    def _price_range(self, min_price, max_price) -> tuple:
+        low = 0 if min_price is None else bisect_left(self._prices, min_price)
+        high = len(self._prices) if max_price is None else bisect_right(self._prices, max_price)
+        return low, high
+
+    def _positions(self, affiliates, low: int, high: int):
+        # 가격 순 위치 [low, high) 중 제휴사 조건에 맞는 것 (가격 순 유지)
+        if not affiliates:
+            return range(low, high)
+        positions = []
+        for affiliate in set(affiliates):
+            bucket = self._buckets.get(affiliate, EMPTY)
+            positions.extend(bucket[bisect_left(bucket, low) : bisect_left(bucket, high)])
+        if len(affiliates) > 1:
+            positions.sort()
+        return positions
+
+    def _discount_ok(self, position: int, min_discount) -> bool:
+        if min_discount is None:
+            return True
+        discount = self._discounts[position]
+        return discount is not None and discount >= min_discount
+
+    def search(
+        self,
+        affiliates=None,
+        min_price=None,
+        max_price=None,
+        min_discount=None,
+        sort: str = "price_asc",
+        offset: int = 0,
+        limit: int = 20,
+    ) -> dict:
+        low, high = self._price_range(min_price, max_price)
+        in_price = self._positions(affiliates, low, high)
+        matched = [p for p in in_price if self._discount_ok(p, min_discount)]
+
+        if sort == "price_desc":
+            matched.reverse()
+        elif sort == "discount_desc":
+            matched.sort(key=lambda p: -(self._discounts[p] or 0))
+        elif sort == "latest":
+            matched.sort(key=lambda p: -self.coupons[p]["coupon_id"])
+
+        affiliate_counts = Counter(
+            self._affiliates[p] for p in range(low, high) if self._discount_ok(p, min_discount)
+        )
+        affiliate_counts.pop(None, None)
+        discount_counts = Counter(self._discounts[p] for p in in_price)
+        discount_counts.pop(None, None)
+        price_counts = Counter(
+            bisect_right(PRICE_BUCKETS, self._prices[p]) - 1
+            for p in self._positions(affiliates, 0, len(self._prices))
+            if self._discount_ok(p, min_discount)
+        )
+
+        return {
+            "total": len(matched),
+            "items": [self.coupons[p] for p in matched[offset : offset + limit]],
+            "facets": {
+                "affiliate": [
+                    {"value": value, "count": count}
+                    for value, count in sorted(affiliate_counts.items(), key=lambda item: (-item[1], item[0]))
+                ],
+                "discount": [
+                    {"value": value, "count": count}
+                    for value, count in sorted(discount_counts.items())
+                ],
+                "price": [
+                    {
+                        "min": PRICE_BUCKETS[i],
+                        "max": PRICE_BUCKETS[i + 1] - 1 if i + 1 < len(PRICE_BUCKETS) else None,
+                        "count": price_counts.get(i, 0),
+                    }
+                    for i in range(len(PRICE_BUCKETS))
+                ],
+            },
+        }
+
+
+def _load_coupons() -> list:
+    conn = get_db_connection(read_only=True)
+    try:
+        return crud_coupon.get_coupons(conn)
+    finally:
+        conn.close()
+
+
+snapshot = RefreshingSnapshot("coupon_catalog", _load_coupons, CouponIndex, ttl=COUPON_INDEX_TTL)
+
+
+def search(**filters) -> dict:
+    return snapshot.get().search(**filters)
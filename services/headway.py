@@ -0,0 +1,177 @@
+
+import datetime
+import os
+import threading
+import time
+import numpy as np
+from crud import crud_bus_time
+from db import timetable
+from db.session import get_db_connection
+from services.snapshot import RefreshingSnapshot
+from services.transit import transit
+
+# --- 배차 간격 / 시간대별 운행 횟수 분석 ---
+# (버스 번호, 방향)마다 출발 시각을 정렬한 배열에서 연속 출발 사이 간격(min/mean/max)과
+# 시간대별 출발 횟수를 NumPy 배열 연산으로 한 번에 계산합니다. (파이썬 반복은 응답 dict 를 만들 때만)
+# 결과는 시간표 버전마다 한 번만 계산해 둡니다.
+#   - 시간표 파일(db/timetable.py): 파일이 바뀌어 새로 mmap 한 Timetable 객체마다
+#   - 교통 데이터 메모리 뷰(services/transit.py): 새로 고친 TransitView 객체마다
+#   - 둘 다 없으면 DB 에서 읽어 HEADWAY_TTL 마다 확인하고 행이 바뀐 경우에만 다시 계산
+#
+#   HEADWAY_TTL  DB 에서 읽을 때 다시 확인하는 주기 (초, 기본 60)
+
+HEADWAY_TTL = float(os.environ.get("HEADWAY_TTL", "60"))
+DIRECTIONS = ("up", "down")
+
+
+def _seconds(value) -> int:
+    return int(value.total_seconds()) if isinstance(value, datetime.timedelta) else int(value)
+
+
+def _clock(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class HeadwayReport:
+    def __init__(self, bus, direction, start):
+        started = time.perf_counter()
+        bus = np.asarray(bus, dtype=np.int64)
+        direction = np.asarray(direction, dtype=np.int64)
+        start = np.asarray(start, dtype=np.int64)
+        # (버스, 방향, 출발 시각)을 정수 하나로 합친 키로 정렬합니다. 시간표 파일처럼 이미 정렬되어 있으면 건너뜁니다.
+        key = ((bus * len(DIRECTIONS) + direction) << 20) | start
+        if len(key) > 1 and not (key[1:] >= key[:-1]).all():
+            order = np.argsort(key)
+            bus, direction, start = bus[order], direction[order], start[order]
+        self.trips = len(start)
+        self.hours = 0
+        self.lines = []
+        self.by_bus = {}
+        if self.trips:
+            self._build(bus, direction, start)
+        self.build_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def _build(self, bus, direction, start):
+        n = len(start)
+        # 그룹((버스, 방향)) 경계와 그룹 번호
+        first = np.ones(n, dtype=bool)
+        first[1:] = (bus[1:] != bus[:-1]) | (direction[1:] != direction[:-1])
+        group_start = np.flatnonzero(first)
+        group_count = np.diff(np.append(group_start, n))
+        group_id = np.cumsum(first) - 1
+        groups = len(group_start)
+
+        # 같은 그룹 안의 연속 출발 간격만 남기면 그룹 g 의 간격은 [group_start[g] - g, +group_count[g] - 1) 구간입니다.
+        gaps = np.diff(start)[~first[1:]]
+        has_gap = group_count > 1
+        offsets = (group_start - np.arange(groups))[has_gap]
+        gap_min = np.zeros(groups, dtype=np.int64)
+        gap_max = np.zeros(groups, dtype=np.int64)
+        gap_mean = np.zeros(groups)
+        if len(gaps):
+            gap_min[has_gap] = np.minimum.reduceat(gaps, offsets)
+            gap_max[has_gap] = np.maximum.reduceat(gaps, offsets)
+            gap_mean[has_gap] = np.add.reduceat(gaps, offsets) / (group_count[has_gap] - 1)
+
+        # 시간대별 출발 횟수 (자정 넘어 운행하는 24시 이후 출발도 그대로 셉니다)
+        hour = start // 3600
+        hours = int(hour.max()) + 1
+        per_hour = np.bincount(group_id * hours + hour, minlength=groups * hours).reshape(groups, hours)
+        busiest = per_hour.argmax(axis=1)
+
+        self.hours = hours
+        last = group_start + group_count - 1
+        for bus_number, d, count, first_start, last_start, gmin, gmean, gmax, has, peak, hourly in zip(
+            bus[group_start].tolist(),
+            direction[group_start].tolist(),
+            group_count.tolist(),
+            start[group_start].tolist(),
+            start[last].tolist(),
+            gap_min.tolist(),
+            gap_mean.tolist(),
+            gap_max.tolist(),
+            has_gap.tolist(),
+            busiest.tolist(),
+            per_hour.tolist(),
+        ):
+            line = {
+                "bus_number": bus_number,
+                "direction": DIRECTIONS[d],
+                "trips": count,
+                "first_departure": _clock(first_start),
+                "last_departure": _clock(last_start),
+                "headway_minutes": (
+                    {"min": round(gmin / 60, 1), "mean": round(gmean / 60, 1), "max": round(gmax / 60, 1)}
+                    if has
+                    else None
+                ),
+                # 인덱스가 시(hour)인 출발 횟수 목록 (길이는 모든 노선 공통 hours)
+                "trips_per_hour": hourly,
+                "peak_hour": {"hour": peak, "trips": hourly[peak]},
+            }
+            self.lines.append(line)
+            self.by_bus.setdefault(bus_number, []).append(line)
+
+    def select(self, bus_number=None, direction=None) -> list:
+        lines = self.lines if bus_number is None else self.by_bus.get(bus_number, [])
+        if direction is not None:
+            lines = [line for line in lines if line["direction"] == direction]
+        return lines
+
+
+# --- 시간표 버전별 원본 배열 ---
+def _from_timetable(table) -> HeadwayReport:
+    # mmap 된 int32 배열을 복사 없이 그대로 씁니다.
+    trip_counts = np.diff(np.asarray(table.trip_offsets))
+    bus = np.repeat(np.asarray(table.bus_number), trip_counts)
+    return HeadwayReport(bus, np.asarray(table.trip_direction), np.asarray(table.trip_start))
+
+
+def _from_rows(rows) -> HeadwayReport:
+    return HeadwayReport(
+        [row["bus_number"] for row in rows],
+        [DIRECTIONS.index(row["direction"]) for row in rows],
+        [_seconds(row["start_time"]) for row in rows],
+    )
+
+
+def _from_view(view) -> HeadwayReport:
+    return _from_rows([row for times in view.all_times().values() for row in times])
+
+
+def _load_departures():
+    conn = get_db_connection(read_only=True)
+    try:
+        return crud_bus_time.get_all_departures(conn)
+    finally:
+        conn.close()
+
+
+snapshot = RefreshingSnapshot("headway", _load_departures, _from_rows, ttl=HEADWAY_TTL)
+
+_cached = (None, None)  # (Timetable 또는 TransitView, HeadwayReport)
+_cached_lock = threading.Lock()
+
+
+def _for_version(version, build) -> HeadwayReport:
+    global _cached
+    source, report = _cached
+    if source is version:
+        return report
+    with _cached_lock:
+        source, report = _cached
+        if source is not version:
+            report = build(version)
+            _cached = (version, report)
+            print(f"배차 간격 분석 ({report.trips}건, {report.build_ms}ms)")
+        return report
+
+
+def report() -> HeadwayReport:
+    table = timetable.get_timetable()
+    if table is not None:
+        return _for_version(table, _from_timetable)
+    view = transit.current()
+    if view is not None:
+        return _for_version(view, _from_view)
+    return snapshot.get()
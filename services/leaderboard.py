@@ -0,0 +1,195 @@
+
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter as Tally
+from core.metrics import Counter, register
+from crud import crud_point
+from db.session import get_db_connection
+
+# --- 포인트 순위표 / 등급 분포 ---
+# total_point 순으로 정렬된 목록과 등급별 사용자 수를 메모리에 두고,
+# 포인트를 쓰는 경로(api/point.py)가 커밋한 뒤 update() 로 바로 반영합니다.
+# 상위 k 명 조회는 O(k), 갱신은 블록 정렬 목록으로 O(√n) 입니다.
+#
+# 다른 서버 인스턴스나 DB 를 직접 고친 변경은 LEADERBOARD_RECONCILE_SECONDS 마다
+# 백그라운드에서 DB 전체를 다시 읽어 맞춥니다. (다시 읽는 동안 들어온 갱신은 덮어쓰지 않고 다시 적용)
+
+LEADERBOARD_RECONCILE_SECONDS = float(os.environ.get("LEADERBOARD_RECONCILE_SECONDS", "300"))
+GRADE_ORDER = ("플래티넘", "골드", "실버", "브론즈")
+
+LEADERBOARD_DRIFT = register(
+    Counter("bustar_leaderboard_reconcile_drift_total", "DB 와 다시 맞출 때 달랐던 사용자 수")
+)
+
+
+class _SortedList:
+    # 최대 2 * LOAD 개씩의 정렬된 블록 목록입니다.
+    LOAD = 512
+
+    def __init__(self, items=()):
+        items = sorted(items)
+        self._blocks = [items[i : i + self.LOAD] for i in range(0, len(items), self.LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+
+    def add(self, item):
+        if not self._blocks:
+            self._blocks.append([item])
+            self._maxes.append(item)
+            return
+        i = min(bisect_left(self._maxes, item), len(self._blocks) - 1)
+        block = self._blocks[i]
+        insort(block, item)
+        self._maxes[i] = block[-1]
+        if len(block) > 2 * self.LOAD:
+            self._blocks[i : i + 1] = [block[: self.LOAD], block[self.LOAD :]]
+            self._maxes[i : i + 1] = [block[self.LOAD - 1], block[-1]]
+
+    def remove(self, item):
+        i = bisect_left(self._maxes, item)
+        block = self._blocks[i]
+        del block[bisect_left(block, item)]
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+
+class Standings:
+    def __init__(self, rows: list):
+        self.users = {row["id"]: (row["name"], row["grade"], row["total_point"]) for row in rows}
+        self.ranked = _SortedList(
+            (-total_point, user_id)
+            for user_id, (_, _, total_point) in self.users.items()
+            if total_point is not None
+        )
+        self.grades = Tally(grade for _, grade, _ in self.users.values())
+
+    def update(self, user_id: int, total_point: int, grade: str, name: str = None):
+        # 순위표에 없는 사용자(마지막으로 읽은 뒤 가입)는 이름을 알 때만 넣고, 모르면 다음 보정 때 반영합니다.
+        previous = self.users.get(user_id)
+        if previous is None and name is None:
+            return
+        if previous is not None:
+            name = previous[0]
+            if previous[2] is not None:
+                self.ranked.remove((-previous[2], user_id))
+            self.grades[previous[1]] -= 1
+        if total_point is not None:
+            self.ranked.add((-total_point, user_id))
+        self.grades[grade] += 1
+        self.users[user_id] = (name, grade, total_point)
+
+    def top(self, limit: int) -> list:
+        # 동점은 같은 순위이고 다음 순위는 건너뜁니다. (1, 2, 2, 4 ...)
+        result, rank, previous = [], 0, None
+        for position, (neg_point, user_id) in enumerate(self.ranked, 1):
+            if len(result) >= limit:
+                break
+            if neg_point != previous:
+                rank, previous = position, neg_point
+            name, grade, total_point = self.users[user_id]
+            result.append(
+                {"rank": rank, "user_id": user_id, "name": name, "grade": grade, "total_point": total_point}
+            )
+        return result
+
+    def grade_summary(self) -> dict:
+        ordered = [grade for grade in GRADE_ORDER if self.grades.get(grade)]
+        ordered += sorted(grade for grade, count in self.grades.items() if count and grade not in GRADE_ORDER)
+        return {
+            "total_users": len(self.users),
+            "grades": [{"grade": grade, "count": self.grades[grade]} for grade in ordered],
+        }
+
+
+class Leaderboard:
+    def __init__(self, reconcile_seconds: float):
+        self.reconcile_seconds = reconcile_seconds
+        self._standings = None
+        self._loaded_at = 0.0
+        self._pending = None  # 다시 읽는 동안 들어온 갱신 (user_id -> 인자)
+        self._reconciling = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _get(self) -> Standings:
+        if self._standings is None:
+            with self._load_lock:
+                if self._standings is None:
+                    self._reconcile()
+        elif time.monotonic() - self._loaded_at > self.reconcile_seconds:
+            with self._lock:
+                start = not self._reconciling
+                self._reconciling = True
+            if start:
+                threading.Thread(target=self._reconcile_in_background, name="reconcile-leaderboard", daemon=True).start()
+        return self._standings
+
+    def top(self, limit: int) -> list:
+        standings = self._get()
+        with self._lock:
+            return standings.top(limit)
+
+    def grade_summary(self) -> dict:
+        standings = self._get()
+        with self._lock:
+            return standings.grade_summary()
+
+    def update(self, user_id: int, total_point: int, grade: str, name: str = None):
+        # 커밋한 뒤 호출합니다. 값을 통째로 덮어쓰므로 같은 갱신이 두 번 들어와도 괜찮습니다.
+        with self._lock:
+            if self._pending is not None:
+                self._pending[user_id] = (total_point, grade, name)
+            if self._standings is not None:
+                self._standings.update(user_id, total_point, grade, name)
+
+    def _reconcile_in_background(self):
+        try:
+            self._reconcile()
+        except Exception as e:
+            print(f"포인트 순위표 보정 실패: {e}")
+        finally:
+            self._reconciling = False
+
+    def _reconcile(self):
+        with self._lock:
+            self._pending = {}
+        try:
+            # 복제 지연으로 이미 반영한 갱신을 되돌리지 않도록 주 DB 에서 읽습니다.
+            conn = get_db_connection()
+            try:
+                rows = crud_point.get_standings(conn)
+            finally:
+                conn.close()
+            started = time.perf_counter()
+            standings = Standings(rows)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for user_id, (total_point, grade, name) in self._pending.items():
+                standings.update(user_id, total_point, grade, name)
+            previous = self._standings
+            if previous is not None:
+                drift = sum(1 for user_id, user in standings.users.items() if previous.users.get(user_id) != user)
+                drift += sum(1 for user_id in previous.users if user_id not in standings.users)
+                if drift:
+                    LEADERBOARD_DRIFT.inc((), drift)
+                    print(f"포인트 순위표 보정: {drift}명 차이")
+            self._standings = standings
+            self._pending = None
+            self._loaded_at = time.monotonic()
+        if previous is None:
+            print(f"포인트 순위표 생성 ({len(rows)}명, {(time.perf_counter() - started) * 1000:.1f}ms)")
+
+
+leaderboard = Leaderboard(LEADERBOARD_RECONCILE_SECONDS)
@@ -0,0 +1,276 @@
+
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import time
+from collections import OrderedDict
+from core.metrics import Counter, Gauge, register
+from core.singleflight import Group
+from crud import crud_bus_time, crud_station
+from db import timetable
+from db.session import get_db_connection
+from services.transit import transit
+
+# --- 실시간 갱신 전송 (SSE / WebSocket 공용) ---
+# 구독 주제는 "bus:{버스 번호}" 또는 "station:{정류장 번호}" 입니다.
+# 갱신 하나는 한 번만 직렬화(JSON, SSE 프레임)하고 구독자마다 크기가 정해진 큐에 넣습니다.
+# 느린 구독자의 큐가 차면 가장 오래된 메시지를 버리고(최신 상태만 중요하므로),
+# 한 번도 읽지 않는 동안 LIVE_MAX_DROPS 개를 버리면 연결을 끊어 메모리가 쌓이지 않게 합니다.
+# 새 구독자는 주제의 마지막 메시지를 바로 받습니다. 마지막 메시지는 구독자가 없는 주제부터
+# 오래된 순으로 버려 LIVE_LATEST_TOPICS 개까지만 보관합니다. (버스/정류장 주제가 바뀌어도 메모리가 늘지 않도록)
+#
+# 도착 정보는 백그라운드 작업이 LIVE_TICK_SECONDS 마다 구독 중인 주제에 대해서만
+# 한 번씩 계산하고, 내용이 바뀐 경우에만 전송합니다. (구독자 수와 무관하게 주제당 한 번)
+# 주제들은 LIVE_CONCURRENCY 개씩 동시에 계산하고, 버스 시간표는 한 주기에 버스당 한 번만 읽어
+# 그 버스가 서는 정류장 주제들이 함께 씁니다.
+# 혼잡도 등 외부 데이터는 publish() 로 같은 경로를 통해 보냅니다.
+
+LIVE_QUEUE_SIZE = int(os.environ.get("LIVE_QUEUE_SIZE", "16"))
+LIVE_MAX_DROPS = int(os.environ.get("LIVE_MAX_DROPS", "64"))
+LIVE_TICK_SECONDS = float(os.environ.get("LIVE_TICK_SECONDS", "5"))
+LIVE_UPCOMING = int(os.environ.get("LIVE_UPCOMING", "3"))
+LIVE_LATEST_TOPICS = int(os.environ.get("LIVE_LATEST_TOPICS", "10000"))
+LIVE_CONCURRENCY = int(os.environ.get("LIVE_CONCURRENCY", "8"))
+TOPIC_KINDS = ("bus", "station")
+
+LIVE_SUBSCRIBERS = register(Gauge("bustar_live_subscribers", "실시간 구독자 수", ("kind",)))
+LIVE_PUBLISHED = register(Counter("bustar_live_messages_published_total", "발행한 실시간 메시지 수", ("kind",)))
+LIVE_DELIVERED = register(Counter("bustar_live_messages_queued_total", "구독자 큐에 넣은 메시지 수", ("kind",)))
+LIVE_DROPPED = register(Counter("bustar_live_messages_dropped_total", "느린 구독자 때문에 버린 메시지 수", ("kind",)))
+LIVE_DISCONNECTED = register(Counter("bustar_live_slow_disconnects_total", "느려서 끊은 구독자 수", ("kind",)))
+
+
+def topic_name(kind: str, key: int) -> str:
+    return f"{kind}:{key}"
+
+
+class Message:
+    __slots__ = ("sse", "ws")
+
+    def __init__(self, event: str, seq: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        self.sse = f"id: {seq}\nevent: {event}\ndata: {data}\n\n".encode()
+        self.ws = f'{{"id": {seq}, "event": {json.dumps(event)}, "data": {data}}}'
+
+
+class Subscription:
+    __slots__ = ("topic", "kind", "queue", "dropped", "closed")
+
+    def __init__(self, topic: str, kind: str):
+        self.topic = topic
+        self.kind = kind
+        self.queue = asyncio.Queue(LIVE_QUEUE_SIZE)
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, message: Message):
+        if self.closed:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            LIVE_DROPPED.inc((self.kind,))
+            if self.dropped >= LIVE_MAX_DROPS:
+                self.close()
+                LIVE_DISCONNECTED.inc((self.kind,))
+                return
+        self.queue.put_nowait(message)
+        LIVE_DELIVERED.inc((self.kind,))
+
+    def close(self):
+        # 대기 중인 소비자를 깨우기 위해 큐를 비우고 None 을 넣습니다.
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next(self, timeout: float):
+        # 메시지, 끊김(None), 또는 timeout 동안 없으면 False (하트비트용)
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.dropped = 0
+        return message
+
+
+class LiveHub:
+    # 이벤트 루프 스레드에서만 사용합니다. 다른 스레드에서는 publish_threadsafe() 를 씁니다.
+    def __init__(self):
+        self.topics = {}  # topic -> set(Subscription)
+        self.latest = OrderedDict()  # topic -> 마지막 Message (최근에 쓴 순서)
+        self.counts = dict.fromkeys(TOPIC_KINDS, 0)
+        self._seq = itertools.count(1)
+        self._loop = None
+        self._producer = None
+        self._last_payloads = {}
+
+    def subscribe(self, kind: str, key: int) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        topic = topic_name(kind, key)
+        subscription = Subscription(topic, kind)
+        self.topics.setdefault(topic, set()).add(subscription)
+        self.counts[kind] += 1
+        LIVE_SUBSCRIBERS.set((kind,), self.counts[kind])
+        latest = self.latest.get(topic)
+        if latest is not None:
+            self.latest.move_to_end(topic)
+            subscription.offer(latest)
+        if self._producer is None or self._producer.done():
+            self._producer = asyncio.ensure_future(self._produce())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self.topics.get(subscription.topic)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self.topics[subscription.topic]
+            self._last_payloads.pop(subscription.topic, None)
+        self.counts[subscription.kind] -= 1
+        LIVE_SUBSCRIBERS.set((subscription.kind,), self.counts[subscription.kind])
+
+    def publish(self, kind: str, key: int, event: str, payload: dict) -> int:
+        topic = topic_name(kind, key)
+        message = Message(event, next(self._seq), dict(payload, topic=topic))
+        self._remember(topic, message)
+        LIVE_PUBLISHED.inc((kind,))
+        subscribers = self.topics.get(topic, ())
+        for subscription in tuple(subscribers):
+            subscription.offer(message)
+            if subscription.closed:
+                # 소비자가 전송 중에 막혀 있어도 바로 구독 목록에서 뺍니다.
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    def _remember(self, topic: str, message: Message):
+        latest = self.latest
+        latest[topic] = message
+        latest.move_to_end(topic)
+        for _ in range(len(latest) - LIVE_LATEST_TOPICS):
+            oldest = next(iter(latest))
+            if oldest in self.topics:
+                latest.move_to_end(oldest)  # 구독 중인 주제는 남깁니다.
+            else:
+                del latest[oldest]
+
+    def publish_threadsafe(self, kind: str, key: int, event: str, payload: dict):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.publish, kind, key, event, payload)
+
+    async def _produce(self):
+        # 구독자가 있는 동안 도착 정보를 주기적으로 계산합니다.
+        while self.topics:
+            await self._tick()
+            await asyncio.sleep(LIVE_TICK_SECONDS)
+
+    async def _tick(self):
+        # 시간표 출처(파일/메모리 뷰)를 고르는 데 DB 를 읽을 수 있으므로 스레드에서 준비합니다.
+        times = await asyncio.to_thread(TickTimes.current)
+        limit = asyncio.Semaphore(LIVE_CONCURRENCY)
+        at = datetime.datetime.now().isoformat(timespec="seconds")
+
+        async def produce_topic(topic: str):
+            kind, _, key = topic.partition(":")
+            async with limit:
+                if topic not in self.topics:
+                    return
+                try:
+                    payload = await asyncio.to_thread(build_arrivals, kind, int(key), times)
+                except Exception as e:
+                    print(f"실시간 도착 정보 계산 실패 ({topic}): {e}")
+                    return
+            if payload is not None and payload != self._last_payloads.get(topic) and topic in self.topics:
+                self._last_payloads[topic] = payload
+                self.publish(kind, int(key), "arrivals", dict(payload, at=at))
+
+        await asyncio.gather(*(produce_topic(topic) for topic in list(self.topics)))
+
+
+hub = LiveHub()
+
+
+# --- 도착 정보 계산 (시간표 기준) ---
+def _seconds(value) -> int:
+    return int(value.total_seconds()) if isinstance(value, datetime.timedelta) else int(value)
+
+
+def _clock(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _now_seconds() -> int:
+    now = time.localtime()
+    return now.tm_hour * 3600 + now.tm_min * 60 + now.tm_sec
+
+
+def _upcoming(times: list, now: int, count: int) -> dict:
+    # 방향별로 지금 이후 출발하는 운행 count 개
+    result = {"up": [], "down": []}
+    for row in sorted(times, key=lambda row: _seconds(row["start_time"])):
+        start = _seconds(row["start_time"])
+        upcoming = result[row["direction"]]
+        if start >= now and len(upcoming) < count:
+            upcoming.append({"start_time": _clock(start), "arrive_time": _clock(_seconds(row["arrive_time"]))})
+    return result
+
+
+class TickTimes:
+    # 한 번의 계산 주기 동안 쓰는 버스별 시간표.
+    # 시간표 파일(db/timetable.py)이나 교통 데이터 메모리 뷰가 있으면 DB 대신 사용하고,
+    # 없으면 버스마다 한 번만 읽어 두고 여러 주제가 함께 씁니다. (동시에 요청하면 한 번만 읽음)
+    def __init__(self, table, view):
+        self.table = table
+        self.view = view
+        self._times = {}
+        self._group = Group("live_bus_times")
+
+    @classmethod
+    def current(cls) -> "TickTimes":
+        table = timetable.get_timetable()
+        return cls(table, transit.current() if table is None else None)
+
+    @property
+    def needs_db(self) -> bool:
+        return self.table is None and self.view is None
+
+    def get(self, conn, bus_number: int) -> list:
+        if self.table is not None:
+            return self.table.times(bus_number)
+        if self.view is not None:
+            return self.view.times(bus_number) or []
+        times = self._times.get(bus_number)
+        if times is None:
+            times = self._times[bus_number] = self._group.do(
+                bus_number, crud_bus_time.get_bus_times, conn, bus_number
+            )
+        return times
+
+
+def build_arrivals(kind: str, key: int, times: TickTimes = None):
+    now = _now_seconds()
+    if times is None:
+        times = TickTimes.current()
+    if kind == "bus" and not times.needs_db:
+        return {"bus_number": key, "upcoming": _upcoming(times.get(None, key), now, LIVE_UPCOMING)}
+
+    conn = get_db_connection(read_only=True)
+    try:
+        if kind == "bus":
+            return {"bus_number": key, "upcoming": _upcoming(times.get(conn, key), now, LIVE_UPCOMING)}
+        buses = []
+        for row in crud_station.get_station_buses(conn, key):
+            upcoming = _upcoming(times.get(conn, row["bus_number"]), now, 1)[row["direction"]]
+            buses.append(
+                {
+                    "bus_number": row["bus_number"],
+                    "direction": row["direction"],
+                    "next_start_time": upcoming[0]["start_time"] if upcoming else None,
+                }
+            )
+        return {"station_number": key, "buses": buses}
+    finally:
+        conn.close()
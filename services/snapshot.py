@@ -0,0 +1,58 @@
+
+import threading
+import time
+
+# --- 주기적으로 새로 고치는 메모리 스냅샷 ---
+# load() 로 원본 행을 읽어 build(rows) 로 조회용 구조를 만들어 둡니다.
+# ttl 이 지나면 다음 조회 때 백그라운드에서 다시 읽고, 행이 바뀐 경우에만 다시 만듭니다.
+# 새로 고치는 동안에도 이전 스냅샷으로 응답하므로 요청 경로에서는 첫 적재 때만 DB 를 읽습니다.
+
+
+class RefreshingSnapshot:
+    def __init__(self, name: str, load, build, ttl: float = 30.0):
+        self.name = name
+        self._load = load
+        self._build = build
+        self.ttl = ttl
+        self._value = None
+        self._fingerprint = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._refresh()
+                return self._value
+        if time.monotonic() - self._loaded_at > self.ttl and not self._refreshing:
+            with self._lock:
+                if self._refreshing:
+                    return value
+                self._refreshing = True
+            threading.Thread(target=self._refresh_in_background, name=f"refresh-{self.name}", daemon=True).start()
+        return value
+
+    def invalidate(self):
+        # 다음 조회 때 다시 읽도록 합니다.
+        self._loaded_at = 0.0
+
+    def _refresh_in_background(self):
+        try:
+            self._refresh()
+        except Exception as e:
+            print(f"{self.name} 스냅샷 갱신 실패: {e}")
+        finally:
+            self._refreshing = False
+
+    def _refresh(self):
+        rows = self._load()
+        fingerprint = hash(tuple(tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in rows))
+        if self._value is None or fingerprint != self._fingerprint:
+            started = time.perf_counter()
+            self._value = self._build(rows)
+            self._fingerprint = fingerprint
+            print(f"{self.name} 스냅샷 생성 ({len(rows)}건, {(time.perf_counter() - started) * 1000:.1f}ms)")
+        self._loaded_at = time.monotonic()
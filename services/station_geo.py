@@ -0,0 +1,127 @@
+
+import math
+import os
+from heapq import heappush, heapreplace
+from operator import itemgetter
+from crud import crud_station
+from db.session import get_db_connection
+from services.snapshot import RefreshingSnapshot
+
+# --- 주변 정류장 검색 (KD-tree) ---
+# 위도/경도를 단위 구 위의 3차원 좌표로 바꿔 KD-tree 에 넣습니다.
+# 두 점 사이의 직선(현) 거리는 대원 거리와 단조 관계이므로, 투영 오차 없이
+# 현 거리로 가지치기하며 가까운 k 개를 O(log n) 에 가깝게 찾습니다.
+
+STATION_GEO_TTL = float(os.environ.get("STATION_GEO_TTL", "60"))
+EARTH_RADIUS_M = 6371008.8
+
+
+def _unit_vector(latitude: float, longitude: float) -> tuple:
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def _chord(meters: float) -> float:
+    return 2 * math.sin(min(meters / EARTH_RADIUS_M, math.pi) / 2)
+
+
+def _meters(chord: float) -> float:
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, chord / 2))
+
+
+class StationGeoIndex:
+    def __init__(self, rows: list):
+        # rows: 정류장 x 지나는 버스 (station_number 순), 버스가 없으면 bus_number 가 NULL
+        stations = {}
+        for row in rows:
+            station = stations.get(row["station_number"])
+            if station is None:
+                station = stations[row["station_number"]] = {
+                    "station_number": row["station_number"],
+                    "station_name": row["station_name"],
+                    "latitude": row["latitude"],
+                    "longitude": row["longitude"],
+                    "bus_numbers": [],
+                }
+            if row["bus_number"] is not None:
+                station["bus_numbers"].append(row["bus_number"])
+        self.stations = list(stations.values())
+
+        points = [
+            (*_unit_vector(station["latitude"], station["longitude"]), i)
+            for i, station in enumerate(self.stations)
+        ]
+        self._tree = [None] * len(points)
+        self._place(points, 0, 0)
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def _place(self, points: list, low: int, depth: int):
+        # 구간 [low, low + len) 의 가운데에 축 기준 중앙값을 두는 암시적 트리
+        if not points:
+            return
+        points.sort(key=itemgetter(depth % 3))
+        mid = len(points) // 2
+        self._tree[low + mid] = points[mid]
+        self._place(points[:mid], low, depth + 1)
+        self._place(points[mid + 1 :], low + mid + 1, depth + 1)
+
+    def nearest(self, latitude: float, longitude: float, radius_m: float, limit: int) -> list:
+        target = _unit_vector(latitude, longitude)
+        max_chord = _chord(radius_m)
+        max_d2 = max_chord * max_chord
+        tree = self._tree
+        best = []  # (-거리², 번호) 최대 힙
+
+        def visit(low: int, high: int, depth: int):
+            if low >= high:
+                return
+            mid = (low + high) // 2
+            point = tree[mid]
+            dx, dy, dz = point[0] - target[0], point[1] - target[1], point[2] - target[2]
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 <= max_d2:
+                if len(best) < limit:
+                    heappush(best, (-d2, point[3]))
+                elif d2 < -best[0][0]:
+                    heapreplace(best, (-d2, point[3]))
+
+            axis = depth % 3
+            diff = target[axis] - point[axis]
+            near, far = ((low, mid), (mid + 1, high)) if diff < 0 else ((mid + 1, high), (low, mid))
+            visit(near[0], near[1], depth + 1)
+            bound = max_d2 if len(best) < limit else -best[0][0]
+            if diff * diff <= bound:
+                visit(far[0], far[1], depth + 1)
+
+        visit(0, len(tree), 0)
+        return [(self.stations[i], _meters(math.sqrt(-neg_d2))) for neg_d2, i in sorted(best, reverse=True)]
+
+
+def _load_locations() -> list:
+    conn = get_db_connection(read_only=True)
+    try:
+        return crud_station.get_station_locations(conn)
+    finally:
+        conn.close()
+
+
+snapshot = RefreshingSnapshot("station_geo", _load_locations, StationGeoIndex, ttl=STATION_GEO_TTL)
+
+
+def nearby(latitude: float, longitude: float, radius_m: float, limit: int, include_routes: bool = False) -> list:
+    results = []
+    for station, distance in snapshot.get().nearest(latitude, longitude, radius_m, limit):
+        item = {
+            "station_number": station["station_number"],
+            "station_name": station["station_name"],
+            "latitude": station["latitude"],
+            "longitude": station["longitude"],
+            "distance_m": round(distance, 1),
+        }
+        if include_routes:
+            item["bus_numbers"] = station["bus_numbers"]
+        results.append(item)
+    return results
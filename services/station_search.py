@@ -0,0 +1,151 @@
+
+import os
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import heapify, heappop
+from crud import crud_station
+from db.session import get_db_connection
+from services.snapshot import RefreshingSnapshot
+
+# --- 정류장 이름 검색 색인 ---
+# 정류장 이름을 메모리에 색인해 두고 접두사, 부분 문자열, 초성(ㄱㄴㄷ) 검색을 합니다.
+#   접두사: 정렬된 이름 목록에서 이분 탐색
+#   부분 문자열: 글자/두 글자(bigram) 역색인 중 가장 짧은 목록을 후보로 훑으며 확인
+#   초성: 이름을 초성 문자열로 바꾼 색인에서 같은 방식으로 찾고, 질의의 완성된 글자는 그대로 비교
+# 결과는 정확히 일치 > 접두사 > 부분 문자열 > 초성 접두사 > 초성 부분 문자열, 짧은 이름 순입니다.
+
+STATION_INDEX_TTL = float(os.environ.get("STATION_INDEX_TTL", "30"))
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = frozenset(CHOSEONG)
+HANGUL_START, HANGUL_COUNT = 0xAC00, 11172
+MATCH_TYPES = ("exact", "prefix", "substring", "initial_prefix", "initial_substring")
+EMPTY = array("i")
+
+
+def normalize(text: str) -> str:
+    return "".join(text.split()).lower()
+
+
+# 완성형 한글 음절(가~힣) -> 초성. 음절은 (초성 * 21 + 중성) * 28 + 종성 순서로 배치되어 있습니다.
+_CHOSEONG_TABLE = {HANGUL_START + code: CHOSEONG[code // 588] for code in range(HANGUL_COUNT)}
+
+
+def choseong(text: str) -> str:
+    # 완성형 한글 음절은 초성으로, 나머지 글자는 그대로 둡니다.
+    return text.translate(_CHOSEONG_TABLE)
+
+
+class _NgramIndex:
+    # 항목 번호는 StationIndex 의 순위 순서(짧은 이름 먼저)이므로,
+    # 번호 순으로 훑다가 필요한 개수를 채우면 바로 멈출 수 있습니다.
+    def __init__(self, texts: list):
+        order = sorted(range(len(texts)), key=texts.__getitem__)
+        self._keys = [texts[i] for i in order]
+        self._ids = array("i", order)
+        postings = defaultdict(lambda: array("i"))
+        for i, text in enumerate(texts):
+            for gram in set(text) | {text[j : j + 2] for j in range(len(text) - 1)}:
+                postings[gram].append(i)
+        self._postings = dict(postings)
+
+    def prefix(self, query: str):
+        # 접두사 범위는 글자 순이므로 힙으로 번호(순위) 순서대로 필요한 만큼만 꺼냅니다.
+        low = bisect_left(self._keys, query)
+        high = bisect_left(self._keys, query + "\U0010ffff", low)
+        heap = self._ids[low:high].tolist()
+        heapify(heap)
+        while heap:
+            yield heappop(heap)
+
+    def candidates(self, query: str):
+        # 질의의 글자/bigram 중 가장 드문 것의 목록 (실제 포함 여부는 호출하는 쪽에서 확인)
+        grams = [query] if len(query) == 1 else [query[j : j + 2] for j in range(len(query) - 1)]
+        return min((self._postings.get(gram, EMPTY) for gram in grams), key=len)
+
+
+class StationIndex:
+    def __init__(self, rows: list):
+        normalized = [normalize(row["station_name"]) for row in rows]
+        order = sorted(
+            range(len(rows)), key=lambda i: (len(normalized[i]), normalized[i], rows[i]["station_number"])
+        )
+        self.numbers = [rows[i]["station_number"] for i in order]
+        self.names = [rows[i]["station_name"] for i in order]
+        self._normalized = [normalized[i] for i in order]
+        self._initials = [choseong(name) for name in self._normalized]
+        self._text = _NgramIndex(self._normalized)
+        self._initial_text = _NgramIndex(self._initials)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _initial_match(self, i: int, query: str, query_initials: str) -> int:
+        # 초성 자리에서 일치하고, 질의의 완성된 글자는 이름의 같은 자리 글자와 같아야 합니다.
+        name, initials = self._normalized[i], self._initials[i]
+        start = initials.find(query_initials)
+        while start >= 0:
+            if all(q in CHOSEONG_SET or name[start + k] == q for k, q in enumerate(query)):
+                return start
+            start = initials.find(query_initials, start + 1)
+        return -1
+
+    def search(self, query: str, limit: int = 20) -> list:
+        query = normalize(query)
+        if not query:
+            return []
+
+        # 등급 순으로 채우고, 같은 등급 안에서는 항목 번호(순위) 순으로 훑으므로 limit 개가 차면 멈춥니다.
+        found, seen = [], set()
+        if not any(ch in CHOSEONG_SET for ch in query):
+            for i in self._text.prefix(query):
+                found.append((i, 0 if self._normalized[i] == query else 1))
+                seen.add(i)
+                if len(found) >= limit:
+                    break
+            if len(found) < limit:
+                for i in self._text.candidates(query):
+                    if i not in seen and query in self._normalized[i]:
+                        found.append((i, 2))
+                        if len(found) >= limit:
+                            break
+        else:
+            query_initials = choseong(query)
+            only_initials = all(ch in CHOSEONG_SET for ch in query)
+            for i in self._initial_text.prefix(query_initials):
+                if only_initials or self._initial_match(i, query, query_initials) == 0:
+                    found.append((i, 3))
+                    seen.add(i)
+                    if len(found) >= limit:
+                        break
+            if len(found) < limit:
+                for i in self._initial_text.candidates(query_initials):
+                    if i not in seen and self._initial_match(i, query, query_initials) > 0:
+                        found.append((i, 4))
+                        if len(found) >= limit:
+                            break
+
+        return [
+            {
+                "station_number": self.numbers[i],
+                "station_name": self.names[i],
+                "match": MATCH_TYPES[rank],
+            }
+            for i, rank in found
+        ]
+
+
+def _load_stations() -> list:
+    conn = get_db_connection(read_only=True)
+    try:
+        return crud_station.get_stations(conn)
+    finally:
+        conn.close()
+
+
+snapshot = RefreshingSnapshot("station_search", _load_stations, StationIndex, ttl=STATION_INDEX_TTL)
+
+
+def search(query: str, limit: int = 20) -> list:
+    return snapshot.get().search(query, limit)
@@ -0,0 +1,225 @@
+
+import os
+import threading
+import time
+from core.metrics import Counter, register
+from crud import crud_transit
+from db.session import get_db_connection
+
+# --- 교통 데이터 메모리 뷰 (변경된 버스만 다시 읽기) ---
+# 버스마다 노선/시간표 응답을 미리 만들어 둔 조각(BusSlice)을 두고 조회 API 가 그대로 돌려줍니다.
+# TRANSIT_RELOAD_SECONDS 가 지나면 백그라운드에서 버스별/정류장별 체크섬(crud/crud_transit.py)을 비교해
+#   - 버스/노선/시간표 체크섬이 바뀐 버스
+#   - 이름/좌표가 바뀐 정류장을 지나는 버스
+# 의 조각만 다시 읽어 만들고, 나머지 조각은 그대로 재사용한 새 뷰로 한 번에 바꿉니다.
+# 정류장 검색/주변 정류장 스냅샷은 정류장/노선이 바뀐 경우에만 다시 만들도록 알립니다.
+#
+#   TRANSIT_RELOAD_SECONDS  변경 확인 주기 (초). 0 이면 사용하지 않고 DB 에서 바로 읽습니다. (기본 0)
+
+TRANSIT_RELOAD_SECONDS = float(os.environ.get("TRANSIT_RELOAD_SECONDS", "0"))
+DIRECTIONS = ("up", "down")  # MySQL ENUM 순서
+
+TRANSIT_RELOADS = register(Counter("bustar_transit_reloads_total", "교통 데이터 변경 확인 수", ("result",)))
+TRANSIT_RELOADED_BUSES = register(Counter("bustar_transit_reloaded_buses_total", "다시 읽은 버스 조각 수"))
+
+
+class BusSlice:
+    __slots__ = ("bus", "routes", "route_summary", "times", "stations")
+
+    def __init__(self, bus: dict, route_rows: list, time_rows: list):
+        self.bus = bus
+        route_rows = sorted(route_rows, key=lambda r: (DIRECTIONS.index(r["direction"]), r["station_order"]))
+        # GET /bus_routes/{bus_number} 응답
+        self.routes = [
+            {
+                "direction": direction,
+                "stops": [
+                    {"direction": direction, "station_order": r["station_order"], "station_name": r["station_name"]}
+                    for r in route_rows
+                    if r["direction"] == direction
+                ],
+            }
+            for direction in DIRECTIONS
+        ]
+        # GET /bus_routes/ 의 버스별 값
+        self.route_summary = [
+            {
+                "direction": route["direction"],
+                "stops": [
+                    {"station_order": stop["station_order"], "station_name": stop["station_name"]}
+                    for stop in route["stops"]
+                ],
+            }
+            for route in self.routes
+        ]
+        self.times = sorted(time_rows, key=lambda r: (DIRECTIONS.index(r["direction"]), r["start_time"]))
+        self.stations = frozenset(r["station_number"] for r in route_rows)
+
+
+class TransitView:
+    # 만든 뒤에는 바꾸지 않습니다. 새로 고칠 때는 새 뷰를 만들어 참조만 바꿉니다.
+    def __init__(self, slices: dict, checksums: dict, station_checksums: dict):
+        self.slices = slices
+        self.checksums = checksums
+        self.station_checksums = station_checksums
+        self.bus_numbers = sorted(slices)
+        self._all_routes = None
+        self._all_times = None
+
+    def routes(self, bus_number: int):
+        bus_slice = self.slices.get(bus_number)
+        return bus_slice.routes if bus_slice is not None and bus_slice.stations else None
+
+    def times(self, bus_number: int):
+        bus_slice = self.slices.get(bus_number)
+        return bus_slice.times if bus_slice is not None and bus_slice.times else None
+
+    def all_routes(self) -> dict:
+        if self._all_routes is None:
+            self._all_routes = {
+                n: self.slices[n].route_summary for n in self.bus_numbers if self.slices[n].stations
+            }
+        return self._all_routes
+
+    def all_times(self) -> dict:
+        if self._all_times is None:
+            self._all_times = {n: self.slices[n].times for n in self.bus_numbers if self.slices[n].times}
+        return self._all_times
+
+
+class TransitData:
+    def __init__(self, reload_seconds: float):
+        self.reload_seconds = reload_seconds
+        self._view = None
+        self._station_buses = {}  # station_number -> 지나는 버스 번호들 (새로 고침 스레드만 사용)
+        self._listeners = []
+        self._loaded_at = 0.0  # 마지막으로 적재/확인을 시도한 시각 (실패해도 갱신해 재시도 간격을 둡니다)
+        self._reloading = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.reload_seconds > 0
+
+    def on_change(self, callback):
+        # callback(바뀐 버스 번호들, 바뀐 정류장 번호들)
+        self._listeners.append(callback)
+
+    def current(self):
+        # 사용하지 않거나 아직 적재하지 못했으면 None (호출하는 쪽에서 DB 를 읽습니다)
+        if not self.enabled:
+            return None
+        if self._view is None:
+            if self._loaded_at and time.monotonic() - self._loaded_at <= self.reload_seconds:
+                return None  # 적재에 실패한 지 얼마 안 되었으면 다시 시도하지 않습니다.
+            with self._lock:
+                if self._view is None:
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        # 오류 응답은 DB 를 읽는 쪽(각 API 의 mysql.connector.Error 처리)에서 만듭니다.
+                        self._loaded_at = time.monotonic()
+                        print(f"교통 데이터 적재 실패: {e}")
+            return self._view
+        if time.monotonic() - self._loaded_at > self.reload_seconds and not self._reloading:
+            self._reloading = True
+            threading.Thread(target=self._reload_in_background, name="reload-transit", daemon=True).start()
+        return self._view
+
+    def reload_now(self) -> tuple:
+        with self._lock:
+            return self.reload()
+
+    def _reload_in_background(self):
+        try:
+            with self._lock:
+                self.reload()
+        except Exception as e:
+            # DB 가 죽어 있는 동안 요청마다 다시 시도하지 않도록 다음 시도는 reload_seconds 뒤입니다.
+            self._loaded_at = time.monotonic()
+            print(f"교통 데이터 새로 고침 실패: {e}")
+        finally:
+            self._reloading = False
+
+    def reload(self) -> tuple:
+        # 바뀐 버스/정류장을 찾아 해당 조각만 다시 만듭니다. (바뀐 버스 번호들, 바뀐 정류장 번호들)
+        started = time.perf_counter()
+        old = self._view
+        conn = get_db_connection(read_only=True)
+        try:
+            checksums = crud_transit.get_bus_checksums(conn)
+            station_checksums = crud_transit.get_station_checksums(conn)
+            if old is None:
+                changed_buses, changed_stations = set(checksums), set(station_checksums)
+            else:
+                changed_buses = {
+                    n for n in checksums.keys() | old.checksums.keys() if checksums.get(n) != old.checksums.get(n)
+                }
+                changed_stations = {
+                    s
+                    for s in station_checksums.keys() | old.station_checksums.keys()
+                    if station_checksums.get(s) != old.station_checksums.get(s)
+                }
+                for station_number in changed_stations:
+                    changed_buses |= self._station_buses.get(station_number, set())
+
+            if old is not None and not changed_buses and not changed_stations:
+                self._loaded_at = time.monotonic()
+                TRANSIT_RELOADS.inc(("unchanged",))
+                return changed_buses, changed_stations
+
+            reload_numbers = None if old is None else changed_buses & checksums.keys()
+            buses, routes, times = crud_transit.get_bus_slices(conn, reload_numbers)
+        finally:
+            conn.close()
+
+        route_rows, time_rows = {}, {}
+        for row in routes:
+            route_rows.setdefault(row["bus_number"], []).append(row)
+        for row in times:
+            time_rows.setdefault(row["bus_number"], []).append(row)
+        slices = dict(old.slices) if old is not None else {}
+        for bus_number in changed_buses:
+            previous = slices.pop(bus_number, None)
+            if previous is not None:
+                for station_number in previous.stations:
+                    self._station_buses.get(station_number, set()).discard(bus_number)
+        for bus in buses:
+            bus_number = bus["bus_number"]
+            bus_slice = slices[bus_number] = BusSlice(
+                bus, route_rows.get(bus_number, []), time_rows.get(bus_number, [])
+            )
+            for station_number in bus_slice.stations:
+                self._station_buses.setdefault(station_number, set()).add(bus_number)
+
+        self._view = TransitView(slices, checksums, station_checksums)
+        self._loaded_at = time.monotonic()
+        TRANSIT_RELOADS.inc(("changed",))
+        TRANSIT_RELOADED_BUSES.inc((), len(buses))
+        print(
+            f"교통 데이터 {'적재' if old is None else '부분 갱신'}: 버스 {len(buses)}/{len(slices)}개, "
+            f"정류장 변경 {len(changed_stations)}개 ({(time.perf_counter() - started) * 1000:.1f}ms)"
+        )
+        if old is not None:
+            for callback in self._listeners:
+                try:
+                    callback(changed_buses, changed_stations)
+                except Exception as e:
+                    print(f"교통 데이터 변경 알림 실패: {e}")
+        return changed_buses, changed_stations
+
+
+transit = TransitData(TRANSIT_RELOAD_SECONDS)
+
+
+def _invalidate_station_snapshots(changed_buses: set, changed_stations: set):
+    # 정류장 이름 검색은 정류장만, 주변 정류장(지나는 버스 포함)은 노선 변경도 반영합니다.
+    from services import station_geo, station_search
+
+    if changed_stations:
+        station_search.snapshot.invalidate()
+    if changed_stations or changed_buses:
+        station_geo.snapshot.invalidate()
+
+
+transit.on_change(_invalidate_station_snapshots)
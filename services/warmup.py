@@ -0,0 +1,172 @@
+
+import os
+import threading
+import time
+from core.metrics import Gauge, register
+
+# --- 시작 준비(warm-up)와 준비 상태 ---
+# 워커가 뜨면 백그라운드에서 DB 연결을 미리 열고 자주 읽는 데이터(시간표/교통 데이터, 쿠폰 카탈로그,
+# 정류장 검색/주변 정류장 색인, 포인트 순위표, 배차 간격 분석)를 미리 만들어 둡니다. 단계별 소요 시간은 로그와
+# /metrics(bustar_startup_phase_seconds), /readyz 응답에 남깁니다.
+# 준비가 끝나기 전에도 요청은 처리하지만(/healthz 는 항상 200) /readyz 는 503 이므로
+# 롤링 배포 때 로드 밸런서가 준비된 워커에만 트래픽을 보냅니다.
+# 필수 단계(DB 연결)가 실패하면 STARTUP_RETRY_SECONDS 뒤에 다시 시도하고, 나머지 단계는 실패해도
+# 첫 요청 때 다시 만들 수 있으므로 기록만 하고 넘어갑니다.
+#
+#   STARTUP_WARMUP            0 이면 미리 준비하지 않고 바로 준비 완료 (기본 1)
+#   STARTUP_BLOCKING          1 이면 준비가 끝난 뒤에 연결을 받기 시작합니다. (기본 0)
+#   STARTUP_WARM_CONNECTIONS  풀마다 미리 열어 둘 연결 수 (기본 4)
+#   STARTUP_RETRY_SECONDS     필수 단계 재시도 간격 (초, 기본 5)
+
+STARTUP_WARMUP = os.environ.get("STARTUP_WARMUP", "1") == "1"
+STARTUP_BLOCKING = os.environ.get("STARTUP_BLOCKING", "0") == "1"
+STARTUP_WARM_CONNECTIONS = int(os.environ.get("STARTUP_WARM_CONNECTIONS", "4"))
+STARTUP_RETRY_SECONDS = float(os.environ.get("STARTUP_RETRY_SECONDS", "5"))
+
+STARTUP_PHASE_SECONDS = register(Gauge("bustar_startup_phase_seconds", "시작 준비 단계별 소요 시간", ("phase",)))
+READY = register(Gauge("bustar_ready", "요청을 받을 준비가 되었는지 (1/0)"))
+READY.set((), 0)
+
+
+def process_age():
+    # 프로세스가 시작된 뒤 지난 시간 (초). 리눅스가 아니면 None
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# --- 단계 ---
+def _warm_db():
+    from db import session
+
+    opened = session.pool.warm(STARTUP_WARM_CONNECTIONS)
+    for replica in session.replicas.replicas:
+        opened += replica.pool.warm(STARTUP_WARM_CONNECTIONS)
+    return f"연결 {opened}개"
+
+
+def _warm_transit():
+    from db import timetable
+    from services.transit import transit
+
+    loaded = []
+    if timetable.get_timetable() is not None:
+        loaded.append("시간표 파일")
+    if transit.current() is not None:
+        loaded.append("교통 데이터 뷰")
+    if os.environ.get("TRAVEL_MATRIX_PATH"):
+        from db import travel_matrix
+
+        if travel_matrix.get_travel_matrix() is not None:
+            loaded.append("소요 시간 행렬")
+    return ", ".join(loaded) or "사용 안 함"
+
+
+def _warm_coupon_catalog():
+    from services import coupon_catalog
+
+    return f"쿠폰 {len(coupon_catalog.snapshot.get().coupons)}개"
+
+
+def _warm_stations():
+    from services import station_geo, station_search
+
+    station_search.snapshot.get()
+    return f"정류장 {len(station_geo.snapshot.get())}개"
+
+
+def _warm_leaderboard():
+    from services.leaderboard import leaderboard
+
+    return f"사용자 {leaderboard.grade_summary()['total_users']}명"
+
+
+def _warm_headway():
+    # NumPy 를 쓰는 분석 모듈은 API 에서는 처음 호출할 때 불러오므로 여기서 미리 불러 둡니다.
+    from services import headway
+
+    return f"운행 {headway.report().trips}건"
+
+
+# (이름, 함수, 필수 여부)
+PHASES = (
+    ("db", _warm_db, True),
+    ("transit", _warm_transit, False),
+    ("coupon_catalog", _warm_coupon_catalog, False),
+    ("stations", _warm_stations, False),
+    ("leaderboard", _warm_leaderboard, False),
+    ("headway", _warm_headway, False),
+)
+
+
+class Warmup:
+    def __init__(self, phases=PHASES):
+        self.phases = phases
+        self.results = {}  # 이름 -> {"ms", "ok", "detail" 또는 "error"}
+        self.ready = False
+        self.started_at = None
+        self.ready_after = None  # 프로세스 시작부터 준비 완료까지 (초)
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.monotonic()
+        age = process_age()
+        if age is not None:
+            STARTUP_PHASE_SECONDS.set(("boot",), age)
+            self.results["boot"] = {"ms": round(age * 1000, 1), "ok": True, "detail": "프로세스 시작 ~ 앱 시작"}
+        if not STARTUP_WARMUP:
+            self._mark_ready()
+            return
+        self._thread = threading.Thread(target=self.run, name="startup-warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def run(self):
+        pending = list(self.phases)
+        while pending:
+            failed = []
+            for name, warm, required in pending:
+                started = time.perf_counter()
+                try:
+                    detail = warm()
+                    result = {"ok": True, "detail": detail}
+                except Exception as e:
+                    result = {"ok": False, "error": str(e)}
+                    if required:
+                        failed.append((name, warm, required))
+                elapsed = time.perf_counter() - started
+                self.results[name] = dict(result, ms=round(elapsed * 1000, 1))
+                STARTUP_PHASE_SECONDS.set((name,), elapsed)
+                print(f"시작 준비 {name}: {elapsed * 1000:.1f}ms {result.get('detail') or result.get('error')}")
+            pending = failed
+            if pending:
+                print(f"시작 준비 필수 단계 실패, {STARTUP_RETRY_SECONDS:.0f}초 뒤 다시 시도합니다.")
+                time.sleep(STARTUP_RETRY_SECONDS)
+        self._mark_ready()
+
+    def _mark_ready(self):
+        age = process_age()
+        self.ready_after = age if age is not None else time.monotonic() - self.started_at
+        self.ready = True
+        READY.set((), 1)
+        STARTUP_PHASE_SECONDS.set(("total",), self.ready_after)
+        print(f"요청 받을 준비 완료 (프로세스 시작 후 {self.ready_after:.2f}s)")
+
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "ready_after_ms": round(self.ready_after * 1000, 1) if self.ready_after is not None else None,
+            "phases": self.results,
+        }
+
+
+warmup = Warmup()